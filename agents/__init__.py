@@ -1,13 +1,34 @@
 """
 Agents package for the AI Agentic Research System.
 Contains all agent implementations.
+
+Exports are imported on first access, so importing a light submodule
+(e.g. agents.cache) does not load LangChain and the LLM clients.
 """
-from agents.research_agent import ResearchAgent, research_agent_node
-from agents.drafting_agent import DraftingAgent, drafting_agent_node
+import importlib
+
+_EXPORTS = {
+    "ResearchAgent": "agents.research_agent",
+    "DraftingAgent": "agents.drafting_agent",
+    "AgentRegistry": "agents.registry",
+    "research_agent_node": "agents.research_agent",
+    "drafting_agent_node": "agents.drafting_agent",
+    "aresearch_agent_node": "agents.research_agent",
+    "adrafting_agent_node": "agents.drafting_agent"
+}
 
 __all__ = [
     "ResearchAgent", 
     "DraftingAgent",
+    "AgentRegistry",
     "research_agent_node",
-    "drafting_agent_node"
-]
\ No newline at end of file
+    "drafting_agent_node",
+    "aresearch_agent_node",
+    "adrafting_agent_node"
+]
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
@@ -0,0 +1,384 @@
+"""
+Caching utilities for the AI Agentic Research System.
+Provides in-memory and on-disk key/value caches with TTL expiry,
+size-bounded eviction and hit/miss counters.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+# A cache entry is stored as (value, expires_at); expires_at is None for no expiry
+CacheEntry = Tuple[Any, Optional[float]]
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so near-identical spellings share a cache key.
+
+    Args:
+        query: Raw search query
+
+    Returns:
+        Lower-cased query without punctuation and with collapsed whitespace
+    """
+    return " ".join(_PUNCTUATION.sub(" ", query.lower()).split())
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a content-addressed cache key from JSON-serializable parts.
+
+    Args:
+        parts: Values identifying the cached item
+
+    Returns:
+        SHA-256 hex digest of the serialized parts
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def search_cache_key(query: str, max_results: int) -> str:
+    """
+    Build the cache key for a search request.
+
+    Args:
+        query: Search query
+        max_results: Maximum number of results requested
+
+    Returns:
+        Cache key for the search
+    """
+    return make_cache_key("search", normalize_query(query), max_results)
+
+class CacheStats:
+    """
+    Thread-safe hit/miss counters for a cache.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def record(self, counter: str, amount: int = 1) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            counter: Name of the counter to increment
+            amount: Amount to add
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the counters as a dictionary.
+
+        Returns:
+            Dictionary of counter values
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hit_rate, 4)
+        }
+
+class BaseCache:
+    """
+    Interface for key/value caches holding JSON-serializable values.
+    """
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+
+    def _expires_at(self, ttl_seconds: Optional[float]) -> Optional[float]:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        return time.time() + ttl if ttl else None
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up a key and return its value together with its expiry time.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (value, expires_at) tuple, or None on a miss
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl_seconds: Time to live, defaults to the cache's TTL
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+class MemoryCache(BaseCache):
+    """
+    In-memory LRU cache with TTL expiry.
+    """
+    def __init__(self, max_entries: int = 512, ttl_seconds: Optional[float] = None):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.record("misses")
+                return None
+
+            expires_at = entry[1]
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.stats.record("expirations")
+                self.stats.record("misses")
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.record("hits")
+            return entry
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self.set_entry(key, value, self._expires_at(ttl_seconds))
+
+    def set_entry(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """
+        Store a value with an absolute expiry time.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            expires_at: Unix timestamp after which the entry expires, or None
+        """
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            self.stats.record("sets")
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.record("evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteCache(BaseCache):
+    """
+    On-disk cache backed by SQLite, with TTL expiry and LRU eviction.
+    """
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._conn.commit()
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.record("misses")
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.record("expirations")
+                self.stats.record("misses")
+                return None
+
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        self.stats.record("hits")
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self.set_entry(key, value, self._expires_at(ttl_seconds))
+
+    def set_entry(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """
+        Store a value with an absolute expiry time.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value to store
+            expires_at: Unix timestamp after which the entry expires, or None
+        """
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, time.time())
+            )
+
+            # Evict the least recently used entries beyond the size bound
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,)
+                )
+                self.stats.record("evictions", overflow)
+
+            self._conn.commit()
+        self.stats.record("sets")
+
+    def purge_expired(self) -> int:
+        """
+        Delete all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+        self.stats.record("expirations", cursor.rowcount)
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+class TieredCache(BaseCache):
+    """
+    Two-tier cache: a fast in-memory LRU in front of a persistent SQLite store.
+    Disk hits are promoted into memory with their remaining TTL.
+    """
+    def __init__(self, memory: MemoryCache, disk: SQLiteCache):
+        super().__init__(disk.ttl_seconds)
+        self.memory = memory
+        self.disk = disk
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        entry = self.memory.get_entry(key)
+        if entry is None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                self.memory.set_entry(key, *entry)
+
+        self.stats.record("hits" if entry is not None else "misses")
+        return entry
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = self._expires_at(ttl_seconds)
+        self.memory.set_entry(key, value, expires_at)
+        self.disk.set_entry(key, value, expires_at)
+        self.stats.record("sets")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
+
+    def __len__(self) -> int:
+        return len(self.disk)
+
+def create_cache(
+    max_entries: int,
+    ttl_seconds: Optional[float] = None,
+    path: Optional[str] = None,
+    memory_entries: int = 512
+) -> BaseCache:
+    """
+    Create a cache from configuration values.
+
+    Args:
+        max_entries: Maximum number of entries kept on disk
+        ttl_seconds: Time to live of entries, None for no expiry
+        path: SQLite file for the on-disk tier; memory only if empty
+        memory_entries: Maximum number of entries kept in memory
+
+    Returns:
+        A memory-only or tiered cache
+    """
+    memory = MemoryCache(max_entries=min(memory_entries, max_entries), ttl_seconds=ttl_seconds)
+    if not path:
+        return memory
+
+    logger.info(f"Using on-disk cache at {path}")
+    return TieredCache(memory, SQLiteCache(path, max_entries=max_entries, ttl_seconds=ttl_seconds))
@@ -0,0 +1,171 @@
+"""
+Workflow checkpointing for the AI Agentic Research System.
+Persists the state after every workflow node so failed or interrupted runs
+can resume from the last completed node.
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.serde.jsonplus import JsonPlusSerializer
+
+from models.search import SearchGroup, SearchHit
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+class StateSerializer(JsonPlusSerializer):
+    """
+    Checkpoint serializer that stores search groups and hits as plain JSON
+    objects instead of constructor calls. AgentState converts them back to
+    search groups when a run is resumed.
+    """
+    def _default(self, obj):
+        if isinstance(obj, (SearchGroup, SearchHit)):
+            return obj.to_dict()
+        return super()._default(obj)
+
+class CheckpointStore(SqliteSaver):
+    """
+    SQLite checkpoint saver that can be shared by threads and the event loop.
+
+    LangGraph's SqliteSaver only serializes writes and has no async methods
+    (AsyncSqliteSaver needs the aiosqlite package). This subclass also
+    serializes reads and runs the async methods on the default executor, so
+    one store serves sync, async and concurrent workflow runs. Checkpoints
+    are keyed by run ID (LangGraph's "thread_id").
+
+    Successful runs delete their checkpoints; failed runs keep them so they
+    can be resumed. With `ttl_seconds`, runs not checkpointed for that long
+    are deleted, checked at most every `min(ttl_seconds, 1 hour)` when a
+    checkpoint is saved.
+    """
+    def __init__(self, path: str = ":memory:", ttl_seconds: Optional[float] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(sqlite3.connect(path, check_same_thread=False), serde=StateSerializer())
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._last_expired = float("-inf")
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        # Last checkpoint time of every run, for expiring the runs nobody resumed
+        self.conn.execute("CREATE TABLE IF NOT EXISTS runs (thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL)")
+        self.conn.execute(
+            "INSERT OR IGNORE INTO runs (thread_id, updated_at) SELECT DISTINCT thread_id, ? FROM checkpoints",
+            (time.time(),)
+        )
+        self.conn.commit()
+
+    def put(self, config: RunnableConfig, checkpoint: Any, metadata: Any) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata)
+        with self.lock, self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO runs (thread_id, updated_at) VALUES (?, ?)",
+                (str(config["configurable"]["thread_id"]), time.time())
+            )
+        if self.ttl_seconds is not None and time.monotonic() - self._last_expired >= min(self.ttl_seconds, 3600):
+            self.delete_expired()
+        return saved
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self.lock:
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        with self.lock:
+            checkpoints = list(super().list(config, filter=filter, before=before, limit=limit))
+        return iter(checkpoints)
+
+    async def _run(self, fn, *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, partial(fn, *args, **kwargs))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._run(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoints = await self._run(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(self, config: RunnableConfig, checkpoint: Any, metadata: Any) -> RunnableConfig:
+        return await self._run(self.put, config, checkpoint, metadata)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Any, task_id: str) -> None:
+        return await self._run(self.put_writes, config, writes, task_id)
+
+    def delete_run(self, run_id: str) -> None:
+        """
+        Delete all checkpoints of a run.
+
+        Args:
+            run_id: ID of the run
+        """
+        with self.lock, self.cursor() as cur:
+            cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (run_id,))
+            cur.execute("DELETE FROM writes WHERE thread_id = ?", (run_id,))
+            cur.execute("DELETE FROM runs WHERE thread_id = ?", (run_id,))
+
+    async def adelete_run(self, run_id: str) -> None:
+        """
+        Delete all checkpoints of a run on the default executor.
+
+        Args:
+            run_id: ID of the run
+        """
+        await self._run(self.delete_run, run_id)
+
+    def delete_expired(self) -> List[str]:
+        """
+        Delete the checkpoints of runs not checkpointed within `ttl_seconds`.
+
+        Returns:
+            IDs of the deleted runs
+        """
+        self._last_expired = time.monotonic()
+        if self.ttl_seconds is None:
+            return []
+
+        cutoff = time.time() - self.ttl_seconds
+        with self.lock, self.cursor() as cur:
+            expired = [(run_id,) for (run_id,) in cur.execute("SELECT thread_id FROM runs WHERE updated_at < ?", (cutoff,))]
+            for table in ("checkpoints", "writes", "runs"):
+                cur.executemany(f"DELETE FROM {table} WHERE thread_id = ?", expired)
+        if expired:
+            logger.info(f"Deleted the checkpoints of {len(expired)} expired runs")
+        return [run_id for (run_id,) in expired]
+
+    def count_runs(self) -> int:
+        """
+        Count the runs that have checkpoints.
+
+        Returns:
+            Number of runs
+        """
+        with self.lock, self.cursor(transaction=False) as cur:
+            return cur.execute("SELECT COUNT(DISTINCT thread_id) FROM checkpoints").fetchone()[0]
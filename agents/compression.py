@@ -0,0 +1,120 @@
+"""
+Extractive compression for the AI Agentic Research System.
+Shrinks long source content to the sentences most relevant to the query,
+instead of cutting it off at a length limit.
+"""
+import re
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from agents.embeddings import key_terms
+from agents.utils import truncate_text
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\s*\n\s*\n\s*")
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences at sentence terminators and blank lines.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Non-empty sentences, in order
+    """
+    return [sentence.strip() for sentence in _SENTENCE_BREAK.split(text) if sentence.strip()]
+
+def score_sentences(sentences: Sequence[str], queries: Sequence[str]) -> np.ndarray:
+    """
+    Score sentences against queries with BM25.
+
+    Sentences are the documents: a term is weighted by how few sentences of
+    the text mention it, and by how often it occurs in the queries. Only the
+    query terms are counted, so the term matrix has one column per query
+    term.
+
+    Args:
+        sentences: Sentences of one text
+        queries: The user query and the search queries that found the text
+
+    Returns:
+        float64 array with the score of each sentence
+    """
+    weights: Dict[str, int] = {}
+    for query in queries:
+        for term in key_terms(query):
+            weights[term] = weights.get(term, 0) + 1
+    if not sentences or not weights:
+        return np.zeros(len(sentences))
+
+    columns = {term: column for column, term in enumerate(weights)}
+    tf = np.zeros((len(sentences), len(columns)))
+    lengths = np.zeros(len(sentences))
+    for row, sentence in enumerate(sentences):
+        terms = key_terms(sentence)
+        lengths[row] = len(terms)
+        for term in terms:
+            column = columns.get(term)
+            if column is not None:
+                tf[row, column] += 1
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(sentences) - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    saturated = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+    return saturated @ (idf * np.fromiter(weights.values(), dtype=np.float64))
+
+def compress_text(
+    text: str,
+    queries: Sequence[str],
+    budget: int,
+    length: Callable[[str], int] = len,
+    truncate: Callable[[str, int], str] = truncate_text
+) -> str:
+    """
+    Shrink text to its sentences most relevant to the queries.
+
+    Sentences are picked by BM25 score until the budget is full and are
+    kept in their original order. Text that already fits is returned as is.
+    Text whose sentences do not mention any query term, or whose relevant
+    sentences are all longer than the budget, is truncated instead.
+
+    Args:
+        text: Text to compress
+        queries: The user query and the search queries that found the text
+        budget: Maximum size of the result, measured by `length`
+        length: Size of a text, e.g. characters or tokens
+        truncate: Fallback that cuts a text to a size
+
+    Returns:
+        Compressed text
+    """
+    if budget <= 0:
+        return ""
+    if length(text) <= budget:
+        return text
+
+    sentences = split_sentences(text)
+    scores = score_sentences(sentences, queries)
+    if not len(scores) or scores.max() <= 0:
+        return truncate(text, budget)
+
+    kept = []
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if scores[index] <= 0:
+            break
+        # One more for the space joining the sentences
+        size = length(sentences[index]) + 1
+        if used + size <= budget:
+            kept.append(index)
+            used += size
+
+    if not kept:
+        return truncate(text, budget)
+    return " ".join(sentences[index] for index in sorted(kept))
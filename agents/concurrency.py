@@ -0,0 +1,96 @@
+"""
+Concurrency helpers for the AI Agentic Research System.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight wait for and share its result or exception. Works
+    across threads and event loops, so sync and async callers can share the
+    same in-flight call.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being executed."""
+        return len(self._calls)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn` unless a call with the same key is already in flight.
+
+        Args:
+            key: Key identifying the work
+            fn: Callable doing the work
+
+        Returns:
+            Result of the (possibly shared) call
+        """
+        future, leader = self._claim(key)
+        if not leader:
+            logger.debug(f"Joining in-flight call for key {key[:12]}")
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._release(key)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await `fn()` unless a call with the same key is already in flight.
+
+        Args:
+            key: Key identifying the work
+            fn: Coroutine function doing the work
+
+        Returns:
+            Result of the (possibly shared) call
+        """
+        future, leader = self._claim(key)
+        if not leader:
+            logger.debug(f"Joining in-flight call for key {key[:12]}")
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._release(key)
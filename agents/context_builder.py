@@ -0,0 +1,79 @@
+"""
+Context assembly for the AI Agentic Research System.
+Formats the sources of the drafting prompt, reusing the formatted text of
+sources that were formatted before.
+"""
+from typing import Any, List, Mapping, Optional
+
+from agents.cache import MemoryCache
+
+def format_source(source: Mapping[str, Any]) -> str:
+    """
+    Format a source for the drafting prompt, without its "Source N:" header.
+    
+    Args:
+        source: Source with title, content and url
+    
+    Returns:
+        Formatted source
+    """
+    return f"Title: {source['title']}\nContent: {source['content']}\nURL: {source['url']}\n\n"
+
+def source_header(number: int) -> str:
+    """
+    Build the header numbering a source in the drafting prompt.
+    
+    Args:
+        number: 1-based position of the source
+    
+    Returns:
+        Header line
+    """
+    return f"Source {number}:\n"
+
+class ContextBuilder:
+    """
+    Builds the research results section of the drafting prompt.
+    
+    The formatted text of each source is cached by (title, url, content), so
+    re-drafting or drafting after another research round only formats the
+    sources that changed. Python caches the hash of a string, so looking up a
+    source whose content string was seen before does not rescan the content.
+    The numbering depends on a source's position and is not cached. The
+    context is assembled with a single join.
+    """
+    def __init__(self, max_entries: int = 1024, cache: Optional[MemoryCache] = None):
+        self.cache = cache if cache is not None else MemoryCache(max_entries=max_entries)
+    
+    def segment(self, source: Mapping[str, Any]) -> str:
+        """
+        Get the formatted text of a source.
+        
+        Args:
+            source: Source with title, content and url
+        
+        Returns:
+            Formatted source, without its header
+        """
+        key = (source["title"], source["url"], source["content"])
+        segment = self.cache.get(key)
+        if segment is None:
+            segment = format_source(source)
+            self.cache.set(key, segment)
+        return segment
+    
+    def build(self, sources: List[Mapping[str, Any]]) -> str:
+        """
+        Format the sources as the research results of the drafting prompt.
+        
+        Args:
+            sources: Sources to format, with content already fitted
+        
+        Returns:
+            Formatted research results
+        """
+        parts = []
+        for number, source in enumerate(sources, 1):
+            parts.append(source_header(number))
+            parts.append(self.segment(source))
+        return "".join(parts)
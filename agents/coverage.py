@@ -0,0 +1,92 @@
+"""
+Research coverage checks for the AI Agentic Research System.
+Cheap lexical heuristics that decide whether another round of searches is
+worth running, without calling an LLM.
+"""
+from typing import Any, Dict, Iterable, List, Set
+
+from agents.embeddings import key_terms
+from agents.utils import canonicalize_url
+
+# Words that shape the question rather than name its topic; source text
+# rarely repeats them, so they are not coverage terms
+QUERY_FORM_WORDS = frozenset(
+    "explain describe tell show give list summarize summary overview compare comparison versus vs "
+    "latest recent newest current today please know learn find information info detail".split()
+)
+
+def coverage_terms(query: str) -> List[str]:
+    """
+    Get the terms of a query that the gathered pages should mention.
+
+    Args:
+        query: The original user query
+
+    Returns:
+        Distinct key terms of the query without query-form words, in order
+    """
+    return [term for term in dict.fromkeys(key_terms(query)) if term not in QUERY_FORM_WORDS]
+
+def assess_coverage(query: str, research_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Measure how many key terms of a query the gathered pages mention.
+
+    Terms no page mentions point at aspects of the query the searches missed.
+
+    Args:
+        query: The original user query
+        research_results: Search groups gathered so far
+
+    Returns:
+        Dictionary with "coverage", the fraction of the query's coverage terms
+        found in the titles and contents of the hits (1.0 for a query
+        without key terms), and "missing_terms", the terms not found
+    """
+    terms = coverage_terms(query)
+    if not terms:
+        return {"coverage": 1.0, "missing_terms": []}
+
+    found: Set[str] = set()
+    for group in research_results:
+        for hit in group.get("results", []):
+            found.update(key_terms(f"{hit.get('title') or ''} {hit.get('content') or ''}"))
+
+    missing = [term for term in terms if term not in found]
+    return {
+        "coverage": round(1 - len(missing) / len(terms), 4),
+        "missing_terms": missing
+    }
+
+def result_urls(research_results: Iterable[Dict[str, Any]]) -> Set[str]:
+    """
+    Collect the canonical URLs of the hits in search groups.
+
+    Args:
+        research_results: Search groups
+
+    Returns:
+        Set of canonical URLs
+    """
+    return {
+        canonicalize_url(hit["url"])
+        for group in research_results
+        for hit in group.get("results", [])
+        if hit.get("url")
+    }
+
+def novel_url_ratio(round_results: List[Dict[str, Any]], seen_urls: Set[str]) -> float:
+    """
+    Measure the fraction of the pages found by a research round that earlier
+    rounds had not found.
+
+    Args:
+        round_results: Search groups of the round
+        seen_urls: Canonical URLs found by earlier rounds
+
+    Returns:
+        Fraction of novel URLs, 0.0 if the round found no pages
+    """
+    urls = result_urls(round_results)
+    if not urls:
+        return 0.0
+    return round(len(urls - seen_urls) / len(urls), 4)
@@ -0,0 +1,394 @@
+"""
+Local document store for the AI Agentic Research System.
+Indexes fetched search results as embedded chunks so later research can
+retrieve them instead of searching the web again.
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from agents.embeddings import Embedder
+from agents.utils import canonicalize_url
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+def chunk_text(text: str, chunk_chars: int = 800, overlap_chars: int = 100) -> List[str]:
+    """
+    Split text into overlapping chunks, breaking at whitespace where possible.
+
+    Args:
+        text: Text to split
+        chunk_chars: Maximum length of a chunk
+        overlap_chars: Number of characters repeated at the start of the next chunk
+
+    Returns:
+        List of chunks; empty for blank text
+    """
+    text = " ".join(text.split())
+    if len(text) <= chunk_chars:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            boundary = text.rfind(" ", start + 1, end)
+            if boundary > start + overlap_chars:
+                end = boundary
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        next_start = text.find(" ", max(start + 1, end - overlap_chars), end)
+        start = next_start + 1 if next_start != -1 else end
+    return chunks
+
+class DocumentStore:
+    """
+    Persistent index of fetched documents, searchable by embedding similarity.
+
+    Every search hit is split into chunks whose embeddings are appended to a
+    float32 matrix in `<path>/vectors.f32` (`vectors.<n>.f32` once compacted). The matrix is memory-mapped, so
+    the corpus is not read into memory and a search is a single
+    matrix-vector product. Chunk text, title, URL and fetch time live in
+    `<path>/chunks.sqlite`, keyed by row of the matrix. Re-adding a URL
+    replaces its chunks; the old rows are no longer returned, and once they
+    outnumber the live rows (and there are at least `compaction_min_rows` of
+    them) the matrix is rewritten to a new file without them, which replaces
+    the old one when the renumbered chunks are committed. Without a path the
+    store is kept in memory.
+
+    Several processes can share a store: writes hold SQLite's write lock
+    while appending to the matrix, and take the next row from SQLite, so
+    rows are never allocated twice. Every write bumps a generation counter;
+    a process that sees another generation reloads its view of the rows.
+    """
+    def __init__(
+        self,
+        embedder: Embedder,
+        path: Optional[str] = None,
+        chunk_chars: int = 800,
+        overlap_chars: int = 100,
+        compaction_min_rows: int = 1024
+    ):
+        self.embedder = embedder
+        self.path = path
+        self.chunk_chars = chunk_chars
+        self.overlap_chars = overlap_chars
+        self.compaction_min_rows = compaction_min_rows
+        self._vectors_path: Optional[str] = None
+        self._row_bytes = 4 * embedder.dim
+        self._lock = threading.Lock()
+
+        if path:
+            os.makedirs(path, exist_ok=True)
+        # Transactions are explicit, so writes can hold the write lock across the vector file update
+        self._conn = sqlite3.connect(
+            os.path.join(path, "chunks.sqlite") if path else ":memory:",
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_key ON chunks (key)")
+
+        self._vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+        # Fetch time of every matrix row; NaN marks replaced rows
+        self._fetched_at = np.zeros(0, dtype=np.float64)
+        self._generation = -1
+        self._load()
+
+    def _get_meta(self, key: str, default: int = 0) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row is not None else default
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _load(self) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'embedder'").fetchone()
+                if row is not None and row[0] != self.embedder.name:
+                    logger.warning(f"Document store at {self.path} uses embedder {row[0]}, re-indexing from scratch")
+                    self._conn.execute("DELETE FROM chunks")
+                    self._conn.execute("DELETE FROM meta")
+                    self._remove_vector_files()
+                self._set_meta("embedder", self.embedder.name)
+                self._vectors_path = self._current_vectors_path()
+                if self._conn.execute("SELECT 1 FROM meta WHERE key = 'next_row'").fetchone() is None:
+                    # Stores written before rows were allocated in SQLite
+                    last = self._conn.execute("SELECT MAX(row) FROM chunks").fetchone()[0]
+                    self._set_meta("next_row", max(self._file_rows(), -1 if last is None else last + 1))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._reload()
+
+        if len(self._fetched_at):
+            logger.info(f"Loaded document store with {len(self)} chunks")
+
+    def _current_vectors_path(self) -> Optional[str]:
+        """Path of the vector file recorded in SQLite."""
+        if not self.path:
+            return None
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'vectors_file'").fetchone()
+        return os.path.join(self.path, row[0] if row is not None else "vectors.f32")
+
+    def _remove_vector_files(self, keep: Optional[str] = None) -> None:
+        """Remove vector files other than `keep`."""
+        if not self.path:
+            return
+        for name in os.listdir(self.path):
+            file = os.path.join(self.path, name)
+            if name.startswith("vectors.") and name.endswith(".f32") and file != keep:
+                try:
+                    os.remove(file)
+                except OSError as e:
+                    logger.warning(f"Failed to remove old vector file {file}: {str(e)}")
+
+    def _file_rows(self) -> int:
+        """Number of complete rows in the vector file."""
+        if not self._vectors_path or not os.path.exists(self._vectors_path):
+            return 0
+        return os.path.getsize(self._vectors_path) // self._row_bytes
+
+    def _map_vectors(self) -> int:
+        """Memory-map the vector file and return its number of rows."""
+        if not self._vectors_path:
+            return len(self._vectors)
+
+        rows = self._file_rows()
+        if rows:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dim))
+        else:
+            self._vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return rows
+
+    def _reload(self) -> None:
+        """Reload the matrix and the fetch times of its rows from disk. Must hold the lock."""
+        self._conn.execute("BEGIN")
+        try:
+            generation = self._get_meta("generation")
+            self._vectors_path = self._current_vectors_path()
+            rows = min(self._get_meta("next_row"), self._map_vectors())
+            fetched_at = np.full(rows, np.nan)
+            for row, fetched in self._conn.execute("SELECT row, fetched_at FROM chunks WHERE row < ?", (rows,)):
+                fetched_at[row] = fetched
+        finally:
+            self._conn.execute("COMMIT")
+        self._fetched_at = fetched_at
+        self._generation = generation
+
+    def _sync(self) -> None:
+        """Reload if the store was written by another process. Must hold the lock."""
+        if self._get_meta("generation") != self._generation:
+            self._reload()
+
+    def _write_vectors(self, first: int, vectors: np.ndarray) -> None:
+        """Write rows to the matrix from row `first` on. Must hold the lock and the write transaction."""
+        if self._vectors_path:
+            with open(self._vectors_path, "r+b" if os.path.exists(self._vectors_path) else "wb") as f:
+                # Rows past `first` were left by a write that did not commit
+                f.seek(first * self._row_bytes)
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                f.truncate()
+            self._map_vectors()
+        else:
+            self._vectors = np.vstack([self._vectors[:first], vectors])
+
+    def _compact(self, rows: int, generation: int) -> int:
+        """
+        Write the matrix without replaced rows to a new file and renumber the chunks.
+        Must hold the lock and the write transaction; the new file is only
+        used once the transaction commits.
+
+        Args:
+            rows: Number of allocated rows
+            generation: Generation of the store after the write
+
+        Returns:
+            Number of rows after compaction
+        """
+        live = [row for (row,) in self._conn.execute("SELECT row FROM chunks WHERE row < ? ORDER BY row", (rows,))]
+        kept = np.asarray(self._vectors[live], dtype=np.float32)
+        if self.path:
+            name = f"vectors.{generation}.f32"
+            with open(os.path.join(self.path, name), "wb") as f:
+                f.write(kept.tobytes())
+            self._set_meta("vectors_file", name)
+        else:
+            self._vectors = kept
+        # Rows only move down and in order, so no row is taken when it is renumbered
+        self._conn.executemany(
+            "UPDATE chunks SET row = ? WHERE row = ?",
+            [(new, old) for new, old in enumerate(live) if new != old]
+        )
+        logger.info(f"Compacted document store from {rows} to {len(live)} rows")
+        return len(live)
+
+    def add(self, results: List[Dict[str, Any]]) -> int:
+        """
+        Index search hits, replacing earlier versions of the same pages.
+
+        Args:
+            results: Search hits with title, content and url
+
+        Returns:
+            Number of chunks indexed
+        """
+        now = time.time()
+        chunks = []
+        keys = set()
+        for result in results:
+            url = result.get("url") or ""
+            key = canonicalize_url(url) if url else ""
+            if not key or key in keys:
+                continue
+            keys.add(key)
+            title = result.get("title") or "No title"
+            for chunk in chunk_text(result.get("content") or "", self.chunk_chars, self.overlap_chars):
+                chunks.append((key, url, title, chunk))
+        if not chunks:
+            return 0
+
+        vectors = self.embedder.embed([f"{title}\n{chunk}" for _, _, title, chunk in chunks])
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have compacted the store into a new file
+                self._vectors_path = self._current_vectors_path()
+                self._map_vectors()
+                generation = self._get_meta("generation") + 1
+                placeholders = ",".join("?" * len(keys))
+                self._conn.execute(f"DELETE FROM chunks WHERE key IN ({placeholders})", tuple(keys))
+
+                first = self._get_meta("next_row")
+                self._write_vectors(first, vectors)
+                self._conn.executemany(
+                    "INSERT INTO chunks (row, key, url, title, content, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(first + i, *chunk) + (now,) for i, chunk in enumerate(chunks)]
+                )
+                rows = first + len(chunks)
+
+                live = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+                replaced = rows - live
+                compacted = replaced >= self.compaction_min_rows and replaced > live
+                if compacted:
+                    rows = self._compact(rows, generation)
+
+                self._set_meta("next_row", rows)
+                self._set_meta("generation", generation)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._reload()
+            if compacted:
+                # Processes still mapping the old file keep reading it until they reload
+                self._remove_vector_files(keep=self._vectors_path)
+
+        return len(chunks)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        min_similarity: float = 0.0,
+        max_age_seconds: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the pages most similar to a query.
+
+        Args:
+            query: Search query
+            k: Maximum number of pages to return
+            min_similarity: Minimum cosine similarity of a chunk to the query
+            max_age_seconds: Ignore pages fetched longer ago than this
+
+        Returns:
+            Search hits like Tavily's, best first, with title, url, content
+            (the best matching chunk), score (its similarity) and fetched_at
+        """
+        vector = self.embedder.embed([query])[0]
+        with self._lock:
+            self._sync()
+            while True:
+                rows = len(self._fetched_at)
+                if not rows:
+                    return []
+
+                similarities = np.asarray(self._vectors[:rows] @ vector)
+                valid = ~np.isnan(self._fetched_at) & (similarities >= min_similarity)
+                if max_age_seconds is not None:
+                    valid &= self._fetched_at >= time.time() - max_age_seconds
+                candidates = np.flatnonzero(valid)
+                if not len(candidates):
+                    return []
+
+                # Pages have several chunks, so look at more chunks than pages wanted
+                candidates = candidates[np.argsort(-similarities[candidates], kind="stable")[:k * 4]]
+                placeholders = ",".join("?" * len(candidates))
+                self._conn.execute("BEGIN")
+                try:
+                    vectors_path = self._current_vectors_path()
+                    chunks = {
+                        row: (key, url, title, content, fetched_at)
+                        for row, key, url, title, content, fetched_at in self._conn.execute(
+                            f"SELECT row, key, url, title, content, fetched_at FROM chunks WHERE row IN ({placeholders})",
+                            tuple(int(row) for row in candidates)
+                        )
+                    }
+                finally:
+                    self._conn.execute("COMMIT")
+                if vectors_path == self._vectors_path:
+                    break
+                # Another process compacted the store, so the rows were renumbered
+                self._reload()
+
+        hits: Dict[str, Dict[str, Any]] = {}
+        for row in candidates:
+            chunk = chunks.get(int(row))
+            if chunk is None:
+                # Replaced by another process since the last reload
+                continue
+            key, url, title, content, fetched_at = chunk
+            if key not in hits:
+                hits[key] = {
+                    "title": title,
+                    "url": url,
+                    "content": content,
+                    "score": round(float(similarities[row]), 4),
+                    "fetched_at": fetched_at
+                }
+                if len(hits) == k:
+                    break
+        return list(hits.values())
+
+    def __len__(self) -> int:
+        """Number of indexed chunks."""
+        with self._lock:
+            self._sync()
+            return int(np.count_nonzero(~np.isnan(self._fetched_at)))
@@ -2,30 +2,77 @@
 Drafting Agent implementation for the AI Agentic Research System.
 Responsible for synthesizing research results into a coherent answer.
 """
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
+import re
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 
 from models.state import AgentState
-from config.settings import get_settings
-from agents.utils import format_error, truncate_text
+from config.settings import get_settings, stage_model
+from agents.utils import format_error, truncate_text, build_run_config, get_event_callback, emit_event
+from agents.cache import BaseCache
+from agents.llm_cache import CachedChatModel
+from agents.resilience import ResilientChatModel, Upstream
+from agents.sources import consolidate_sources
+from agents.context_builder import ContextBuilder
+from agents.token_budget import pack_sources, count_tokens, truncate_to_tokens
+from agents.compression import compress_text
+from agents.metrics import get_metrics, timed
 
 # Get logger
 logger = logging.getLogger(__name__)
 
+# Citations such as [Source 3] or [Sources 1, 4]
+_CITATION = re.compile(r"\[(Sources?) (\d+(?:\s*,\s*\d+)*)\]")
+
+def remap_citations(text: str, numbers: List[int]) -> str:
+    """
+    Renumber the [Source X] citations of a text.
+    
+    Args:
+        text: Text citing sources by their position in a group, starting at 1
+        numbers: Number of each source of the group in the full source list
+        
+    Returns:
+        Text citing the full source list; out-of-range citations are kept as is
+    """
+    def renumber(match: "re.Match") -> str:
+        cited = []
+        for number in re.findall(r"\d+", match.group(2)):
+            local = int(number)
+            cited.append(str(numbers[local - 1]) if 1 <= local <= len(numbers) else number)
+        return f"[{match.group(1)} {', '.join(cited)}]"
+    
+    return _CITATION.sub(renumber, text)
+
 class DraftingAgent:
     """
     Agent responsible for synthesizing research results into a coherent answer.
     """
-    def __init__(self, llm=None):
+    def __init__(
+        self,
+        llm=None,
+        llm_cache: Optional[BaseCache] = None,
+        llm_upstream: Optional[Upstream] = None
+    ):
         settings = get_settings()
         
-        # Initialize LLM
-        self.llm = llm or ChatOpenAI(
-            model=settings.default_model,
-            temperature=settings.drafting_agent_temperature
-        )
+        # Initialize LLM (the OpenAI client is only imported when it is needed)
+        if llm is None:
+            from langchain_openai import ChatOpenAI
+            llm = ChatOpenAI(
+                model=stage_model(settings, "drafting"),
+                temperature=settings.drafting_agent_temperature,
+                timeout=settings.llm_timeout_seconds,
+                # Retries are left to the resilience layer when one is configured
+                max_retries=0 if llm_upstream is not None else 2
+            )
+        self.llm = llm
+        
+        # Formatted sources are reused across drafts and research rounds
+        self.context_builder = ContextBuilder(settings.context_cache_entries)
         
         # Setup the drafting prompt
         self.drafting_prompt = ChatPromptTemplate.from_template(
@@ -52,20 +99,480 @@ class DraftingAgent:
         )
         
         # Create the drafting chain
-        self.drafting_chain = self.drafting_prompt | self.llm
+        model = self.llm
+        if llm_upstream is not None:
+            model = ResilientChatModel(model, llm_upstream, settings.llm_completion_token_estimate)
+        model = CachedChatModel(model, llm_cache) if llm_cache is not None else model
+        self.drafting_chain = self.drafting_prompt | model
+        
+        # Setup the chain summarizing a group of sources in map-reduce drafting
+        self.summary_prompt = ChatPromptTemplate.from_template(
+            """
+            You are an expert researcher. Extract the information from the research results below that helps
+            answer the original query.
+            
+            ORIGINAL QUERY: {query}
+            
+            RESEARCH RESULTS:
+            {research_results}
+            
+            Write a concise summary of the relevant facts, figures and findings. Cite every fact with the source
+            it comes from using [Source X] notation, with the source numbers given above.
+            If none of the sources is relevant to the query, reply "No relevant information."
+            """
+        )
+        self.summary_chain = self.summary_prompt | model
+    
+    def _prepare_sources(self, state: AgentState) -> List[Dict[str, Any]]:
+        """
+        Collect the sources to draft from.
+        
+        Search hits are deduplicated by canonical URL and ranked by score and
+        by how many sub-queries returned them. The best sources are then
+        packed into the drafting token budget, giving higher-ranked sources
+        more room. With a budget of 0 each source is cut to
+        `max_source_content_length` characters instead. Content longer than
+        its share is compressed to its sentences most relevant to the query.
+        
+        Args:
+            state: Current state of the agent system with research results
+            
+        Returns:
+            List of ranked sources with title, content and url
+        """
+        settings = get_settings()
+        return self._fit_sources(state, self._rank_sources(state, settings.max_drafting_sources))
+    
+    def _rank_sources(self, state: AgentState, max_sources: int) -> List[Dict[str, Any]]:
+        """
+        Deduplicate and rank the search hits and keep the best sources.
+        
+        Args:
+            state: Current state of the agent system with research results
+            max_sources: Maximum number of sources to keep
+            
+        Returns:
+            List of ranked sources with title, content, url and queries
+        """
+        settings = get_settings()
+        
+        all_results = consolidate_sources(
+            state.research_results,
+            frequency_weight=settings.source_frequency_weight
+        )
+        
+        # Keep the best sources to fit the context window
+        if len(all_results) > max_sources:
+            logger.info(f"Selecting top {max_sources} of {len(all_results)} sources")
+            all_results = all_results[:max_sources]
+        
+        return all_results
+    
+    def _fit_sources(self, state: AgentState, all_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fit ranked sources into the drafting token budget.
+        
+        Args:
+            state: Current state of the agent system
+            all_results: Ranked sources
+            
+        Returns:
+            The sources that fit, in rank order, with their content fitted
+        """
+        settings = get_settings()
+        
+        if settings.drafting_context_token_budget <= 0:
+            return [
+                {**result, "content": self._fit_content(state, result, settings.max_source_content_length, len, truncate_text)}
+                for result in all_results
+            ]
+        
+        model = stage_model(settings, "drafting")
+        packed, tokens_used = pack_sources(
+            all_results,
+            budget_tokens=settings.drafting_context_token_budget,
+            model=model,
+            min_tokens=settings.drafting_source_min_tokens,
+            max_tokens=settings.drafting_source_max_tokens,
+            decay=settings.drafting_source_budget_decay,
+            fit=lambda source, tokens: self._fit_content(
+                state,
+                source,
+                tokens,
+                lambda text: count_tokens(text, model),
+                lambda text, max_tokens: truncate_to_tokens(text, max_tokens, model)
+            )
+        )
+        logger.info(f"Packed {len(packed)} sources into {tokens_used} tokens")
+        return packed
+    
+    def _fit_content(
+        self,
+        state: AgentState,
+        source: Dict[str, Any],
+        budget: int,
+        length: Callable[[str], int],
+        truncate: Callable[[str, int], str]
+    ) -> str:
+        """
+        Fit the content of a source to a budget.
+        
+        Args:
+            state: Current state of the agent system
+            source: Source with content and the sub-queries that found it
+            budget: Maximum size of the content, measured by `length`
+            length: Size of a text, in characters or tokens
+            truncate: Cuts a text to a size
+            
+        Returns:
+            Content compressed to the sentences most relevant to the query
+            and the sub-queries, or truncated if compression is disabled
+        """
+        if not get_settings().compression_enabled:
+            return truncate(source["content"], budget)
+        return compress_text(source["content"], [state.query, *source.get("queries", [])], budget, length, truncate)
+    
+    def _format_sources(self, sources: List[Dict[str, Any]]) -> str:
+        """
+        Format the sources as text for the drafting prompt.
+        
+        Args:
+            sources: Sources to format, with content already fitted
+            
+        Returns:
+            Formatted research results
+        """
+        return self.context_builder.build(sources)
+    
+    def _build_inputs(self, state: AgentState) -> Tuple[Dict[str, Any], int]:
+        """
+        Select and format the sources and build the drafting prompt input.
+        
+        Args:
+            state: Current state of the agent system with research results
+            
+        Returns:
+            Tuple of the input variables for the drafting prompt and the
+            number of sources included
+        """
+        settings = get_settings()
+        
+        with timed("context_formatting", state) as details:
+            sources = self._prepare_sources(state)
+            formatted_results = self._format_sources(sources)
+            details["sources"] = len(sources)
+            details["context_tokens"] = count_tokens(formatted_results, stage_model(settings, "drafting"))
+        
+        get_metrics().observe("context_tokens", details["context_tokens"])
+        return {
+            "query": state.query,
+            "research_results": formatted_results
+        }, len(sources)
+    
+    def _source_groups(self, state: AgentState) -> Optional[List[Tuple[List[Dict[str, Any]], List[int]]]]:
+        """
+        Split the sources into groups for map-reduce drafting.
+        
+        Each group of `map_reduce_group_size` sources is fitted into the
+        drafting token budget on its own, so the number of sources is not
+        limited by the context window of a single prompt.
+        
+        Args:
+            state: Current state of the agent system with research results
+            
+        Returns:
+            List of (sources, numbers) tuples, where numbers are the positions
+            of the sources in the full ranking, or None if map-reduce drafting
+            is disabled or all sources fit in one group
+        """
+        settings = get_settings()
+        if not settings.map_reduce_drafting_enabled:
+            return None
+        
+        sources = self._rank_sources(state, settings.map_reduce_max_sources)
+        size = max(1, settings.map_reduce_group_size)
+        if len(sources) <= size:
+            return None
+        
+        groups = []
+        with timed("context_formatting", state) as details:
+            for start in range(0, len(sources), size):
+                fitted = self._fit_sources(state, sources[start:start + size])
+                if fitted:
+                    # Packing keeps a prefix of the ranked sources, so numbers stay contiguous
+                    groups.append((fitted, list(range(start + 1, start + len(fitted) + 1))))
+            details["sources"] = sum(len(group) for group, _ in groups)
+            details["groups"] = len(groups)
+        
+        logger.info(f"Drafting from {details['sources']} sources in {len(groups)} groups")
+        return groups
+    
+    def _summary_inputs(self, state: AgentState, groups: List[Tuple[List[Dict[str, Any]], List[int]]]) -> List[Dict[str, Any]]:
+        """
+        Build the input of the summary chain for each group.
+        
+        Args:
+            state: Current state of the agent system
+            groups: Source groups
+            
+        Returns:
+            Input variables for the summary prompt, one per group
+        """
+        return [
+            {"query": state.query, "research_results": self._format_sources(sources)}
+            for sources, _ in groups
+        ]
+    
+    def _check_summaries(self, outcomes: List[Any], details: Dict[str, Any]) -> List[Optional[str]]:
+        """
+        Log failed group summaries and fail if no group was summarized.
+        
+        Args:
+            outcomes: Summary of each group, or the exception raised for it
+            details: Details of the summarization stage
+            
+        Returns:
+            Summary of each group, None for the failed ones
+        """
+        failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        for failure in failures:
+            logger.warning(f"Summarizing a source group failed: {str(failure)}")
+        details["failed"] = len(failures)
+        if len(failures) == len(outcomes):
+            raise RuntimeError(f"All {len(outcomes)} source summaries failed. First error: {format_error(failures[0])}")
+        
+        return [None if isinstance(outcome, BaseException) else outcome for outcome in outcomes]
     
-    def process(self, state: AgentState) -> AgentState:
+    def _summarize_groups(
+        self,
+        state: AgentState,
+        groups: List[Tuple[List[Dict[str, Any]], List[int]]],
+        config: Optional[Dict[str, Any]]
+    ) -> List[Optional[str]]:
+        """
+        Summarize the source groups concurrently on a bounded thread pool.
+        
+        Args:
+            state: Current state of the agent system
+            groups: Source groups
+            config: Runnable config of the calling workflow node, if any
+            
+        Returns:
+            Summary of each group, None for the groups whose summary failed
+        """
+        settings = get_settings()
+        run_config = build_run_config(state, config)
+        
+        def summarize(inputs: Dict[str, Any]) -> str:
+            return self.summary_chain.invoke(inputs, config=run_config).content
+        
+        with timed("summarization", state, groups=len(groups)) as details:
+            max_workers = max(1, min(settings.map_reduce_concurrency, len(groups)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summary") as executor:
+                futures = [executor.submit(summarize, inputs) for inputs in self._summary_inputs(state, groups)]
+                outcomes = []
+                for future in futures:
+                    try:
+                        outcomes.append(future.result())
+                    except Exception as e:
+                        outcomes.append(e)
+            return self._check_summaries(outcomes, details)
+    
+    async def _asummarize_groups(
+        self,
+        state: AgentState,
+        groups: List[Tuple[List[Dict[str, Any]], List[int]]],
+        config: Optional[Dict[str, Any]]
+    ) -> List[Optional[str]]:
+        """
+        Summarize the source groups concurrently on the event loop.
+        
+        Args:
+            state: Current state of the agent system
+            groups: Source groups
+            config: Runnable config of the calling workflow node, if any
+            
+        Returns:
+            Summary of each group, None for the groups whose summary failed
+        """
+        settings = get_settings()
+        run_config = build_run_config(state, config)
+        semaphore = asyncio.Semaphore(max(1, settings.map_reduce_concurrency))
+        
+        async def summarize(inputs: Dict[str, Any]) -> str:
+            async with semaphore:
+                response = await self.summary_chain.ainvoke(inputs, config=run_config)
+                return response.content
+        
+        with timed("summarization", state, groups=len(groups)) as details:
+            outcomes = await asyncio.gather(
+                *(summarize(inputs) for inputs in self._summary_inputs(state, groups)),
+                return_exceptions=True
+            )
+            return self._check_summaries(list(outcomes), details)
+    
+    def _reduce_inputs(
+        self,
+        state: AgentState,
+        groups: List[Tuple[List[Dict[str, Any]], List[int]]],
+        summaries: List[Optional[str]]
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Build the drafting prompt input from the group summaries.
+        
+        Citations in the summaries are renumbered from the position of a
+        source in its group to its position in the full ranking, and the
+        sources are listed under those numbers so the answer can cite them.
+        
+        Args:
+            state: Current state of the agent system
+            groups: Source groups
+            summaries: Summary of each group, None for the failed ones
+            
+        Returns:
+            Tuple of the input variables for the drafting prompt and the
+            number of sources summarized
+        """
+        parts = []
+        listing = []
+        for (sources, numbers), summary in zip(groups, summaries):
+            if summary is None:
+                continue
+            parts.append(f"Summary of sources {numbers[0]}-{numbers[-1]}:\n{remap_citations(summary, numbers)}\n\n")
+            listing.extend(f"Source {number}: {source['title']} ({source['url']})\n" for source, number in zip(sources, numbers))
+        
+        parts.append("Source list:\n")
+        parts.extend(listing)
+        return {
+            "query": state.query,
+            "research_results": "".join(parts)
+        }, len(listing)
+    
+    def _record_answer_tokens(self, details: Dict[str, Any], final_answer: str) -> None:
+        """
+        Record the size of the generated answer in the drafting stage details.
+        
+        Args:
+            details: Details of the drafting stage
+            final_answer: Generated answer
+        """
+        settings = get_settings()
+        details["completion_tokens"] = count_tokens(final_answer, stage_model(settings, "drafting"))
+        get_metrics().increment("completion_tokens_total", details["completion_tokens"], {"stage": "drafting"})
+    
+    def _update_state(self, state: AgentState, final_answer: str, sources_used: int) -> AgentState:
+        """
+        Record the final answer on the state.
+        
+        Args:
+            state: Current state of the agent system
+            final_answer: Generated answer
+            sources_used: Number of sources included in the prompt
+            
+        Returns:
+            Updated state with final answer
+        """
+        logger.info(f"Final answer generated, length: {len(final_answer)} characters")
+        
+        # Update state with final answer
+        state.final_answer = final_answer
+        
+        # Add intermediate step
+        state.add_intermediate_step(
+            agent_name="drafting_agent",
+            action="synthesize",
+            details={
+                "sources_used": sources_used,
+                "answer_length": len(final_answer)
+            }
+        )
+        
+        return state
+    
+    def _handle_error(self, state: AgentState, e: Exception) -> AgentState:
+        """
+        Record an error raised while drafting on the state.
+        
+        Args:
+            state: Current state of the agent system
+            e: The exception that was raised
+            
+        Returns:
+            Updated state with the error
+        """
+        logger.error(f"Error in drafting agent: {str(e)}")
+        error_details = format_error(e)
+        
+        # Update state with error
+        state.error = f"Drafting agent error: {error_details}"
+        
+        # Add error to intermediate steps
+        state.add_intermediate_step(
+            agent_name="drafting_agent",
+            action="error",
+            details={"error": error_details}
+        )
+        
+        return state
+    
+    def _generate(self, inputs: Dict[str, Any], run_config: Dict[str, Any]) -> str:
+        """
+        Run the drafting chain, streaming tokens to the listener if there is one.
+        
+        Args:
+            inputs: Input variables for the drafting prompt
+            run_config: Runnable config of the request
+            
+        Returns:
+            The generated answer
+        """
+        if get_event_callback(run_config) is None:
+            return self.drafting_chain.invoke(inputs, config=run_config).content
+        
+        parts = []
+        for chunk in self.drafting_chain.stream(inputs, config=run_config):
+            if chunk.content:
+                parts.append(chunk.content)
+                emit_event(run_config, "token", content=chunk.content)
+        return "".join(parts)
+    
+    async def _agenerate(self, inputs: Dict[str, Any], run_config: Dict[str, Any]) -> str:
+        """
+        Asynchronously run the drafting chain, streaming tokens to the listener if there is one.
+        
+        Args:
+            inputs: Input variables for the drafting prompt
+            run_config: Runnable config of the request
+            
+        Returns:
+            The generated answer
+        """
+        if get_event_callback(run_config) is None:
+            response = await self.drafting_chain.ainvoke(inputs, config=run_config)
+            return response.content
+        
+        parts = []
+        async for chunk in self.drafting_chain.astream(inputs, config=run_config):
+            if chunk.content:
+                parts.append(chunk.content)
+                emit_event(run_config, "token", content=chunk.content)
+        return "".join(parts)
+    
+    def process(self, state: AgentState, config: Optional[Dict[str, Any]] = None) -> AgentState:
         """
         Process the research results and draft a comprehensive answer.
         
+        When a progress listener is registered in `config`, the answer is
+        streamed to it token by token as it is generated.
+        
         Args:
             state: Current state of the agent system with research results
+            config: Runnable config of the calling workflow node, if any
             
         Returns:
             Updated state with final answer
         """
         logger.info("Drafting agent processing research results")
-        settings = get_settings()
         
         try:
             # Check if we have research results
@@ -74,84 +581,99 @@ class DraftingAgent:
                 state.final_answer = "Unable to generate an answer as no research results were collected."
                 return state
             
-            # Extract all search results
-            all_results = []
-            for search_group in state.research_results:
-                for result in search_group["results"]:
-                    all_results.append({
-                        "title": result.get("title", "No title"),
-                        "content": result.get("content", "No content"),
-                        "url": result.get("url", "No URL")
-                    })
-            
-            # Truncate if too many results to fit context window
-            max_results = settings.max_drafting_sources
-            if len(all_results) > max_results:
-                logger.info(f"Truncating results from {len(all_results)} to {max_results}")
-                all_results = all_results[:max_results]
-                
-            # Convert results to formatted text
-            formatted_results = ""
-            for i, result in enumerate(all_results):
-                # Truncate content if too long
-                content = truncate_text(
-                    result["content"], 
-                    max_length=settings.max_source_content_length
-                )
-                
-                formatted_results += f"Source {i+1}:\nTitle: {result['title']}\nContent: {content}\nURL: {result['url']}\n\n"
+            groups = self._source_groups(state)
+            if groups:
+                # Map: summarize the source groups in parallel; reduce: draft from the summaries
+                summaries = self._summarize_groups(state, groups, config)
+                inputs, sources_used = self._reduce_inputs(state, groups, summaries)
+            else:
+                inputs, sources_used = self._build_inputs(state)
             
             # Generate comprehensive answer
             logger.info("Generating final answer")
-            response = self.drafting_chain.invoke({
-                "query": state.query,
-                "research_results": formatted_results
-            })
-            
-            final_answer = response.content
-            logger.info(f"Final answer generated, length: {len(final_answer)} characters")
-            
-            # Update state with final answer
-            state.final_answer = final_answer
-            
-            # Add intermediate step
-            state.add_intermediate_step(
-                agent_name="drafting_agent",
-                action="synthesize",
-                details={
-                    "sources_used": len(all_results),
-                    "answer_length": len(final_answer)
-                }
-            )
+            with timed("drafting", state) as details:
+                final_answer = self._generate(inputs, build_run_config(state, config))
+                self._record_answer_tokens(details, final_answer)
             
-            return state
+            return self._update_state(state, final_answer, sources_used)
             
         except Exception as e:
-            logger.error(f"Error in drafting agent: {str(e)}")
-            error_details = format_error(e)
+            return self._handle_error(state, e)
+    
+    async def aprocess(self, state: AgentState, config: Optional[Dict[str, Any]] = None) -> AgentState:
+        """
+        Asynchronously process the research results and draft a comprehensive answer.
+        
+        Args:
+            state: Current state of the agent system with research results
+            config: Runnable config of the calling workflow node, if any
             
-            # Update state with error
-            state.error = f"Drafting agent error: {error_details}"
+        Returns:
+            Updated state with final answer
+        """
+        logger.info("Drafting agent processing research results")
+        
+        try:
+            # Check if we have research results
+            if not state.research_results:
+                logger.warning("No research results to process")
+                state.final_answer = "Unable to generate an answer as no research results were collected."
+                return state
             
-            # Add error to intermediate steps
-            state.add_intermediate_step(
-                agent_name="drafting_agent",
-                action="error",
-                details={"error": error_details}
-            )
+            groups = self._source_groups(state)
+            if groups:
+                # Map: summarize the source groups in parallel; reduce: draft from the summaries
+                summaries = await self._asummarize_groups(state, groups, config)
+                inputs, sources_used = self._reduce_inputs(state, groups, summaries)
+            else:
+                inputs, sources_used = self._build_inputs(state)
             
-            return state
+            # Generate comprehensive answer
+            logger.info("Generating final answer")
+            with timed("drafting", state) as details:
+                final_answer = await self._agenerate(inputs, build_run_config(state, config))
+                self._record_answer_tokens(details, final_answer)
+            
+            return self._update_state(state, final_answer, sources_used)
+            
+        except Exception as e:
+            return self._handle_error(state, e)
 
-# Function for use in the LangGraph workflow
-def drafting_agent_node(state: AgentState) -> AgentState:
+# Functions for use in the LangGraph workflow
+def drafting_agent_node(
+    state: AgentState,
+    agent: Optional[DraftingAgent] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> AgentState:
     """
     Node function for the drafting agent in the LangGraph workflow.
     
     Args:
         state: Current state of the workflow with research results
+        agent: Shared agent instance; a new one is created if omitted
+        config: Runnable config of the workflow run
+        
+    Returns:
+        Updated state after drafting agent processing
+    """
+    agent = agent or DraftingAgent()
+    return agent.process(state, config)
+
+async def adrafting_agent_node(
+    state: AgentState,
+    agent: Optional[DraftingAgent] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> AgentState:
+    """
+    Async node function for the drafting agent in the LangGraph workflow.
+    
+    Args:
+        state: Current state of the workflow with research results
+        agent: Shared agent instance; a new one is created if omitted
+        config: Runnable config of the workflow run
         
     Returns:
         Updated state after drafting agent processing
     """
-    agent = DraftingAgent()
-    return agent.process(state)
\ No newline at end of file
+    agent = agent or DraftingAgent()
+    return await agent.aprocess(state, config)
\ No newline at end of file
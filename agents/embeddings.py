@@ -0,0 +1,135 @@
+"""
+Text embedders for the AI Agentic Research System.
+Provides a dependency-free local hashing embedder and an adapter for
+LangChain embedding models.
+"""
+import re
+import zlib
+import logging
+from typing import Any, List, Sequence
+
+import numpy as np
+
+from config.settings import get_settings
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+
+# Words too common to say anything about the topic of a text
+STOPWORDS = frozenset(
+    "a about an and are as at be been by can could did do does for from had has have how i if in into is "
+    "it its me my of on or our should so than that the their them then there these they this those to "
+    "us was we were what when where which who whom why will with would you your".split()
+)
+
+def key_terms(text: str) -> List[str]:
+    """
+    Split text into lowercase words without stopwords, folding simple plurals.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Key terms of the text, in order
+    """
+    return [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in _TOKEN.findall(text.lower())
+        if word not in STOPWORDS
+    ]
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scale each row of a matrix to unit length, leaving zero rows unchanged.
+
+    Args:
+        matrix: 2-D array
+
+    Returns:
+        Row-normalized float32 array
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+class Embedder:
+    """
+    Interface for text embedders. Embeddings are unit-length, so the dot
+    product of two embeddings is their cosine similarity.
+    """
+    #: Dimension of the embeddings
+    dim: int
+    #: Identifies the embedding space, so persisted vectors are not mixed across models
+    name: str
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dim) with unit-length rows
+        """
+        raise NotImplementedError
+
+class HashingEmbedder(Embedder):
+    """
+    Local embedder based on feature hashing of word unigrams and bigrams.
+
+    Needs no model or network access and is fast, but only captures lexical
+    overlap: reworded queries sharing their key terms are similar, synonyms
+    are not. Stopwords are dropped and simple plurals folded, so e.g.
+    "What are the latest advancements in quantum computing?" and "the latest
+    advancement in quantum computing" embed identically.
+    """
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _terms(self, text: str) -> List[str]:
+        words = key_terms(text)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term in self._terms(text):
+                digest = zlib.crc32(term.encode("utf-8"))
+                # The top bit picks the sign so collisions tend to cancel out
+                matrix[row, digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        # Sublinear term frequency keeps repeated words from dominating
+        return normalize_rows(np.sign(matrix) * np.log1p(np.abs(matrix)))
+
+class LangChainEmbedder(Embedder):
+    """
+    Adapter for LangChain embedding models such as OpenAIEmbeddings.
+    """
+    def __init__(self, embeddings: Any, name: str):
+        self.embeddings = embeddings
+        self.name = name
+        self.dim = len(embeddings.embed_query("dimension probe"))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return normalize_rows(np.array(self.embeddings.embed_documents(list(texts)), dtype=np.float32))
+
+def create_embedder() -> Embedder:
+    """
+    Create the embedder selected by the `embedder` setting.
+
+    Returns:
+        The configured embedder
+    """
+    settings = get_settings()
+    if settings.embedder.lower() == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return LangChainEmbedder(OpenAIEmbeddings(model=settings.embedding_model), settings.embedding_model)
+
+    if settings.embedder.lower() != "hashing":
+        logger.warning(f"Unknown embedder '{settings.embedder}', using the hashing embedder")
+    return HashingEmbedder(settings.hashing_embedder_dim)
@@ -0,0 +1,117 @@
+"""
+LLM response caching for the AI Agentic Research System.
+Wraps a chat model so identical prompts are answered from a cache.
+"""
+import logging
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, BaseMessageChunk
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ensure_config
+
+from agents.cache import BaseCache, make_cache_key
+from agents.metrics import get_metrics
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+def is_cache_bypassed(config: Optional[RunnableConfig]) -> bool:
+    """
+    Check whether the current request asked to bypass caches.
+
+    Args:
+        config: Runnable config of the current call
+
+    Returns:
+        True if cached responses must not be used
+    """
+    return bool(ensure_config(config).get("configurable", {}).get("bypass_cache", False))
+
+class CachedChatModel(Runnable[PromptValue, BaseMessage]):
+    """
+    Exact-match response cache in front of a chat model.
+
+    Responses are keyed by model name, temperature and the fully rendered
+    prompt. Requests with `bypass_cache` set in the configurable section of
+    their config skip the lookup but still refresh the cached response.
+    """
+    def __init__(self, llm: Any, cache: BaseCache):
+        self.llm = llm
+        self.cache = cache
+
+    def cache_key(self, prompt: PromptValue) -> str:
+        """
+        Build the cache key for a rendered prompt.
+
+        Args:
+            prompt: Rendered prompt passed to the model
+
+        Returns:
+            Cache key for the model response
+        """
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None)
+        temperature = getattr(self.llm, "temperature", None)
+        rendered = prompt.to_string() if isinstance(prompt, PromptValue) else str(prompt)
+        return make_cache_key("llm", str(model), temperature, rendered)
+
+    def _lookup(self, key: str, config: Optional[RunnableConfig]) -> Optional[AIMessage]:
+        if is_cache_bypassed(config):
+            return None
+
+        content = self.cache.get(key)
+        get_metrics().increment(
+            "cache_requests_total",
+            labels={"cache": "llm", "result": "hit" if content is not None else "miss"}
+        )
+        if content is None:
+            return None
+
+        logger.info("LLM cache hit")
+        return AIMessage(content=content)
+
+    def invoke(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        key = self.cache_key(input)
+        cached = self._lookup(key, config)
+        if cached is not None:
+            return cached
+
+        response = self.llm.invoke(input, config, **kwargs)
+        self.cache.set(key, response.content)
+        return response
+
+    async def ainvoke(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        key = self.cache_key(input)
+        cached = self._lookup(key, config)
+        if cached is not None:
+            return cached
+
+        response = await self.llm.ainvoke(input, config, **kwargs)
+        self.cache.set(key, response.content)
+        return response
+
+    def stream(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[BaseMessageChunk]:
+        key = self.cache_key(input)
+        cached = self._lookup(key, config)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+
+        parts = []
+        for chunk in self.llm.stream(input, config, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self.cache.set(key, "".join(parts))
+
+    async def astream(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[BaseMessageChunk]:
+        key = self.cache_key(input)
+        cached = self._lookup(key, config)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+
+        parts = []
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self.cache.set(key, "".join(parts))
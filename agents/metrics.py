@@ -0,0 +1,320 @@
+"""
+Metrics collection for the AI Agentic Research System.
+Records per-stage latencies and counters and exports them through a pluggable sink.
+"""
+import os
+import math
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import get_settings
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+# Prefix of all exported metric names
+METRIC_PREFIX = "astramind_"
+
+# A metric series is identified by its name and sorted label pairs
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+def _series_key(name: str, labels: Optional[Dict[str, Any]]) -> SeriesKey:
+    return name, tuple(sorted((key, str(value)) for key, value in (labels or {}).items()))
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Compute a percentile with the nearest-rank method.
+
+    Args:
+        values: Observed values
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 if there are no values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class MetricsSink:
+    """
+    Interface for metrics sinks. The base implementation discards everything.
+    """
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record an observation of a distribution, such as a latency.
+
+        Args:
+            name: Metric name
+            value: Observed value
+            labels: Labels identifying the series
+        """
+
+    def increment(self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name: Metric name
+            amount: Amount to add
+            labels: Labels identifying the series
+        """
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Export buffered metrics, if the sink exports anywhere.
+
+        Args:
+            force: Export even if the flush interval has not elapsed
+        """
+
+class InMemoryMetrics(MetricsSink):
+    """
+    Collects observations in bounded in-memory windows and reports percentiles.
+    """
+    def __init__(self, window_size: int = 10000):
+        self.window_size = window_size
+        self._observations: Dict[SeriesKey, Deque[float]] = {}
+        self._totals: Dict[SeriesKey, List[float]] = {}
+        self._counters: Dict[SeriesKey, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = _series_key(name, labels)
+        with self._lock:
+            window = self._observations.get(key)
+            if window is None:
+                window = self._observations[key] = deque(maxlen=self.window_size)
+                self._totals[key] = [0, 0.0]
+            window.append(value)
+            self._totals[key][0] += 1
+            self._totals[key][1] += value
+
+    def increment(self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def percentiles(self, name: str, labels: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        """
+        Get p50/p95/p99 of the recent observations of a series.
+
+        Args:
+            name: Metric name
+            labels: Labels identifying the series
+
+        Returns:
+            Dictionary with count, p50, p95 and p99
+        """
+        with self._lock:
+            values = list(self._observations.get(_series_key(name, labels), ()))
+        return {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99)
+        }
+
+    def counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+        """
+        Get the value of a counter.
+
+        Args:
+            name: Metric name
+            labels: Labels identifying the series
+
+        Returns:
+            Counter value
+        """
+        return self._counters.get(_series_key(name, labels), 0)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get percentiles of every distribution and the value of every counter.
+
+        Returns:
+            Dictionary with "distributions" and "counters", keyed by series name
+        """
+        with self._lock:
+            observations = {key: list(values) for key, values in self._observations.items()}
+            counters = dict(self._counters)
+
+        def series_name(key: SeriesKey) -> str:
+            name, labels = key
+            return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+        return {
+            "distributions": {
+                series_name(key): {
+                    "count": len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "p99": percentile(values, 99)
+                }
+                for key, values in sorted(observations.items())
+            },
+            "counters": {series_name(key): value for key, value in sorted(counters.items())}
+        }
+
+    def reset(self) -> None:
+        """Discard all recorded metrics."""
+        with self._lock:
+            self._observations.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+class PrometheusFileSink(InMemoryMetrics):
+    """
+    Writes metrics to a file in the Prometheus text exposition format, for
+    collection by the node exporter's textfile collector. Distributions are
+    exported as summaries with 0.5/0.95/0.99 quantiles.
+    """
+    def __init__(self, path: str, window_size: int = 10000, flush_interval: float = 5.0):
+        super().__init__(window_size)
+        self.path = path
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Returns:
+            Metrics exposition text
+        """
+        with self._lock:
+            observations = {key: list(values) for key, values in self._observations.items()}
+            totals = {key: list(total) for key, total in self._totals.items()}
+            counters = dict(self._counters)
+
+        def format_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            escaped = (
+                f'{k}="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                for k, v in pairs
+            )
+            return "{" + ",".join(escaped) + "}"
+
+        lines = []
+        typed = set()
+        for (name, labels), values in sorted(observations.items()):
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} summary")
+                typed.add(metric)
+            for q in (0.5, 0.95, 0.99):
+                lines.append(f"{metric}{format_labels(labels, (('quantile', str(q)),))} {percentile(values, q * 100)}")
+            count, total = totals[(name, labels)]
+            lines.append(f"{metric}_sum{format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{format_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters.items()):
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write atomically so the collector never reads a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics to {self.path}: {str(e)}")
+
+_metrics: Optional[MetricsSink] = None
+_metrics_lock = threading.Lock()
+
+def create_metrics_sink() -> MetricsSink:
+    """
+    Create the metrics sink selected by the `metrics_sink` setting.
+
+    Returns:
+        The configured metrics sink
+    """
+    settings = get_settings()
+    sink = settings.metrics_sink.lower()
+
+    if sink == "prometheus":
+        return PrometheusFileSink(
+            settings.metrics_file,
+            window_size=settings.metrics_window_size,
+            flush_interval=settings.metrics_flush_interval_seconds
+        )
+    if sink == "memory":
+        return InMemoryMetrics(window_size=settings.metrics_window_size)
+    if sink != "none":
+        logger.warning(f"Unknown metrics sink '{settings.metrics_sink}', metrics are disabled")
+    return MetricsSink()
+
+def get_metrics() -> MetricsSink:
+    """
+    Get the process-wide metrics sink, creating it from settings on first use.
+
+    Returns:
+        The metrics sink
+    """
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = create_metrics_sink()
+    return _metrics
+
+def set_metrics(sink: MetricsSink) -> None:
+    """
+    Replace the process-wide metrics sink.
+
+    Args:
+        sink: New metrics sink
+    """
+    global _metrics
+    with _metrics_lock:
+        _metrics = sink
+
+@contextmanager
+def timed(stage: str, state: Any = None, **details: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a pipeline stage and record it on the state and in the metrics sink.
+
+    The yielded dictionary holds the details recorded on the state with the
+    timing; the timed block may add to it (e.g. token counts or cache hits).
+
+    Args:
+        stage: Name of the stage
+        state: Agent state to record the timing on, if any
+        details: Initial details of the stage
+
+    Yields:
+        Mutable dictionary of details
+    """
+    start = time.perf_counter()
+    try:
+        yield details
+    finally:
+        duration = time.perf_counter() - start
+        get_metrics().observe("stage_duration_seconds", duration, {"stage": stage})
+        if state is not None:
+            state.record_stage(stage, duration, **details)
@@ -0,0 +1,105 @@
+"""
+Model routing for the AI Agentic Research System.
+Runs short structured LLM tasks on a light model when the query is simple,
+and falls back to the strong model when the light model's output cannot be
+parsed by the chain's output parser.
+"""
+import re
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable, RunnableBranch, RunnableConfig, RunnableLambda, RunnableWithFallbacks
+
+from agents.metrics import get_metrics
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+# Queries asking to compare, explain causes or weigh options need more
+# reasoning to split into good search queries
+_COMPLEX_MARKERS = re.compile(
+    r"\b(?:compare[ds]?|comparison|versus|vs\.?|differences?|trade-?offs?|pros and cons"
+    r"|advantages and disadvantages|relationship between|impact of|effects? of|why)\b",
+    re.IGNORECASE
+)
+
+def is_complex_query(query: str, max_words: int = 20) -> bool:
+    """
+    Guess whether a query needs the strong model to plan its searches.
+
+    A query is complex when it is long, asks more than one question or asks
+    for a comparison or an explanation.
+
+    Args:
+        query: User query
+        max_words: Longest query, in words, that counts as simple
+
+    Returns:
+        True if the query should be handled by the strong model
+    """
+    if len(query.split()) > max_words:
+        return True
+    if query.count("?") > 1:
+        return True
+    return _COMPLEX_MARKERS.search(query) is not None
+
+class ParseFallback(RunnableWithFallbacks):
+    """
+    Runs the fallbacks when the primary chain's output cannot be parsed.
+
+    Streaming only runs the primary chain: partial outputs are never parse
+    failures, so callers streaming the chain check the final output
+    themselves.
+    """
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        return self.runnable.stream(input, config, **kwargs)
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        async for chunk in self.runnable.astream(input, config, **kwargs):
+            yield chunk
+
+def route_by_complexity(
+    light_chain: Optional[Runnable],
+    strong_chain: Runnable,
+    stage: str,
+    max_query_words: int = 20
+) -> Runnable:
+    """
+    Build a chain running simple queries on the light chain and complex ones on the strong chain.
+
+    Parse failures of the light chain are retried on the strong chain, see
+    `ParseFallback`. The inputs of both chains must include the user query under "query".
+
+    Args:
+        light_chain: Chain using the light model, or None to always use the strong chain
+        strong_chain: Chain using the strong model
+        stage: Name of the LLM stage, used in logs and metrics
+        max_query_words: Longest query, in words, that counts as simple
+
+    Returns:
+        Routed chain
+    """
+    if light_chain is None:
+        return strong_chain
+
+    def is_complex(inputs: Dict[str, Any]) -> bool:
+        complex_query = is_complex_query(inputs["query"], max_query_words)
+        get_metrics().increment(
+            "model_routes_total",
+            labels={"stage": stage, "tier": "strong" if complex_query else "light"}
+        )
+        return complex_query
+
+    def record_fallback(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        logger.warning(f"Light model output for {stage} could not be parsed, retrying with the strong model")
+        get_metrics().increment("model_fallbacks_total", labels={"stage": stage})
+        return inputs
+
+    fallback = RunnableLambda(record_fallback) | strong_chain
+    light_with_fallback = ParseFallback(
+        runnable=light_chain,
+        fallbacks=[fallback],
+        exceptions_to_handle=(OutputParserException,)
+    )
+    return RunnableBranch((is_complex, strong_chain), light_with_fallback)
@@ -0,0 +1,274 @@
+"""
+Client-side rate limiting for upstream APIs of the AI Agentic Research System.
+Token buckets for requests and LLM tokens per minute, with a priority
+queue that serves interactive requests before batch requests.
+"""
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+from typing import Callable, List, Optional
+
+from agents.metrics import get_metrics
+from config.settings import get_settings
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+# Request priorities; lower values are served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`.
+
+    The bucket holds at most `capacity` tokens, which bounds the burst
+    allowed after an idle period. Not thread-safe; RateLimiter serializes
+    access.
+    """
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """
+        Get how long until `amount` tokens are available.
+
+        Args:
+            amount: Number of tokens needed, capped at the capacity
+
+        Returns:
+            Seconds to wait, 0 if the tokens are available now
+        """
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def consume(self, amount: float) -> None:
+        """
+        Take tokens out of the bucket.
+
+        Args:
+            amount: Number of tokens to take, capped at the capacity
+        """
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """
+        Put back tokens taken for a request that was not sent.
+
+        Args:
+            amount: Number of tokens taken, capped at the capacity
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+class _Waiter:
+    """A queued acquisition, ordered by priority and then arrival."""
+    __slots__ = ("priority", "sequence", "tokens", "grant", "cancelled", "granted")
+
+    def __init__(self, priority: int, sequence: int, tokens: float, grant: Callable[[], None]):
+        self.priority = priority
+        self.sequence = sequence
+        self.tokens = tokens
+        self.grant = grant
+        self.cancelled = False
+        self.granted = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+class RateLimiter:
+    """
+    Limits the requests per minute, and optionally the tokens per minute,
+    sent to an upstream.
+
+    Callers that cannot be served immediately wait in a queue. The queue is
+    served strictly in order of priority and then arrival, so interactive
+    requests overtake queued batch requests and no request is starved by
+    smaller ones behind it. Sync and async callers share the same queue.
+    """
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: float = 0,
+        burst_seconds: float = 10.0
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute * burst_seconds / 60) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute * burst_seconds / 60) if tokens_per_minute > 0 else None
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def _delay(self, tokens: float) -> float:
+        delays = [0.0]
+        if self.requests is not None:
+            delays.append(self.requests.delay(1))
+        if self.tokens is not None and tokens > 0:
+            delays.append(self.tokens.delay(tokens))
+        return max(delays)
+
+    def _consume(self, tokens: float) -> None:
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None and tokens > 0:
+            self.tokens.consume(tokens)
+
+    def _refund(self, tokens: float) -> None:
+        if self.requests is not None:
+            self.requests.refund(1)
+        if self.tokens is not None and tokens > 0:
+            self.tokens.refund(tokens)
+
+    def _dispatch(self) -> None:
+        """Grant queued waiters in order while capacity lasts. Must hold the lock."""
+        while self._queue:
+            waiter = self._queue[0]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+
+            delay = self._delay(waiter.tokens)
+            if delay > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(delay, self._on_timer)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+
+            heapq.heappop(self._queue)
+            self._consume(waiter.tokens)
+            waiter.granted = True
+            waiter.grant()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _enqueue(self, tokens: float, priority: str, grant: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(PRIORITIES.get(priority, 0), next(self._sequence), tokens, grant)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+            self._dispatch()
+        return waiter
+
+    def _cancel(self, waiter: _Waiter) -> None:
+        """Withdraw the waiter of a caller that gave up, refunding the capacity it was granted."""
+        with self._lock:
+            if waiter.granted:
+                # Granted after the caller was cancelled but before it resumed
+                self._refund(waiter.tokens)
+                self._dispatch()
+            else:
+                waiter.cancelled = True
+
+    def _record_wait(self, priority: str, seconds: float) -> None:
+        get_metrics().observe("rate_limit_wait_seconds", seconds, {"upstream": self.name, "priority": priority})
+        if seconds > 1:
+            logger.info(f"Waited {seconds:.2f}s for the {self.name} rate limit ({priority})")
+
+    def try_acquire(self, tokens: float = 0) -> bool:
+        """
+        Acquire capacity only if it is available now and nobody is queued.
+
+        Args:
+            tokens: Number of LLM tokens the request will use
+
+        Returns:
+            True if the capacity was acquired
+        """
+        with self._lock:
+            if self._queue or self._delay(tokens) > 0:
+                return False
+            self._consume(tokens)
+            return True
+
+    def acquire(self, tokens: float = 0, priority: str = "interactive") -> float:
+        """
+        Wait until a request may be sent.
+
+        Args:
+            tokens: Number of LLM tokens the request will use
+            priority: "interactive" or "batch"
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        granted = threading.Event()
+        waiter = self._enqueue(tokens, priority, granted.set)
+        try:
+            granted.wait()
+        except BaseException:
+            self._cancel(waiter)
+            raise
+
+        waited = time.monotonic() - start
+        self._record_wait(priority, waited)
+        return waited
+
+    async def aacquire(self, tokens: float = 0, priority: str = "interactive") -> float:
+        """
+        Wait until a request may be sent, without blocking the event loop.
+
+        Args:
+            tokens: Number of LLM tokens the request will use
+            priority: "interactive" or "batch"
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = self._enqueue(tokens, priority, grant)
+        try:
+            await granted
+        except BaseException:
+            self._cancel(waiter)
+            raise
+
+        waited = time.monotonic() - start
+        self._record_wait(priority, waited)
+        return waited
+
+def create_rate_limiter(name: str, requests_per_minute: float, tokens_per_minute: float = 0) -> Optional[RateLimiter]:
+    """
+    Create a rate limiter from configuration values.
+
+    Args:
+        name: Name of the upstream, used in logs and metric labels
+        requests_per_minute: Request limit, 0 for none
+        tokens_per_minute: LLM token limit, 0 for none
+
+    Returns:
+        The rate limiter, or None if no limit is configured
+    """
+    if requests_per_minute <= 0 and tokens_per_minute <= 0:
+        return None
+
+    settings = get_settings()
+    return RateLimiter(
+        name,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        burst_seconds=settings.rate_limit_burst_seconds
+    )
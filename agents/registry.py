@@ -0,0 +1,242 @@
+"""
+Agent registry for the AI Agentic Research System.
+Builds agents once and shares them across workflow runs.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from agents.research_agent import ResearchAgent
+from agents.drafting_agent import DraftingAgent
+from agents.cache import BaseCache, create_cache
+from agents.embeddings import Embedder, create_embedder
+from agents.document_store import DocumentStore
+from agents.checkpoint import CheckpointStore
+from agents.semantic_cache import SemanticCache
+from agents.resilience import Upstream, create_upstream
+from agents.rate_limit import create_rate_limiter
+from config.settings import get_settings, semantic_cache_active
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+class AgentRegistry:
+    """
+    Lazily builds and caches the agents used by the workflow.
+    
+    Each agent (with its LLM client, tools, chains and caches) is created on first use
+    and then reused for every query processed through this registry. Agents
+    only mutate the state passed to them, so a single instance can safely
+    serve concurrent workflow runs.
+    """
+    def __init__(
+        self,
+        research_llm=None,
+        drafting_llm=None,
+        search_cache: Optional[BaseCache] = None,
+        llm_cache: Optional[BaseCache] = None,
+        search_tool=None,
+        semantic_cache: Optional[SemanticCache] = None,
+        document_store: Optional[DocumentStore] = None,
+        checkpointer: Optional[CheckpointStore] = None,
+        research_light_llm=None,
+        checkpointing: Optional[bool] = None
+    ):
+        self._search_tool = search_tool
+        self._semantic_cache = semantic_cache
+        self._document_store = document_store
+        self._checkpointer = checkpointer
+        self._checkpointing = checkpointing
+        self._research_llm = research_llm
+        self._research_light_llm = research_light_llm
+        self._drafting_llm = drafting_llm
+        self._search_cache = search_cache
+        self._llm_cache = llm_cache
+        self._agents: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+    
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return the cached agent for `name`, building it with `factory` if needed.
+        
+        Args:
+            name: Registry key of the agent
+            factory: Callable that builds the agent
+            
+        Returns:
+            The shared agent instance
+        """
+        agent = self._agents.get(name)
+        if agent is None:
+            with self._lock:
+                agent = self._agents.get(name)
+                if agent is None:
+                    logger.info(f"Creating shared {name}")
+                    agent = factory()
+                    self._agents[name] = agent
+        return agent
+    
+    @property
+    def search_cache(self) -> Optional[BaseCache]:
+        """Shared search result cache, or None if caching is disabled."""
+        if self._search_cache is not None:
+            return self._search_cache
+        
+        settings = get_settings()
+        if not settings.search_cache_enabled:
+            return None
+        
+        return self._get_or_create(
+            "search_cache",
+            lambda: create_cache(
+                max_entries=settings.search_cache_max_entries,
+                ttl_seconds=settings.search_cache_ttl_seconds,
+                path=settings.search_cache_path,
+                memory_entries=settings.search_cache_memory_entries
+            )
+        )
+    
+    @property
+    def llm_cache(self) -> Optional[BaseCache]:
+        """Shared LLM response cache, or None if caching is disabled."""
+        if self._llm_cache is not None:
+            return self._llm_cache
+        
+        settings = get_settings()
+        if not settings.llm_cache_enabled:
+            return None
+        
+        return self._get_or_create(
+            "llm_cache",
+            lambda: create_cache(
+                max_entries=settings.llm_cache_max_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                path=settings.llm_cache_path,
+                memory_entries=settings.llm_cache_memory_entries
+            )
+        )
+    
+    @property
+    def embedder(self) -> Embedder:
+        """Shared text embedder."""
+        return self._get_or_create("embedder", create_embedder)
+    
+    @property
+    def semantic_cache(self) -> Optional[SemanticCache]:
+        """Shared cache of answers to similar queries, or None if it is disabled."""
+        if self._semantic_cache is not None:
+            return self._semantic_cache
+        
+        settings = get_settings()
+        if not semantic_cache_active(settings):
+            return None
+        
+        return self._get_or_create(
+            "semantic_cache",
+            lambda: SemanticCache(
+                self.embedder,
+                create_cache(
+                    max_entries=settings.semantic_cache_max_entries,
+                    ttl_seconds=settings.semantic_cache_ttl_seconds,
+                    path=settings.semantic_cache_path,
+                    memory_entries=min(256, settings.semantic_cache_max_entries)
+                ),
+                index_path=settings.semantic_cache_index_path,
+                max_entries=settings.semantic_cache_max_entries,
+                threshold=settings.semantic_cache_threshold
+            )
+        )
+    
+    @property
+    def document_store(self) -> Optional[DocumentStore]:
+        """Shared local index of fetched documents, or None if it is disabled."""
+        if self._document_store is not None:
+            return self._document_store
+        
+        settings = get_settings()
+        if not settings.document_store_enabled:
+            return None
+        
+        return self._get_or_create(
+            "document_store",
+            lambda: DocumentStore(
+                self.embedder,
+                path=settings.document_store_path,
+                chunk_chars=settings.document_chunk_chars,
+                overlap_chars=settings.document_chunk_overlap_chars
+            )
+        )
+    
+    @property
+    def checkpointer(self) -> Optional[CheckpointStore]:
+        """Shared store of workflow checkpoints, or None if checkpointing is disabled."""
+        if self._checkpointer is not None:
+            return self._checkpointer
+        
+        settings = get_settings()
+        enabled = settings.checkpointing_enabled if self._checkpointing is None else self._checkpointing
+        if not enabled:
+            return None
+        
+        return self._get_or_create(
+            "checkpointer",
+            lambda: CheckpointStore(settings.checkpoint_path, ttl_seconds=settings.checkpoint_ttl_seconds)
+        )
+    
+    @property
+    def search_upstream(self) -> Upstream:
+        """Shared timeouts, retries, circuit breaker and rate limit for Tavily calls."""
+        settings = get_settings()
+        return self._get_or_create(
+            "search_upstream",
+            lambda: create_upstream(
+                "search",
+                timeout=settings.search_timeout_seconds,
+                hedge=settings.search_hedging_enabled,
+                rate_limiter=create_rate_limiter("search", settings.search_requests_per_minute)
+            )
+        )
+    
+    @property
+    def llm_upstream(self) -> Upstream:
+        """Shared timeouts, retries, circuit breaker and rate limit for LLM calls of all agents."""
+        settings = get_settings()
+        return self._get_or_create(
+            "llm_upstream",
+            lambda: create_upstream(
+                "llm",
+                timeout=settings.llm_timeout_seconds,
+                rate_limiter=create_rate_limiter(
+                    "llm", settings.llm_requests_per_minute, settings.llm_tokens_per_minute
+                )
+            )
+        )
+    
+    @property
+    def research_agent(self) -> ResearchAgent:
+        """Shared research agent instance."""
+        return self._get_or_create(
+            "research_agent",
+            lambda: ResearchAgent(
+                llm=self._research_llm,
+                light_llm=self._research_light_llm,
+                search_cache=self.search_cache,
+                llm_cache=self.llm_cache,
+                search_tool=self._search_tool,
+                search_upstream=self.search_upstream,
+                llm_upstream=self.llm_upstream,
+                document_store=self.document_store
+            )
+        )
+    
+    @property
+    def drafting_agent(self) -> DraftingAgent:
+        """Shared drafting agent instance."""
+        return self._get_or_create(
+            "drafting_agent",
+            lambda: DraftingAgent(
+                llm=self._drafting_llm,
+                llm_cache=self.llm_cache,
+                llm_upstream=self.llm_upstream
+            )
+        )
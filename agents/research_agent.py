@@ -2,38 +2,118 @@
 Research Agent implementation for the AI Agentic Research System.
 Responsible for gathering information from the web using Tavily.
 """
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Dict, Any, Optional, Set, Sized, Tuple, Union
+import time
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from langchain_core.exceptions import OutputParserException
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_openai import ChatOpenAI
-from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.outputs import Generation
 #from langchain.agents.tool_executor import ToolExecutor
 from agents.utils import SimpleToolExecutor as ToolExecutor
 from models.state import AgentState
-from config.settings import get_settings
-from agents.utils import format_error
+from models.search import SearchGroup
+from config.settings import get_settings, routed_light_model, stage_model
+from agents.utils import format_error, build_run_config, emit_event
+from agents.cache import BaseCache, search_cache_key
+from agents.document_store import DocumentStore
+from agents.embeddings import key_terms
+from agents.coverage import assess_coverage, novel_url_ratio, result_urls
+from agents.token_budget import count_tokens
+from agents.llm_cache import CachedChatModel
+from agents.concurrency import SingleFlight
+from agents.resilience import ResilientChatModel, Upstream
+from agents.metrics import get_metrics, timed
+from agents.model_router import is_complex_query, route_by_complexity
 
 # Get logger
 logger = logging.getLogger(__name__)
 
+class SearchQueriesOutputParser(JsonOutputParser):
+    """
+    JSON output parser that also requires a list of search queries.
+    
+    Valid JSON without a "search_queries" list is a parse failure too, so
+    the light model's malformed output is retried on the strong model.
+    Partial results of a streamed output are not checked.
+    """
+    def parse_result(self, result: List[Generation], *, partial: bool = False) -> Any:
+        parsed = super().parse_result(result, partial=partial)
+        if not partial and not (isinstance(parsed, dict) and isinstance(parsed.get("search_queries"), list)):
+            raise OutputParserException(
+                f"Output has no list of search queries: {parsed}",
+                llm_output=result[0].text if result else None
+            )
+        return parsed
+
 class ResearchAgent:
     """
     Agent responsible for gathering information from the web using Tavily.
+    
+    Searches already covered by fresh pages in the local document store are
+    answered from the store; only the gaps are searched on the web.
+    
+    Each call runs one round of research. After a round, a coverage check
+    decides whether the workflow should run another round of searches
+    targeted at the parts of the query no result mentions yet.
     """
-    def __init__(self, llm=None):
+    def __init__(
+        self,
+        llm=None,
+        search_cache: Optional[BaseCache] = None,
+        llm_cache: Optional[BaseCache] = None,
+        search_tool=None,
+        search_upstream: Optional[Upstream] = None,
+        llm_upstream: Optional[Upstream] = None,
+        document_store: Optional[DocumentStore] = None,
+        light_llm=None
+    ):
         settings = get_settings()
         
-        # Initialize LLM
-        self.llm = llm or ChatOpenAI(
-            model=settings.default_model,
-            temperature=settings.research_agent_temperature
-        )
+        # Optional cache of search results shared across queries
+        self.search_cache = search_cache
+        
+        # Optional local index of fetched pages, consulted before searching the web
+        self.document_store = document_store
+        
+        # Optional timeouts, retries and circuit breaking for Tavily calls
+        self.search_upstream = search_upstream
+        
+        # Identical searches issued concurrently (e.g. by a batch) run only once
+        self.inflight_searches = SingleFlight()
+        
+        # Initialize LLMs (the OpenAI client is only imported when it is needed).
+        # A light model for simple queries is only created alongside the
+        # default strong model; injected models are used as given
+        if llm is None:
+            from langchain_openai import ChatOpenAI
+            
+            def chat_model(name: str) -> Any:
+                return ChatOpenAI(
+                    model=name,
+                    temperature=settings.research_agent_temperature,
+                    timeout=settings.llm_timeout_seconds,
+                    # Retries are left to the resilience layer when one is configured
+                    max_retries=0 if llm_upstream is not None else 2
+                )
+            
+            llm = chat_model(stage_model(settings, "query_generation"))
+            light_model_name = routed_light_model(settings, "query_generation")
+            if light_llm is None and light_model_name is not None:
+                light_llm = chat_model(light_model_name)
+        self.llm = llm
+        self.light_llm = light_llm if settings.model_routing_enabled else None
         
         # Initialize tools
-        self.search_tool = TavilySearchResults(
-            k=settings.max_search_results_per_query
-        )
+        if search_tool is None:
+            from langchain_community.tools.tavily_search import TavilySearchResults
+            search_tool = TavilySearchResults(
+                k=settings.max_search_results_per_query
+            )
+        self.search_tool = search_tool
         self.tools = [self.search_tool]
         self.tool_executor = ToolExecutor(self.tools)
         
@@ -58,93 +138,942 @@ class ResearchAgent:
             }}
             """
         )
-        self.query_generation_chain = self.query_generation_prompt | self.llm | JsonOutputParser()
+        
+        # Both models go through the resilience layer and the LLM cache. The
+        # chains are routed: simple queries go to the light model, whose
+        # unparseable outputs are retried on the strong model
+        def wrap(model: Any) -> Any:
+            if llm_upstream is not None:
+                model = ResilientChatModel(model, llm_upstream, settings.llm_completion_token_estimate)
+            return CachedChatModel(model, llm_cache) if llm_cache is not None else model
+        
+        model = wrap(self.llm)
+        light_model = wrap(self.light_llm) if self.light_llm is not None else None
+        
+        def routed(prompt: ChatPromptTemplate) -> Tuple[Any, Any]:
+            strong_chain = prompt | model | SearchQueriesOutputParser()
+            light_chain = None
+            if light_model is not None:
+                light_chain = prompt | light_model | SearchQueriesOutputParser()
+            chain = route_by_complexity(light_chain, strong_chain, "query_generation", settings.routing_max_query_words)
+            return chain, strong_chain
+        
+        self.query_generation_chain, self.strong_query_generation_chain = routed(self.query_generation_prompt)
+        
+        # Setup the chain generating the searches of later research rounds
+        self.follow_up_prompt = ChatPromptTemplate.from_template(
+            """
+            You are a research agent. The searches made so far do not fully cover the following query:
+            
+            QUERY: {query}
+            
+            Searches already made:
+            {searched_queries}
+            
+            Terms of the query that no search result mentions yet: {missing_terms}
+            
+            Based on these gaps, what are the top {num_search_queries} specific search queries you should make to find 
+            the missing information? Do not repeat the searches already made.
+            
+            Output should be in the following JSON format:
+            {{
+                "search_queries": [
+                    "specific search query 1",
+                    "specific search query 2",
+                    ...
+                ],
+                "reasoning": "Your reasoning for these search queries"
+            }}
+            """
+        )
+        self.follow_up_chain, _ = routed(self.follow_up_prompt)
     
-    def process(self, state: AgentState) -> AgentState:
+    def _search_invocation(self, query: str) -> Dict[str, Any]:
         """
-        Process the state and gather research information.
+        Build the tool invocation for a search query.
         
         Args:
-            state: Current state of the agent system
+            query: Search query to execute
             
         Returns:
-            Updated state with research results
+            Tool invocation for the tool executor
         """
-        logger.info(f"Research agent processing query: {state.query}")
         settings = get_settings()
+        return {
+            "tool_name": "tavily_search_results_json", 
+            "tool_input": {
+                "query": query, 
+                "max_results": settings.max_search_results_per_query
+            }
+        }
+    
+    def _search_key(self, query: str) -> str:
+        """
+        Build the cache and deduplication key of a search query.
         
-        try:
-            # Generate search queries
-            search_queries_result = self.query_generation_chain.invoke({
-                "query": state.query,
-                "num_search_queries": settings.num_search_queries
-            })
+        Args:
+            query: Search query
             
-            logger.info(f"Generated {len(search_queries_result['search_queries'])} search queries")
+        Returns:
+            Key shared by identical and near-identical searches
+        """
+        settings = get_settings()
+        return search_cache_key(query, settings.max_search_results_per_query)
+    
+    def _get_cached_search(self, query: str, bypass_cache: bool) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results for a search query.
+        
+        Args:
+            query: Search query
+            bypass_cache: Skip the lookup
             
-            search_results = []
+        Returns:
+            Cached search hits, or None on a miss
+        """
+        if self.search_cache is None or bypass_cache:
+            return None
+        
+        cached = self.search_cache.get(self._search_key(query))
+        if cached is not None:
+            logger.info(f"Search cache hit for: {query}")
+        get_metrics().increment(
+            "cache_requests_total",
+            labels={"cache": "search", "result": "hit" if cached is not None else "miss"}
+        )
+        return cached
+    
+    def _retrieve(self, query: str, bypass_cache: bool) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up fresh pages for a search query in the local document store.
+        
+        Args:
+            query: Search query
+            bypass_cache: Skip the lookup
+            
+        Pages only count if their title and best matching chunk mention every
+        key term of the query: similar pages about the same topic often miss
+        the specific aspect a sub-query asks for.
+        
+        Returns:
+            Pages retrieved from the store, or None if they do not cover the
+            query well enough and the web has to be searched
+        """
+        if self.document_store is None or bypass_cache:
+            return None
+        
+        settings = get_settings()
+        hits = self.document_store.search(
+            query,
+            k=settings.max_search_results_per_query,
+            min_similarity=settings.retrieval_min_similarity,
+            max_age_seconds=settings.retrieval_max_age_seconds
+        )
+        terms = set(key_terms(query))
+        hits = [hit for hit in hits if terms <= set(key_terms(f"{hit['title']} {hit['content']}"))]
+        covered = len(hits) >= settings.retrieval_min_results
+        if covered:
+            logger.info(f"Retrieved {len(hits)} local pages for: {query}")
+        get_metrics().increment(
+            "cache_requests_total",
+            labels={"cache": "documents", "result": "hit" if covered else "miss"}
+        )
+        return hits if covered else None
+    
+    async def _aretrieve(self, query: str, bypass_cache: bool) -> Optional[List[Dict[str, Any]]]:
+        """
+        Async version of `_retrieve`.
+        
+        The lookup scans the whole index and reads SQLite, so it runs in the
+        default executor to keep the event loop free for concurrent requests.
+        
+        Args:
+            query: Search query
+            bypass_cache: Skip the lookup
+            
+        Returns:
+            Pages retrieved from the store, or None if the web has to be searched
+        """
+        if self.document_store is None or bypass_cache:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self._retrieve, query, bypass_cache))
+    
+    def _store_search(self, query: str, result: Any) -> List[Dict[str, Any]]:
+        """
+        Validate a search response, store it in the cache and index its pages.
+        
+        Args:
+            query: Search query
+            result: Raw response from the search tool
             
-            # Execute the search for each query
-            for query in search_queries_result["search_queries"]:
+        Returns:
+            List of search hits
+        """
+        # The Tavily tool reports API failures as a string instead of raising
+        if not isinstance(result, list):
+            raise ValueError(f"Unexpected search response: {result}")
+        
+        if self.search_cache is not None:
+            self.search_cache.set(self._search_key(query), result)
+        
+        if self.document_store is not None:
+            try:
+                self.document_store.add(result)
+            except Exception as e:
+                logger.warning(f"Failed to index search results for '{query}': {str(e)}")
+        
+        return result
+    
+    async def _astore_search(self, query: str, result: Any) -> List[Dict[str, Any]]:
+        """
+        Async version of `_store_search`.
+        
+        Indexing embeds the pages and writes the vector file and SQLite, so
+        with a document store it runs in the default executor.
+        
+        Args:
+            query: Search query
+            result: Raw response from the search tool
+            
+        Returns:
+            List of search hits
+        """
+        if self.document_store is None:
+            return self._store_search(query, result)
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self._store_search, query, result))
+    
+    def _run_search(
+        self,
+        query: str,
+        bypass_cache: bool = False,
+        state: Optional[AgentState] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute a single search through the tool executor.
+        
+        Args:
+            query: Search query to execute
+            bypass_cache: Skip cached results and search again
+            state: State to record the search timing on, if any
+            
+        Returns:
+            List of search hits returned by Tavily
+        """
+        with timed("search", state, query=query) as details:
+            cached = self._get_cached_search(query, bypass_cache)
+            details["cache_hit"] = cached is not None
+            if cached is not None:
+                return cached
+            
+            retrieved = self._retrieve(query, bypass_cache)
+            details["retrieved"] = retrieved is not None
+            if retrieved is not None:
+                return retrieved
+            
+            def fetch() -> List[Dict[str, Any]]:
+                # An identical search may have finished since the cache lookup
+                if self.search_cache is not None and not bypass_cache:
+                    cached = self.search_cache.get(self._search_key(query))
+                    if cached is not None:
+                        return cached
+                result = self.tool_executor.invoke(self._search_invocation(query))
+                return self._store_search(query, result)
+            
+            def search() -> List[Dict[str, Any]]:
+                if self.search_upstream is None:
+                    return fetch()
+                return self.search_upstream.call(fetch, priority=state.priority if state else "interactive")
+            
+            return self.inflight_searches.do(self._search_key(query), search)
+    
+    async def _arun_search(
+        self,
+        query: str,
+        bypass_cache: bool = False,
+        state: Optional[AgentState] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Asynchronously execute a single search through the tool executor.
+        
+        Args:
+            query: Search query to execute
+            bypass_cache: Skip cached results and search again
+            state: State to record the search timing on, if any
+            
+        Returns:
+            List of search hits returned by Tavily
+        """
+        with timed("search", state, query=query) as details:
+            cached = self._get_cached_search(query, bypass_cache)
+            details["cache_hit"] = cached is not None
+            if cached is not None:
+                return cached
+            
+            retrieved = await self._aretrieve(query, bypass_cache)
+            details["retrieved"] = retrieved is not None
+            if retrieved is not None:
+                return retrieved
+            
+            async def fetch() -> List[Dict[str, Any]]:
+                # An identical search may have finished since the cache lookup
+                if self.search_cache is not None and not bypass_cache:
+                    cached = self.search_cache.get(self._search_key(query))
+                    if cached is not None:
+                        return cached
+                result = await self.tool_executor.ainvoke(self._search_invocation(query))
+                return await self._astore_search(query, result)
+            
+            async def search() -> List[Dict[str, Any]]:
+                if self.search_upstream is None:
+                    return await fetch()
+                return await self.search_upstream.acall(fetch, priority=state.priority if state else "interactive")
+            
+            return await self.inflight_searches.ado(self._search_key(query), search)
+    
+    def _build_search_group(self, query: str, outcome: Any) -> SearchGroup:
+        """
+        Build the search group for a query from its results or its exception.
+        
+        Args:
+            query: Search query
+            outcome: List of search hits, or the exception raised by the search
+            
+        Returns:
+            Search group with the query and its results
+        """
+        if isinstance(outcome, BaseException):
+            return SearchGroup(query, error=format_error(outcome))
+        
+        return SearchGroup(query, outcome)
+    
+    def _on_search_done(self, query: str, outcome: Any, config: Optional[Dict[str, Any]]) -> None:
+        """
+        Log a finished search and report it to the listener of the request.
+        
+        Args:
+            query: Search query
+            outcome: List of search hits, or the exception raised by the search
+            config: Runnable config of the current request
+        """
+        if isinstance(outcome, BaseException):
+            logger.warning(f"Search failed for '{query}': {str(outcome)}")
+            emit_event(config, "search_completed", query=query, results_count=0, error=str(outcome))
+        else:
+            logger.info(f"Search completed for '{query}', found {len(outcome)} results")
+            emit_event(config, "search_completed", query=query, results_count=len(outcome))
+    
+    def _execute_searches(
+        self,
+        queries: Iterable[str],
+        bypass_cache: bool = False,
+        config: Optional[Dict[str, Any]] = None,
+        state: Optional[AgentState] = None
+    ) -> List[SearchGroup]:
+        """
+        Execute the search queries concurrently on a bounded thread pool.
+        
+        Results keep the order of the input queries. A failed search does not
+        abort the others; its group gets empty results and an "error" entry.
+        Each query is submitted as soon as `queries` yields it, so searches
+        can start while a generator is still producing queries.
+        
+        Args:
+            queries: Search queries to execute, as a list or a generator
+            bypass_cache: Skip cached results and search again
+            config: Runnable config of the request, used to report progress
+            state: State to record search timings on, if any
+            
+        Returns:
+            List of search groups, one per query
+        """
+        if isinstance(queries, Sized) and not queries:
+            return []
+        
+        settings = get_settings()
+        max_workers = settings.max_concurrent_searches
+        if isinstance(queries, Sized):
+            max_workers = min(max_workers, len(queries))
+        submitted = []
+        search_results = []
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="search") as executor:
+            futures = []
+            for query in queries:
                 logger.info(f"Executing search for: {query}")
-                tool_input = {
-                    "query": query, 
-                    "max_results": settings.max_search_results_per_query
-                }
-                
-                result = self.tool_executor.invoke({
-                    "tool_name": "tavily_search_results_json", 
-                    "tool_input": tool_input
-                })
-                
-                search_results.append({
-                    "query": query, 
-                    "results": result
-                })
-                
-                logger.info(f"Search completed for '{query}', found {len(result)} results")
-            
-            # Update the state with research results
-            state.research_results = search_results
-            
-            # Add intermediate step
-            state.add_intermediate_step(
-                agent_name="research_agent",
-                action="search",
-                details={
-                    "search_queries": search_queries_result,
-                    "results_summary": f"Found {sum(len(r['results']) for r in search_results)} results from {len(search_results)} queries"
-                }
-            )
+                future = executor.submit(self._run_search, query, bypass_cache, state)
+                # Report each search as soon as it finishes, not in query order
+                future.add_done_callback(
+                    lambda f, query=query: self._on_search_done(query, f.exception() or f.result(), config)
+                )
+                futures.append(future)
+                submitted.append(query)
             
-            return state
+            for query, future in zip(submitted, futures):
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = e
+                search_results.append(self._build_search_group(query, outcome))
+        
+        return search_results
+    
+    async def _aexecute_searches(
+        self,
+        queries: Union[Iterable[str], AsyncIterable[str]],
+        bypass_cache: bool = False,
+        config: Optional[Dict[str, Any]] = None,
+        state: Optional[AgentState] = None
+    ) -> List[SearchGroup]:
+        """
+        Execute the search queries concurrently on the event loop.
+        
+        Same ordering and failure isolation as `_execute_searches`, with at
+        most `max_concurrent_searches` searches in flight.
+        
+        Args:
+            queries: Search queries to execute, as a list or an async generator
+            bypass_cache: Skip cached results and search again
+            config: Runnable config of the request, used to report progress
+            state: State to record search timings on, if any
             
-        except Exception as e:
-            logger.error(f"Error in research agent: {str(e)}")
-            error_details = format_error(e)
+        Returns:
+            List of search groups, one per query
+        """
+        settings = get_settings()
+        semaphore = asyncio.Semaphore(max(1, settings.max_concurrent_searches))
+        
+        async def bounded_search(query: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                logger.info(f"Executing search for: {query}")
+                try:
+                    result = await self._arun_search(query, bypass_cache, state)
+                except Exception as e:
+                    self._on_search_done(query, e, config)
+                    raise
+                self._on_search_done(query, result, config)
+                return result
+        
+        submitted = []
+        tasks = []
+        
+        def submit(query: str) -> None:
+            submitted.append(query)
+            tasks.append(asyncio.ensure_future(bounded_search(query)))
+        
+        try:
+            if isinstance(queries, AsyncIterable):
+                async for query in queries:
+                    submit(query)
+            else:
+                for query in queries:
+                    submit(query)
+        except BaseException:
+            # Let the searches already started finish before giving up
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return [self._build_search_group(query, outcome) for query, outcome in zip(submitted, outcomes)]
+    
+    def _query_generation_input(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Build the input of the query generation chain.
+        
+        Args:
+            state: Current state of the agent system
             
-            # Update state with error
-            state.error = f"Research agent error: {error_details}"
+        Returns:
+            Input variables for the query generation prompt
+        """
+        settings = get_settings()
+        return {
+            "query": state.query,
+            "num_search_queries": settings.num_search_queries
+        }
+    
+    def _follow_up_input(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Build the input of the follow-up query generation chain.
+        
+        Args:
+            state: Current state of the agent system
             
-            # Add error to intermediate steps
-            state.add_intermediate_step(
-                agent_name="research_agent",
-                action="error",
-                details={"error": error_details}
-            )
+        Returns:
+            Input variables for the follow-up prompt
+        """
+        settings = get_settings()
+        coverage = assess_coverage(state.query, state.research_results)
+        return {
+            "query": state.query,
+            "searched_queries": "\n".join(f"- {group['query']}" for group in state.research_results),
+            "missing_terms": ", ".join(coverage["missing_terms"]) or "none",
+            "num_search_queries": settings.num_search_queries
+        }
+    
+    def _query_generation(self, state: AgentState) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Select the query generation chain and input for the current round.
+        
+        Args:
+            state: Current state of the agent system
+            
+        Returns:
+            Tuple of the chain and its input
+        """
+        if state.research_round:
+            return self.follow_up_chain, self._follow_up_input(state)
+        return self.query_generation_chain, self._query_generation_input(state)
+    
+    def _new_queries(self, state: AgentState, queries: List[str]) -> List[str]:
+        """
+        Drop the search queries that earlier rounds already searched.
+        
+        Args:
+            state: Current state of the agent system
+            queries: Generated search queries
+            
+        Returns:
+            Search queries not searched yet, in order
+        """
+        searched = {self._search_key(group["query"]) for group in state.research_results}
+        return [query for query in queries if self._search_key(query) not in searched]
+    
+    def _complete_queries(self, partial: Any, final: bool = False) -> List[str]:
+        """
+        Get the search queries of a partially parsed query generation output
+        that are completely generated.
+        
+        While the output is streamed, the last query may still be cut off. It
+        is complete once another query or another key follows it.
+        
+        Args:
+            partial: Partial JSON output of the query generation chain
+            final: The output is complete
+            
+        Returns:
+            Completely generated search queries, in order
+        """
+        if not isinstance(partial, dict) or not isinstance(partial.get("search_queries"), list):
+            return []
+        
+        queries = partial["search_queries"]
+        keys = list(partial)
+        if not final and keys.index("search_queries") == len(keys) - 1:
+            queries = queries[:-1]
+        return [query for query in queries if isinstance(query, str) and query.strip()]
+    
+    def _generated_queries(self, partial: Any, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate the complete output of a streamed query generation and report it.
+        
+        Args:
+            partial: Last output of the query generation chain
+            config: Runnable config of the current request
+            
+        Returns:
+            Query generation output with the search queries
+        """
+        if not isinstance(partial, dict) or not isinstance(partial.get("search_queries"), list):
+            raise ValueError(f"Query generation returned no search queries: {partial}")
+        
+        queries = self._complete_queries(partial, final=True)
+        logger.info(f"Generated {len(queries)} search queries")
+        emit_event(config, "queries_generated", queries=queries)
+        return {**partial, "search_queries": queries}
+    
+    def _streamed_on_light_model(self, state: AgentState, partial: Any) -> bool:
+        """
+        Check whether a streamed query generation output needs the strong model's fallback.
+        
+        A streamed output is only parsed partially, so the light model's
+        malformed outputs are not retried by the routed chain itself.
+        
+        Args:
+            state: Current state of the agent system
+            partial: Last output of the streamed query generation chain
+            
+        Returns:
+            True if the output is malformed and came from the light model
+        """
+        settings = get_settings()
+        if self.light_llm is None or is_complex_query(state.query, settings.routing_max_query_words):
+            return False
+        if isinstance(partial, dict) and isinstance(partial.get("search_queries"), list):
+            return False
+        logger.warning("Light model output for query_generation could not be parsed, retrying with the strong model")
+        get_metrics().increment("model_fallbacks_total", labels={"stage": "query_generation"})
+        return True
+    
+    def _speculative_queries(
+        self,
+        state: AgentState,
+        config: Optional[Dict[str, Any]],
+        generated: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Yield the raw query, then each generated search query as soon as it is parsed.
+        
+        The raw query is yielded before the query generation LLM is called,
+        so its search runs while the search queries are generated.
+        
+        Args:
+            state: Current state of the agent system
+            config: Runnable config of the calling workflow node, if any
+            generated: Receives the query generation output under "result"
+            
+        Yields:
+            Search queries
+        """
+        yield state.query
+        
+        partial = None
+        dispatched = 0
+        with timed("query_generation", state):
+            for partial in self.query_generation_chain.stream(
+                self._query_generation_input(state),
+                config=build_run_config(state, config)
+            ):
+                queries = self._complete_queries(partial)
+                yield from queries[dispatched:]
+                dispatched = len(queries)
+            if self._streamed_on_light_model(state, partial):
+                partial = self.strong_query_generation_chain.invoke(
+                    self._query_generation_input(state),
+                    config=build_run_config(state, config)
+                )
+        
+        generated["result"] = self._generated_queries(partial, config)
+        yield from generated["result"]["search_queries"][dispatched:]
+    
+    async def _aspeculative_queries(
+        self,
+        state: AgentState,
+        config: Optional[Dict[str, Any]],
+        generated: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """
+        Async version of `_speculative_queries`.
+        
+        Args:
+            state: Current state of the agent system
+            config: Runnable config of the calling workflow node, if any
+            generated: Receives the query generation output under "result"
+            
+        Yields:
+            Search queries
+        """
+        yield state.query
+        
+        partial = None
+        dispatched = 0
+        with timed("query_generation", state):
+            async for partial in self.query_generation_chain.astream(
+                self._query_generation_input(state),
+                config=build_run_config(state, config)
+            ):
+                queries = self._complete_queries(partial)
+                for query in queries[dispatched:]:
+                    yield query
+                dispatched = len(queries)
+            if self._streamed_on_light_model(state, partial):
+                partial = await self.strong_query_generation_chain.ainvoke(
+                    self._query_generation_input(state),
+                    config=build_run_config(state, config)
+                )
+        
+        generated["result"] = self._generated_queries(partial, config)
+        for query in generated["result"]["search_queries"][dispatched:]:
+            yield query
+    
+    def _update_state(
+        self,
+        state: AgentState,
+        search_queries_result: Dict[str, Any],
+        search_results: List[SearchGroup]
+    ) -> AgentState:
+        """
+        Record the research results of a round on the state.
+        
+        Args:
+            state: Current state of the agent system
+            search_queries_result: Output of the query generation chain
+            search_results: Search groups, one per query
             
+        Returns:
+            Updated state with research results
+        """
+        first_round = not state.research_round
+        # Later rounds only add to the results, so their failures are not fatal
+        if first_round and search_results and all("error" in group for group in search_results):
+            raise RuntimeError(f"All {len(search_results)} searches failed. First error: {search_results[0]['error']}")
+        
+        # Update the state with research results
+        state.research_results = state.research_results + search_results
+        state.research_round += 1
+        
+        # Add intermediate step
+        state.add_intermediate_step(
+            agent_name="research_agent",
+            action="search" if first_round else "follow_up_search",
+            details={
+                "round": state.research_round,
+                # Only the queries; the rest of the generation output is not kept on the state
+                "search_queries": search_queries_result["search_queries"],
+                "results_summary": f"Found {sum(len(r['results']) for r in search_results)} results from {len(search_results)} queries"
+            }
+        )
+        
+        return state
+    
+    def _check_coverage(
+        self,
+        state: AgentState,
+        search_results: List[SearchGroup],
+        seen_urls: Set[str],
+        round_seconds: float,
+        config: Optional[Dict[str, Any]] = None
+    ) -> AgentState:
+        """
+        Decide whether research is complete after a round.
+        
+        Research stops once the results mention enough of the query's key
+        terms, when a round found few pages earlier rounds had not, after
+        `max_research_rounds` rounds, or when the time or token budget of
+        the query is spent. The first reason that applies is reported. With
+        a single round allowed, research is complete without a check.
+        
+        Args:
+            state: Current state of the agent system
+            search_results: Search groups of the round
+            seen_urls: Canonical URLs found before the round
+            round_seconds: Duration of the round so far
+            config: Runnable config of the current request
+            
+        Returns:
+            Updated state with `research_complete` set
+        """
+        settings = get_settings()
+        if settings.max_research_rounds <= 1:
+            state.research_complete = True
             return state
+        
+        coverage = assess_coverage(state.query, state.research_results)
+        novelty = novel_url_ratio(search_results, seen_urls)
+        # Earlier rounds are already recorded in the stage timings
+        research_seconds = round_seconds + sum(
+            timing["duration_seconds"] for timing in state.stage_timings if timing["stage"] == "research"
+        )
+        content_tokens = sum(
+            count_tokens(hit.get("content") or "")
+            for group in state.research_results
+            for hit in group["results"]
+        )
+        
+        if coverage["coverage"] >= settings.research_coverage_threshold:
+            stop_reason = "covered"
+        elif state.research_round > 1 and novelty < settings.research_min_novel_url_ratio:
+            stop_reason = "few_novel_urls"
+        elif state.research_round >= settings.max_research_rounds:
+            stop_reason = "max_rounds"
+        elif research_seconds >= settings.research_time_budget_seconds:
+            stop_reason = "time_budget"
+        elif content_tokens >= settings.research_token_budget:
+            stop_reason = "token_budget"
+        else:
+            stop_reason = None
+        
+        state.research_complete = stop_reason is not None
+        if state.research_complete:
+            logger.info(f"Research complete after {state.research_round} rounds: {stop_reason}")
+            get_metrics().increment("research_rounds_total", state.research_round, {"stop_reason": stop_reason})
+        else:
+            logger.info(f"Research round {state.research_round} missed terms {coverage['missing_terms']}, searching again")
+        
+        emit_event(
+            config,
+            "coverage_checked",
+            round=state.research_round,
+            coverage=coverage["coverage"],
+            research_complete=state.research_complete
+        )
+        state.add_intermediate_step(
+            agent_name="research_agent",
+            action="coverage_check",
+            details={
+                "round": state.research_round,
+                **coverage,
+                "novel_url_ratio": novelty,
+                "research_seconds": round(research_seconds, 3),
+                "content_tokens": content_tokens,
+                "stop_reason": stop_reason
+            }
+        )
+        
+        return state
+    
+    def _handle_error(self, state: AgentState, e: Exception) -> AgentState:
+        """
+        Record an error raised while processing on the state.
+        
+        Args:
+            state: Current state of the agent system
+            e: The exception that was raised
+            
+        Returns:
+            Updated state with the error
+        """
+        logger.error(f"Error in research agent: {str(e)}")
+        error_details = format_error(e)
+        
+        # Update state with error
+        state.error = f"Research agent error: {error_details}"
+        
+        # Add error to intermediate steps
+        state.add_intermediate_step(
+            agent_name="research_agent",
+            action="error",
+            details={"error": error_details}
+        )
+        
+        return state
+    
+    def process(self, state: AgentState, config: Optional[Dict[str, Any]] = None) -> AgentState:
+        """
+        Process the state and gather research information.
+        
+        Args:
+            state: Current state of the agent system
+            config: Runnable config of the calling workflow node, if any
+            
+        Returns:
+            Updated state with research results
+        """
+        logger.info(f"Research agent processing query: {state.query}")
+        
+        try:
+            started = time.perf_counter()
+            seen_urls = result_urls(state.research_results)
+            with timed("research", state, round=state.research_round + 1):
+                if get_settings().speculative_search_enabled and not state.research_round:
+                    # Search the raw query and each generated query while generation continues
+                    generated: Dict[str, Any] = {}
+                    search_results = self._execute_searches(
+                        self._speculative_queries(state, config, generated),
+                        bypass_cache=state.bypass_cache,
+                        config=config,
+                        state=state
+                    )
+                    search_queries_result = generated["result"]
+                else:
+                    # Generate search queries, targeted at the gaps after the first round
+                    chain, chain_input = self._query_generation(state)
+                    with timed("query_generation", state):
+                        search_queries_result = chain.invoke(chain_input, config=build_run_config(state, config))
+                    
+                    search_queries = self._new_queries(state, search_queries_result["search_queries"])
+                    logger.info(f"Generated {len(search_queries)} search queries")
+                    emit_event(config, "queries_generated", queries=search_queries)
+                    
+                    # Execute all searches concurrently
+                    search_results = self._execute_searches(
+                        search_queries,
+                        bypass_cache=state.bypass_cache,
+                        config=config,
+                        state=state
+                    )
+                
+                state = self._update_state(state, search_queries_result, search_results)
+                return self._check_coverage(state, search_results, seen_urls, time.perf_counter() - started, config)
+            
+        except Exception as e:
+            return self._handle_error(state, e)
+    
+    async def aprocess(self, state: AgentState, config: Optional[Dict[str, Any]] = None) -> AgentState:
+        """
+        Asynchronously process the state and gather research information.
+        
+        Args:
+            state: Current state of the agent system
+            config: Runnable config of the calling workflow node, if any
+            
+        Returns:
+            Updated state with research results
+        """
+        logger.info(f"Research agent processing query: {state.query}")
+        
+        try:
+            started = time.perf_counter()
+            seen_urls = result_urls(state.research_results)
+            with timed("research", state, round=state.research_round + 1):
+                if get_settings().speculative_search_enabled and not state.research_round:
+                    # Search the raw query and each generated query while generation continues
+                    generated: Dict[str, Any] = {}
+                    search_results = await self._aexecute_searches(
+                        self._aspeculative_queries(state, config, generated),
+                        bypass_cache=state.bypass_cache,
+                        config=config,
+                        state=state
+                    )
+                    search_queries_result = generated["result"]
+                else:
+                    # Generate search queries, targeted at the gaps after the first round
+                    chain, chain_input = self._query_generation(state)
+                    with timed("query_generation", state):
+                        search_queries_result = await chain.ainvoke(chain_input, config=build_run_config(state, config))
+                    
+                    search_queries = self._new_queries(state, search_queries_result["search_queries"])
+                    logger.info(f"Generated {len(search_queries)} search queries")
+                    emit_event(config, "queries_generated", queries=search_queries)
+                    
+                    # Execute all searches concurrently
+                    search_results = await self._aexecute_searches(
+                        search_queries,
+                        bypass_cache=state.bypass_cache,
+                        config=config,
+                        state=state
+                    )
+                
+                state = self._update_state(state, search_queries_result, search_results)
+                return self._check_coverage(state, search_results, seen_urls, time.perf_counter() - started, config)
+            
+        except Exception as e:
+            return self._handle_error(state, e)
 
-# Function for use in the LangGraph workflow
-def research_agent_node(state: AgentState) -> AgentState:
+# Functions for use in the LangGraph workflow
+def research_agent_node(
+    state: AgentState,
+    agent: Optional[ResearchAgent] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> AgentState:
     """
     Node function for the research agent in the LangGraph workflow.
     
     Args:
         state: Current state of the workflow
+        agent: Shared agent instance; a new one is created if omitted
+        config: Runnable config of the workflow run
+        
+    Returns:
+        Updated state after research agent processing
+    """
+    agent = agent or ResearchAgent()
+    return agent.process(state, config)
+
+async def aresearch_agent_node(
+    state: AgentState,
+    agent: Optional[ResearchAgent] = None,
+    config: Optional[Dict[str, Any]] = None
+) -> AgentState:
+    """
+    Async node function for the research agent in the LangGraph workflow.
+    
+    Args:
+        state: Current state of the workflow
+        agent: Shared agent instance; a new one is created if omitted
+        config: Runnable config of the workflow run
         
     Returns:
         Updated state after research agent processing
     """
-    agent = ResearchAgent()
-    return agent.process(state)
\ No newline at end of file
+    agent = agent or ResearchAgent()
+    return await agent.aprocess(state, config)
\ No newline at end of file
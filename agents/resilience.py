@@ -0,0 +1,608 @@
+"""
+Resilience layer for upstream calls of the AI Agentic Research System.
+Provides per-call timeouts, retries with exponential backoff and jitter,
+a circuit breaker per upstream and hedged requests.
+"""
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Iterator, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from agents.metrics import get_metrics, percentile
+from agents.rate_limit import RateLimiter
+from agents.token_budget import count_tokens
+from agents.utils import get_priority
+from config.settings import get_settings
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+# Client errors with these HTTP statuses are transient and worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the upstream's circuit is open."""
+
+class UpstreamTimeoutError(TimeoutError):
+    """Raised when an upstream call does not finish within its timeout."""
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed call is worth retrying.
+
+    Rejections by an open circuit and client errors (HTTP 4xx other than
+    timeouts, conflicts and rate limits) are not retried.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        True if the call should be retried
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in RETRYABLE_STATUS_CODES
+    return True
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Compute the delay before a retry with exponential backoff and full jitter.
+
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+        base_delay: Delay ceiling of the first retry in seconds
+        max_delay: Maximum delay ceiling in seconds
+
+    Returns:
+        Delay in seconds, uniformly drawn below the exponential ceiling
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected for `reset_timeout` seconds. Then a single probe
+    call is let through (half-open): its success closes the circuit, its
+    failure opens it again. A probe that ends without an outcome (e.g. it
+    is cancelled) is released, so the next call probes instead.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        # Number of the probe in flight, 0 if there is none
+        self._probing = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit for {self.name} is now {state}")
+            get_metrics().increment("circuit_transitions_total", labels={"upstream": self.name, "state": state})
+        self.state = state
+
+    def before_call(self) -> Optional[int]:
+        """
+        Admit a call or reject it.
+
+        Returns:
+            Number of the probe if the call is the half-open probe, else None
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe in flight
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(self.HALF_OPEN)
+                self._probing = 0
+
+            if self.state == self.CLOSED:
+                return None
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probes += 1
+                self._probing = self._probes
+                return self._probing
+
+        get_metrics().increment("upstream_rejections_total", labels={"upstream": self.name})
+        raise CircuitOpenError(f"Circuit for {self.name} is open, not calling it")
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._probing = 0
+            self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        with self._lock:
+            self._failures += 1
+            self._probing = 0
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(self.OPEN)
+
+    def release_probe(self, probe: Optional[int]) -> None:
+        """
+        Give up a call admitted by `before_call` without recording an outcome.
+
+        Args:
+            probe: Value returned by `before_call` for the call
+        """
+        if probe is None:
+            return
+        with self._lock:
+            if self._probing == probe:
+                self._probing = 0
+
+class Upstream:
+    """
+    Calls an upstream service with timeouts, retries and a circuit breaker.
+
+    Sync calls with a timeout or hedging run on a private thread pool so the
+    caller can stop waiting; a timed-out call keeps its thread until the
+    underlying client gives up, so clients should have their own timeouts too.
+    With hedging, a duplicate call is started if the first one is still
+    running after the `hedge_quantile` of recent latencies, and the first
+    successful response wins.
+    """
+    def __init__(
+        self,
+        name: str,
+        timeout: Optional[float] = None,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 95.0,
+        hedge_min_samples: int = 20,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_workers: int = 32
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker(name)
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.rate_limiter = rate_limiter
+        self.max_workers = max_workers
+        self._latencies: Deque[float] = deque(maxlen=500)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Get how long to wait before hedging a call.
+
+        Returns:
+            The configured quantile of recent latencies in seconds, or None
+            if hedging is disabled or too few calls have been observed
+        """
+        if not self.hedge:
+            return None
+        with self._lock:
+            latencies = list(self._latencies)
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        return percentile(latencies, self.hedge_quantile)
+
+    def _submit(self, fn: Callable[[], Any]) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"upstream-{self.name}"
+                )
+        # Run in a copy of the caller's context so callbacks and tracing still apply
+        return self._executor.submit(contextvars.copy_context().run, fn)
+
+    def _admit(self, tokens: float, priority: str) -> Optional[int]:
+        probe = self.breaker.before_call()
+        if self.rate_limiter is not None:
+            try:
+                self.rate_limiter.acquire(tokens, priority)
+            except BaseException:
+                self.breaker.release_probe(probe)
+                raise
+        return probe
+
+    async def _aadmit(self, tokens: float, priority: str) -> Optional[int]:
+        probe = self.breaker.before_call()
+        if self.rate_limiter is not None:
+            try:
+                await self.rate_limiter.aacquire(tokens, priority)
+            except BaseException:
+                self.breaker.release_probe(probe)
+                raise
+        return probe
+
+    def _may_hedge(self, tokens: float) -> bool:
+        # A hedge is only worth sending if it does not have to wait for the rate limit
+        return self.rate_limiter is None or self.rate_limiter.try_acquire(tokens)
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    def _timed_out(self) -> UpstreamTimeoutError:
+        get_metrics().increment("upstream_timeouts_total", labels={"upstream": self.name})
+        return UpstreamTimeoutError(f"{self.name} call timed out after {self.timeout}s")
+
+    def _succeeded(self, duration: float) -> None:
+        self.breaker.record_success()
+        with self._lock:
+            self._latencies.append(duration)
+
+    def _failed(self, error: BaseException, attempt: int) -> Optional[float]:
+        """
+        Record a failed attempt.
+
+        Args:
+            error: Exception raised by the attempt
+            attempt: Number of the attempt, starting at 0
+
+        Returns:
+            Delay before retrying in seconds, or None to give up
+        """
+        if isinstance(error, CircuitOpenError):
+            return None
+
+        if not is_retryable(error):
+            # A client error still shows the upstream is reachable
+            self.breaker.record_success()
+            return None
+
+        self.breaker.record_failure()
+        if attempt + 1 >= self.max_attempts:
+            return None
+
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        get_metrics().increment("upstream_retries_total", labels={"upstream": self.name})
+        logger.warning(
+            f"{self.name} call failed ({str(error) or type(error).__name__}), "
+            f"retrying in {delay:.2f}s (attempt {attempt + 2}/{self.max_attempts})"
+        )
+        return delay
+
+    def _call_once(self, fn: Callable[[], Any], tokens: float) -> Any:
+        hedge_delay = self.hedge_delay()
+        if self.timeout is None and hedge_delay is None:
+            return fn()
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        futures = [self._submit(fn)]
+        try:
+            if hedge_delay is not None:
+                remaining = self._remaining(deadline)
+                done, _ = wait(futures, timeout=hedge_delay if remaining is None else min(hedge_delay, remaining))
+                if not done and (deadline is None or time.monotonic() < deadline) and self._may_hedge(tokens):
+                    get_metrics().increment("hedged_requests_total", labels={"upstream": self.name})
+                    futures.append(self._submit(fn))
+
+            pending = set(futures)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = wait(pending, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise self._timed_out()
+                for future in done:
+                    if future.exception() is None:
+                        if future is not futures[0]:
+                            get_metrics().increment("hedge_wins_total", labels={"upstream": self.name})
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def _acall_once(self, fn: Callable[[], Awaitable[Any]], tokens: float) -> Any:
+        hedge_delay = self.hedge_delay()
+        if self.timeout is None and hedge_delay is None:
+            return await fn()
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            if hedge_delay is not None:
+                remaining = self._remaining(deadline)
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay if remaining is None else min(hedge_delay, remaining))
+                if not done and (deadline is None or time.monotonic() < deadline) and self._may_hedge(tokens):
+                    get_metrics().increment("hedged_requests_total", labels={"upstream": self.name})
+                    tasks.append(asyncio.ensure_future(fn()))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise self._timed_out()
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            get_metrics().increment("hedge_wins_total", labels={"upstream": self.name})
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def call(self, fn: Callable[[], Any], tokens: float = 0, priority: str = "interactive") -> Any:
+        """
+        Call the upstream, retrying failed attempts.
+
+        Args:
+            fn: Callable making the upstream call
+            tokens: LLM tokens the call will use, for the rate limiter
+            priority: "interactive" or "batch", for the rate limiter
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: The error of the last attempt if all attempts failed
+        """
+        attempt = 0
+        while True:
+            probe = self._admit(tokens, priority)
+            start = time.perf_counter()
+            try:
+                result = self._call_once(fn, tokens)
+            except Exception as e:
+                delay = self._failed(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            except BaseException:
+                # Cancelled or interrupted: there is no outcome to record
+                self.breaker.release_probe(probe)
+                raise
+            else:
+                self._succeeded(time.perf_counter() - start)
+                return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], tokens: float = 0, priority: str = "interactive") -> Any:
+        """
+        Asynchronously call the upstream, retrying failed attempts.
+
+        Args:
+            fn: Coroutine function making the upstream call
+            tokens: LLM tokens the call will use, for the rate limiter
+            priority: "interactive" or "batch", for the rate limiter
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: The error of the last attempt if all attempts failed
+        """
+        attempt = 0
+        while True:
+            probe = await self._aadmit(tokens, priority)
+            start = time.perf_counter()
+            try:
+                result = await self._acall_once(fn, tokens)
+            except Exception as e:
+                delay = self._failed(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            except BaseException:
+                # Cancelled or interrupted: there is no outcome to record
+                self.breaker.release_probe(probe)
+                raise
+            else:
+                self._succeeded(time.perf_counter() - start)
+                return result
+
+    def stream(self, fn: Callable[[], Iterator[Any]], tokens: float = 0, priority: str = "interactive") -> Iterator[Any]:
+        """
+        Stream from the upstream, retrying attempts that fail before the first chunk.
+
+        Once a chunk has been yielded a failure is raised, since the caller
+        has already consumed part of the response. The timeout does not
+        apply to streams.
+
+        Args:
+            fn: Callable starting the stream
+            tokens: LLM tokens the call will use, for the rate limiter
+            priority: "interactive" or "batch", for the rate limiter
+
+        Yields:
+            Chunks of the first attempt that produced one
+        """
+        attempt = 0
+        while True:
+            probe = self._admit(tokens, priority)
+            start = time.perf_counter()
+            try:
+                iterator = iter(fn())
+                first = next(iterator)
+            except StopIteration:
+                self._succeeded(time.perf_counter() - start)
+                return
+            except Exception as e:
+                delay = self._failed(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release_probe(probe)
+                raise
+
+            try:
+                yield first
+                yield from iterator
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # The consumer closed the stream early or was cancelled
+                self.breaker.release_probe(probe)
+                raise
+            self._succeeded(time.perf_counter() - start)
+            return
+
+    async def astream(
+        self,
+        fn: Callable[[], AsyncIterator[Any]],
+        tokens: float = 0,
+        priority: str = "interactive"
+    ) -> AsyncIterator[Any]:
+        """
+        Asynchronously stream from the upstream, retrying attempts that fail before the first chunk.
+
+        Args:
+            fn: Callable starting the async stream
+            tokens: LLM tokens the call will use, for the rate limiter
+            priority: "interactive" or "batch", for the rate limiter
+
+        Yields:
+            Chunks of the first attempt that produced one
+        """
+        attempt = 0
+        while True:
+            probe = await self._aadmit(tokens, priority)
+            start = time.perf_counter()
+            try:
+                iterator = fn().__aiter__()
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                self._succeeded(time.perf_counter() - start)
+                return
+            except Exception as e:
+                delay = self._failed(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release_probe(probe)
+                raise
+
+            try:
+                yield first
+                async for chunk in iterator:
+                    yield chunk
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # The consumer closed the stream early or was cancelled
+                self.breaker.release_probe(probe)
+                raise
+            self._succeeded(time.perf_counter() - start)
+            return
+
+def create_upstream(
+    name: str,
+    timeout: Optional[float] = None,
+    hedge: bool = False,
+    rate_limiter: Optional[RateLimiter] = None
+) -> Upstream:
+    """
+    Create an upstream with the retry and circuit breaker settings.
+
+    Args:
+        name: Name of the upstream, used in logs and metric labels
+        timeout: Per-call timeout in seconds, None or 0 for no timeout
+        hedge: Enable hedged requests
+        rate_limiter: Rate limiter every attempt must pass, if any
+
+    Returns:
+        The configured upstream
+    """
+    settings = get_settings()
+    return Upstream(
+        name,
+        timeout=timeout or None,
+        max_attempts=settings.retry_max_attempts,
+        base_delay=settings.retry_base_delay_seconds,
+        max_delay=settings.retry_max_delay_seconds,
+        breaker=CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_timeout=settings.circuit_reset_seconds
+        ),
+        hedge=hedge,
+        hedge_quantile=settings.search_hedge_quantile,
+        hedge_min_samples=settings.search_hedge_min_samples,
+        rate_limiter=rate_limiter
+    )
+
+class ResilientChatModel(Runnable[PromptValue, BaseMessage]):
+    """
+    Routes the calls of a chat model through an Upstream.
+
+    Each call is charged to the rate limiter with the prompt's tokens plus
+    `completion_tokens`, the expected size of the response, and with the
+    priority of the request. Attributes not defined here (e.g. model_name,
+    temperature) are read from the wrapped model, so cache keys are
+    unaffected by the wrapper.
+    """
+    def __init__(self, llm: Any, upstream: Upstream, completion_tokens: int = 1000):
+        self.llm = llm
+        self.upstream = upstream
+        self.completion_tokens = completion_tokens
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ("llm", "upstream", "completion_tokens"):
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def _cost(self, input: PromptValue, config: Optional[RunnableConfig]) -> Tuple[float, str]:
+        limiter = self.upstream.rate_limiter
+        if limiter is None or limiter.tokens is None:
+            return 0, get_priority(config)
+
+        rendered = input.to_string() if isinstance(input, PromptValue) else str(input)
+        model = getattr(self.llm, "model_name", None) or "gpt-4"
+        return count_tokens(rendered, model) + self.completion_tokens, get_priority(config)
+
+    def invoke(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        tokens, priority = self._cost(input, config)
+        return self.upstream.call(lambda: self.llm.invoke(input, config, **kwargs), tokens, priority)
+
+    async def ainvoke(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        tokens, priority = self._cost(input, config)
+        return await self.upstream.acall(lambda: self.llm.ainvoke(input, config, **kwargs), tokens, priority)
+
+    def stream(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[BaseMessageChunk]:
+        tokens, priority = self._cost(input, config)
+        yield from self.upstream.stream(lambda: self.llm.stream(input, config, **kwargs), tokens, priority)
+
+    async def astream(self, input: PromptValue, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[BaseMessageChunk]:
+        tokens, priority = self._cost(input, config)
+        async for chunk in self.upstream.astream(lambda: self.llm.astream(input, config, **kwargs), tokens, priority):
+            yield chunk
@@ -0,0 +1,217 @@
+"""
+Semantic answer cache for the AI Agentic Research System.
+Answers paraphrases of previously answered queries from a nearest-neighbour
+index over query embeddings.
+"""
+import os
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+import numpy as np
+
+from agents.cache import BaseCache, make_cache_key, normalize_query
+from agents.embeddings import Embedder
+from models.search import results_to_dicts
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w(?:[\w.\-]*\w)?")
+
+def query_entities(query: str) -> Set[str]:
+    """
+    Get the tokens of a query that name a specific thing.
+
+    Numbers, tokens containing digits, acronyms and capitalized words after
+    the first one are taken as entities. Queries that only differ in one
+    such token (a year, a version, a product or a place) are close in
+    embedding space but need different answers.
+
+    Args:
+        query: Query text
+
+    Returns:
+        Lowercased entity tokens
+    """
+    entities = set()
+    for position, token in enumerate(_TOKEN.findall(query)):
+        if (
+            any(char.isdigit() for char in token)
+            or (len(token) > 1 and token.isupper())
+            or (position > 0 and token[0].isupper())
+        ):
+            entities.add(token.lower())
+    return entities
+
+class SemanticCache:
+    """
+    Cache of answered queries looked up by embedding similarity.
+
+    Query embeddings are kept in a NumPy matrix, so a lookup is a single
+    matrix-vector product. The matrix is persisted to `index_path` (.npz)
+    and bounded to `max_entries` rows, evicting the least recently used.
+    The answers themselves (research results and final answer) live in a
+    key/value cache, which applies its own TTL; an index row whose answer
+    has expired is dropped on lookup.
+
+    A similar query only matches if it names the same entities (see
+    `query_entities`), so "population of France in 2010" is not answered
+    with the answer for 2020.
+    """
+    def __init__(
+        self,
+        embedder: Embedder,
+        store: BaseCache,
+        index_path: Optional[str] = None,
+        max_entries: int = 1000,
+        threshold: float = 0.9
+    ):
+        self.embedder = embedder
+        self.store = store
+        self.index_path = index_path
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+        self._keys: List[str] = []
+        self._queries: List[str] = []
+        self._last_used = np.zeros(0, dtype=np.float64)
+        self._lock = threading.Lock()
+
+        if index_path and os.path.exists(index_path):
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with np.load(self.index_path, allow_pickle=False) as data:
+                if str(data["embedder"]) != self.embedder.name:
+                    logger.warning(f"Semantic cache index at {self.index_path} uses another embedder, ignoring it")
+                    return
+                self._vectors = data["vectors"].astype(np.float32)
+                self._keys = [str(key) for key in data["keys"]]
+                self._queries = [str(query) for query in data["queries"]]
+                self._last_used = data["last_used"].astype(np.float64)
+            logger.info(f"Loaded semantic cache index with {len(self._keys)} entries")
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Failed to load semantic cache index from {self.index_path}: {str(e)}")
+
+    def _save(self) -> None:
+        """Persist the index atomically. Must hold the lock."""
+        if not self.index_path:
+            return
+
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(
+                tmp_path,
+                embedder=np.array(self.embedder.name),
+                vectors=self._vectors,
+                keys=np.array(self._keys, dtype=str),
+                queries=np.array(self._queries, dtype=str),
+                last_used=self._last_used
+            )
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save semantic cache index to {self.index_path}: {str(e)}")
+
+    def _remove(self, rows: List[int]) -> None:
+        """Remove index rows. Must hold the lock."""
+        keep = np.ones(len(self._keys), dtype=bool)
+        keep[rows] = False
+        self._vectors = self._vectors[keep]
+        self._last_used = self._last_used[keep]
+        self._keys = [key for key, kept in zip(self._keys, keep) if kept]
+        self._queries = [query for query, kept in zip(self._queries, keep) if kept]
+
+    def _embed(self, query: str) -> np.ndarray:
+        return self.embedder.embed([normalize_query(query)])[0]
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the answer of the most similar previously answered query.
+
+        Args:
+            query: Incoming query
+
+        Returns:
+            Dictionary with research_results, final_answer, matched_query and
+            similarity, or None if no answered query is similar enough
+        """
+        vector = self._embed(query)
+        entities = query_entities(query)
+        with self._lock:
+            if not self._keys:
+                return None
+
+            similarities = self._vectors @ vector
+            row = None
+            for candidate in np.argsort(-similarities, kind="stable"):
+                if similarities[candidate] < self.threshold:
+                    break
+                if query_entities(self._queries[candidate]) == entities:
+                    row = int(candidate)
+                    break
+                logger.info(f"Semantic cache candidate '{self._queries[candidate]}' names other entities than '{query}'")
+            if row is None:
+                return None
+
+            similarity = float(similarities[row])
+            key = self._keys[row]
+            matched_query = self._queries[row]
+            self._last_used[row] = time.time()
+
+        payload = self.store.get(key)
+        if payload is None:
+            # The answer expired or was evicted from the store
+            with self._lock:
+                if row < len(self._keys) and self._keys[row] == key:
+                    self._remove([row])
+                    self._save()
+            return None
+
+        logger.info(f"Semantic cache hit ({similarity:.3f}) for '{query}' matching '{matched_query}'")
+        return {**payload, "matched_query": matched_query, "similarity": round(similarity, 4)}
+
+    def store_answer(self, query: str, research_results: List[Mapping[str, Any]], final_answer: str) -> None:
+        """
+        Store the answer of a query.
+
+        Args:
+            query: Answered query
+            research_results: Research results the answer is based on
+            final_answer: Final answer
+        """
+        key = make_cache_key("answer", normalize_query(query))
+        self.store.set(key, {"research_results": results_to_dicts(research_results), "final_answer": final_answer})
+
+        vector = self._embed(query)
+        with self._lock:
+            if key in self._keys:
+                self._remove([self._keys.index(key)])
+
+            self._vectors = np.vstack([self._vectors, vector[np.newaxis, :]])
+            self._keys.append(key)
+            self._queries.append(query)
+            self._last_used = np.append(self._last_used, time.time())
+
+            overflow = len(self._keys) - self.max_entries
+            if overflow > 0:
+                self._remove(list(np.argsort(self._last_used)[:overflow]))
+
+            self._save()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._remove(list(range(len(self._keys))))
+            self._save()
+        self.store.clear()
+
+    def __len__(self) -> int:
+        return len(self._keys)
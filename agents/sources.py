@@ -0,0 +1,90 @@
+"""
+Source consolidation for the AI Agentic Research System.
+Deduplicates and ranks search hits before they are passed to the drafting agent.
+"""
+import logging
+from typing import Any, Dict, List
+
+from agents.utils import canonicalize_url
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+def _merge_content(contents: List[str], content: str) -> None:
+    """
+    Add a content snippet unless it is already covered by a known snippet.
+    
+    Args:
+        contents: Distinct snippets collected so far, updated in place
+        content: New snippet
+    """
+    content = content.strip()
+    if not content:
+        return
+    
+    for i, existing in enumerate(contents):
+        if content in existing:
+            return
+        if existing in content:
+            contents[i] = content
+            return
+    
+    contents.append(content)
+
+def consolidate_sources(
+    research_results: List[Dict[str, Any]],
+    frequency_weight: float = 0.1
+) -> List[Dict[str, Any]]:
+    """
+    Deduplicate search hits by canonical URL and rank the resulting sources.
+    
+    Hits for the same page returned by several sub-queries are merged into a
+    single source: distinct content snippets are combined, the best Tavily
+    score is kept and the sub-queries that found the page are recorded.
+    Sources are ranked by best score plus a bonus of `frequency_weight` for
+    every additional sub-query that returned them; ties keep first-seen order.
+    
+    Args:
+        research_results: Search groups from the research agent
+        frequency_weight: Rank bonus per additional sub-query returning a source
+        
+    Returns:
+        Ranked list of sources with title, content, url, score, queries and rank_score
+    """
+    sources: Dict[str, Dict[str, Any]] = {}
+    contents: Dict[str, List[str]] = {}
+    total_hits = 0
+    
+    for search_group in research_results:
+        query = search_group.get("query", "")
+        for result in search_group.get("results", []):
+            total_hits += 1
+            url = result.get("url") or ""
+            key = canonicalize_url(url) if url else f"untitled:{result.get('title', '')}:{total_hits}"
+            
+            source = sources.get(key)
+            if source is None:
+                source = {
+                    "title": result.get("title") or "No title",
+                    "url": url or "No URL",
+                    "score": 0.0,
+                    "queries": []
+                }
+                sources[key] = source
+                contents[key] = []
+            
+            _merge_content(contents[key], result.get("content") or "")
+            source["score"] = max(source["score"], float(result.get("score") or 0.0))
+            if query not in source["queries"]:
+                source["queries"].append(query)
+    
+    for key, source in sources.items():
+        source["content"] = "\n".join(contents[key]) or "No content"
+        source["rank_score"] = source["score"] + frequency_weight * (len(source["queries"]) - 1)
+    
+    ranked = sorted(sources.values(), key=lambda source: source["rank_score"], reverse=True)
+    
+    if total_hits > len(ranked):
+        logger.info(f"Consolidated {total_hits} search hits into {len(ranked)} unique sources")
+    
+    return ranked
@@ -0,0 +1,167 @@
+"""
+Token counting and budget-aware context packing for the AI Agentic Research System.
+"""
+import time
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.utils import truncate_text
+from agents.context_builder import format_source, source_header
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken ships with langchain-openai
+    tiktoken = None
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Seconds before retrying to load a tokenizer that failed to load
+ENCODING_RETRY_SECONDS = 300
+
+# Loaded tokenizers, and when to retry the ones that failed to load
+_encodings: Dict[str, Any] = {}
+_encoding_retry_at: Dict[str, float] = {}
+_encodings_lock = threading.Lock()
+
+def get_encoding(model: str) -> Optional[Any]:
+    """
+    Get the local tokenizer for a model.
+    
+    Loaded tokenizers are cached. A tokenizer that failed to load is retried
+    after `ENCODING_RETRY_SECONDS`, so a transient failure does not switch
+    token counts to estimates for the life of the process.
+    
+    Args:
+        model: Model name
+    
+    Returns:
+        tiktoken encoding, or None if no tokenizer is available
+    """
+    encoding = _encodings.get(model)
+    if encoding is not None or tiktoken is None:
+        return encoding
+    
+    with _encodings_lock:
+        encoding = _encodings.get(model)
+        if encoding is not None or time.monotonic() < _encoding_retry_at.get(model, 0):
+            return encoding
+        
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # tiktoken downloads its vocabulary on first use, which fails offline
+            logger.warning(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+            _encoding_retry_at[model] = time.monotonic() + ENCODING_RETRY_SECONDS
+            return None
+        
+        _encodings[model] = encoding
+        return encoding
+
+@lru_cache(maxsize=8192)
+def _count_encoded_tokens(text: str, model: str) -> int:
+    return len(_encodings[model].encode(text, disallowed_special=()))
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """
+    Count the tokens of a text. Counts made with a tokenizer are cached.
+    
+    Args:
+        text: Text to count
+        model: Model whose tokenizer is used
+    
+    Returns:
+        Number of tokens
+    """
+    if get_encoding(model) is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return _count_encoded_tokens(text, model)
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4") -> str:
+    """
+    Truncate a text to at most `max_tokens` tokens, preferring sentence boundaries.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens to keep
+        model: Model whose tokenizer is used
+    
+    Returns:
+        Truncated text
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    
+    encoding = get_encoding(model)
+    if encoding is None:
+        max_length = max_tokens * CHARS_PER_TOKEN
+    else:
+        # Leave room for the ellipsis added by truncate_text
+        max_length = len(encoding.decode(encoding.encode(text, disallowed_special=())[:max(1, max_tokens - 1)]))
+    
+    return truncate_text(text, max_length=max_length)
+
+def pack_sources(
+    sources: List[Dict[str, Any]],
+    budget_tokens: int,
+    model: str = "gpt-4",
+    min_tokens: int = 60,
+    max_tokens: int = 800,
+    decay: float = 0.85,
+    fit: Optional[Callable[[Dict[str, Any], int], str]] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Fit ranked sources into a token budget.
+    
+    Sources are packed greedily in rank order. Each source is offered a share
+    of the remaining budget proportional to a geometrically decaying weight,
+    clamped to [min_tokens, max_tokens], so top-ranked sources get more room
+    than marginal ones. Budget left unused by short sources flows to later
+    ones. Packing stops once a source cannot get at least `min_tokens`.
+    
+    Args:
+        sources: Sources ordered by rank, each with title, content and url
+        budget_tokens: Total token budget for the sources
+        model: Model whose tokenizer is used
+        min_tokens: Minimum content tokens for a source to be included
+        max_tokens: Maximum content tokens for a single source
+        decay: Weight ratio between consecutive ranks
+        fit: Fits the content of a source to a number of tokens; defaults
+            to truncation
+    
+    Returns:
+        Tuple of the packed sources (content fitted to its allocation) and
+        the number of tokens used
+    """
+    weights = [decay ** i for i in range(len(sources))]
+    remaining_weight = sum(weights)
+    remaining = budget_tokens
+    packed = []
+    
+    for source, weight in zip(sources, weights):
+        overhead = count_tokens(source_header(len(packed) + 1) + format_source({**source, "content": ""}), model)
+        share = remaining * weight / remaining_weight if remaining_weight else remaining
+        remaining_weight -= weight
+        allocation = min(max_tokens, max(min_tokens, int(share)), remaining - overhead)
+        
+        if allocation < min_tokens:
+            break
+        
+        content = fit(source, allocation) if fit else truncate_to_tokens(source["content"], allocation, model)
+        remaining -= overhead + count_tokens(content, model)
+        packed.append({**source, "content": content})
+    
+    if len(packed) < len(sources):
+        logger.info(f"Token budget of {budget_tokens} fits {len(packed)} of {len(sources)} sources")
+    
+    return packed, budget_tokens - remaining
@@ -1,8 +1,17 @@
 """
 Utility functions for agents in the AI Agentic Research System.
 """
+import re
+import logging
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+# Greedy prefix ending at the last sentence terminator followed by a space
+_LAST_SENTENCE_END = re.compile(r".*[.!?] ", re.DOTALL)
 
 def format_error(exception: Exception) -> str:
     """
@@ -27,6 +36,9 @@ def truncate_text(text: str, max_length: int = 500) -> str:
     """
     Truncate text to a maximum length while maintaining sentence integrity.
     
+    Cuts after the last sentence that fits, or else at the last word
+    boundary. Each boundary search is a single backward scan of the window.
+    
     Args:
         text: Text to truncate
         max_length: Maximum length of the truncated text
@@ -37,22 +49,132 @@ def truncate_text(text: str, max_length: int = 500) -> str:
     if len(text) <= max_length:
         return text
     
-    # Try to truncate at sentence boundary
-    truncated = text[:max_length]
+    # The character after the window tells whether the window ends at a boundary
+    window = text[:max_length + 1]
     
-    # Find the last sentence boundary
-    for ending in [". ", "! ", "? "]:
-        last_period = truncated.rfind(ending)
-        if last_period != -1:
-            return truncated[:last_period + 1] + "..."
+    # Try to truncate at the last sentence boundary
+    sentence = _LAST_SENTENCE_END.match(window)
+    if sentence is not None:
+        return window[:sentence.end() - 1] + "..."
     
     # If no sentence boundary found, truncate at word boundary
-    last_space = truncated.rfind(" ")
+    last_space = window.rfind(" ")
     if last_space != -1:
-        return truncated[:last_space] + "..."
+        return window[:last_space] + "..."
     
     # If no word boundary found, just truncate
-    return truncated + "..."
+    return window[:max_length] + "..."
+
+def build_run_config(state, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the runnable config passed to chains for the current request.
+    
+    Args:
+        state: Current state of the agent system
+        config: Runnable config of the calling workflow node, if any
+        
+    Returns:
+        Runnable config carrying per-request options
+    """
+    configurable = {"bypass_cache": state.bypass_cache, "priority": state.priority}
+    
+    event_callback = get_event_callback(config)
+    if event_callback is not None:
+        configurable["event_callback"] = event_callback
+    
+    return {"configurable": configurable}
+
+def get_event_callback(config: Optional[Dict[str, Any]]):
+    """
+    Get the progress event callback registered for the current request.
+    
+    Args:
+        config: Runnable config of the current call
+        
+    Returns:
+        Callable receiving event dictionaries, or None if nobody is listening
+    """
+    if not config:
+        return None
+    return config.get("configurable", {}).get("event_callback")
+
+def get_priority(config: Optional[Dict[str, Any]]) -> str:
+    """
+    Get the scheduling priority of the current request.
+    
+    Args:
+        config: Runnable config of the current call
+        
+    Returns:
+        "interactive" or "batch"
+    """
+    if not config:
+        return "interactive"
+    return config.get("configurable", {}).get("priority", "interactive")
+
+def emit_event(config: Optional[Dict[str, Any]], event_type: str, **data: Any) -> None:
+    """
+    Send a progress event to the listener of the current request, if any.
+    
+    Args:
+        config: Runnable config of the current call
+        event_type: Type of the event
+        data: Event payload
+    """
+    event_callback = get_event_callback(config)
+    if event_callback is None:
+        return
+    
+    try:
+        event_callback({"type": event_type, **data})
+    except Exception as e:
+        # A failing listener must never break the research pipeline
+        logger.warning(f"Event callback failed for '{event_type}': {str(e)}")
+
+# Query parameters that only track the referrer and never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize a URL so different spellings of the same page compare equal.
+    
+    Lower-cases the scheme and host, drops "www.", default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query string.
+    
+    Args:
+        url: URL to canonicalize
+        
+    Returns:
+        Canonical form of the URL
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        # Parsing the port is lazy and raises for ports out of range or not numeric
+        port = parts.port
+    except ValueError:
+        return url
+    
+    if not parts.netloc:
+        return url
+    
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    
+    return urlunsplit((scheme, host, path, query, ""))
 
 def extract_urls_from_results(results: Dict[str, Any]) -> list:
     """
@@ -62,16 +184,16 @@ def extract_urls_from_results(results: Dict[str, Any]) -> list:
         results: Search results from the research agent
         
     Returns:
-        List of unique URLs
+        List of unique URLs, deduplicated by canonical form in first-seen order
     """
-    urls = set()
+    urls = {}
     
     for search_group in results:
         for result in search_group.get("results", []):
             if "url" in result:
-                urls.add(result["url"])
+                urls.setdefault(canonicalize_url(result["url"]), result["url"])
     
-    return list(urls)
+    return list(urls.values())
 # Add this to agents/utils.py
 class SimpleToolExecutor:
     """A simplified tool executor if the langchain import doesn't work."""
@@ -79,10 +201,17 @@ class SimpleToolExecutor:
     def __init__(self, tools):
         self.tools = {tool.name: tool for tool in tools}
     
-    def invoke(self, tool_invocation):
-        tool_name = tool_invocation["name"]
-        tool_input = tool_invocation["input"]
+    def _resolve(self, tool_invocation):
+        tool_name = tool_invocation.get("tool_name", tool_invocation.get("name"))
+        tool_input = tool_invocation.get("tool_input", tool_invocation.get("input"))
         if tool_name not in self.tools:
             raise ValueError(f"Tool {tool_name} not found")
-        tool = self.tools[tool_name]
-        return tool.invoke(tool_input)
\ No newline at end of file
+        return self.tools[tool_name], tool_input
+    
+    def invoke(self, tool_invocation):
+        tool, tool_input = self._resolve(tool_invocation)
+        return tool.invoke(tool_input)
+    
+    async def ainvoke(self, tool_invocation):
+        tool, tool_input = self._resolve(tool_invocation)
+        return await tool.ainvoke(tool_input)
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Deterministic fakes of the LLM and Tavily search used by the benchmarks.
+Both simulate network latency, jitter and failures without any API calls.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForLLMRun,
+    CallbackManagerForToolRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.tools import BaseTool
+
+_QUERY = re.compile(r"QUERY:\s*(.+)")
+_NUM_QUERIES = re.compile(r"top (\d+) specific search queries")
+
+# Vocabulary of the generated search contents and answers
+_WORDS = (
+    "research system agent query source result model latency cache search answer "
+    "benchmark throughput context token budget stage draft citation evidence study "
+    "analysis report data method review finding quantum climate energy market policy"
+).split()
+
+class FakeUpstream:
+    """
+    Simulated upstream behaviour shared by the fake LLM and search tool.
+
+    Randomness is derived from the seed, the request and how many times the
+    same request was made, so runs are reproducible regardless of how
+    concurrent calls interleave.
+    """
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.calls = 0
+        self.errors = 0
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def rng(self, key: str) -> random.Random:
+        """
+        Get the random generator for one request.
+
+        Args:
+            key: Text identifying the request
+
+        Returns:
+            Generator seeded from the seed, the request and its attempt number
+        """
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+            self.calls += 1
+        digest = hashlib.sha256(f"{self.seed}:{attempt}:{key}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def delay(self, rng: random.Random) -> float:
+        """Latency of one call, uniformly jittered by +/- `jitter` seconds."""
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+    def check_failure(self, rng: random.Random, name: str) -> None:
+        """Raise a simulated upstream error with probability `error_rate`."""
+        if rng.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise RuntimeError(f"Simulated {name} failure")
+
+def fake_text(rng: random.Random, length: int) -> str:
+    """
+    Generate filler text of roughly `length` characters made of sentences.
+
+    Args:
+        rng: Random generator
+        length: Target length in characters
+
+    Returns:
+        Generated text
+    """
+    sentences = []
+    size = 0
+    while size < length:
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 16))]
+        sentence = " ".join(words).capitalize() + "."
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)[:max(0, length)]
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model answering query-generation prompts with JSON search queries
+    and drafting prompts with a generated answer, after a simulated delay.
+    `latency` is spent before the first token; `token_latency` is added per
+    generated token, so a streamed response arrives gradually.
+    """
+    model_name: str = "fake-benchmark-model"
+    temperature: float = 0.0
+    latency: float = 0.0
+    token_latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    answer_words: int = 200
+    seed: int = 0
+
+    _upstream: FakeUpstream = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._upstream = FakeUpstream(self.latency, self.jitter, self.error_rate, self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark-chat"
+
+    @property
+    def upstream(self) -> FakeUpstream:
+        """Call and error counters of the model."""
+        return self._upstream
+
+    def _tokens(self, content: str) -> List[str]:
+        return re.findall(r"\S+\s*", content)
+
+    def _respond(self, messages: List[BaseMessage]) -> Tuple[str, float]:
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = self._upstream.rng(prompt)
+        delay = self._upstream.delay(rng)
+        self._upstream.check_failure(rng, "LLM")
+
+        if "search_queries" in prompt:
+            query_match = _QUERY.search(prompt)
+            topic = query_match.group(1).strip() if query_match else "research topic"
+            num_match = _NUM_QUERIES.search(prompt)
+            count = int(num_match.group(1)) if num_match else 3
+            content = json.dumps({
+                "search_queries": [f"{topic} {rng.choice(_WORDS)} {i + 1}" for i in range(count)],
+                "reasoning": "Cover the main aspects of the query."
+            })
+        else:
+            words = [rng.choice(_WORDS) for _ in range(self.answer_words)]
+            content = " ".join(words) + " [Source 1]."
+        return content, delay
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content, delay = self._respond(messages)
+        time.sleep(delay + self.token_latency * len(self._tokens(content)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content, delay = self._respond(messages)
+        await asyncio.sleep(delay + self.token_latency * len(self._tokens(content)))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        content, delay = self._respond(messages)
+        # The delay is spent before the first token, like time to first byte
+        time.sleep(delay)
+        for token in self._tokens(content):
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        content, delay = self._respond(messages)
+        await asyncio.sleep(delay)
+        for token in self._tokens(content):
+            await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+class FakeSearchTool(BaseTool):
+    """
+    Stand-in for the Tavily search tool returning generated hits.
+
+    URLs are drawn from a fixed pool so different queries overlap on some
+    sources, as real searches on one topic do.
+    """
+    name: str = "tavily_search_results_json"
+    description: str = "Fake Tavily search returning generated results."
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    content_chars: int = 1500
+    url_pool: int = 50
+    seed: int = 0
+
+    _upstream: FakeUpstream = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._upstream = FakeUpstream(self.latency, self.jitter, self.error_rate, self.seed)
+
+    @property
+    def upstream(self) -> FakeUpstream:
+        """Call and error counters of the tool."""
+        return self._upstream
+
+    def _results(self, query: str, max_results: int) -> Tuple[List[Dict[str, Any]], float]:
+        rng = self._upstream.rng(query)
+        delay = self._upstream.delay(rng)
+        self._upstream.check_failure(rng, "search")
+
+        results = []
+        for index in rng.sample(range(self.url_pool), min(max_results, self.url_pool)):
+            results.append({
+                "title": f"Result {index} for {query}",
+                "url": f"https://example.com/articles/{index}",
+                "content": fake_text(rng, self.content_chars),
+                "score": round(rng.uniform(0.3, 1.0), 4)
+            })
+        results.sort(key=lambda hit: hit["score"], reverse=True)
+        return results, delay
+
+    def _run(
+        self,
+        query: str,
+        max_results: int = 5,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> List[Dict[str, Any]]:
+        results, delay = self._results(query, max_results)
+        time.sleep(delay)
+        return results
+
+    async def _arun(
+        self,
+        query: str,
+        max_results: int = 5,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> List[Dict[str, Any]]:
+        results, delay = self._results(query, max_results)
+        await asyncio.sleep(delay)
+        return results
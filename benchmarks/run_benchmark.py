@@ -0,0 +1,295 @@
+"""
+Offline benchmark of the research pipeline.
+
+Drives ResearchSystem end to end with a fake LLM and fake Tavily search that
+simulate latency, jitter, failures and payload sizes, and reports throughput,
+per-stage latency percentiles and peak memory for a single-query run and for
+concurrent runs.
+
+Usage:
+    python -m benchmarks.run_benchmark --queries 50 --concurrency 1,8,32
+"""
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from main import ResearchSystem
+from benchmarks.fakes import FakeChatModel, FakeSearchTool
+from agents.cache import MemoryCache
+from agents.checkpoint import CheckpointStore
+from agents.document_store import DocumentStore
+from agents.embeddings import HashingEmbedder
+from agents.metrics import InMemoryMetrics, get_metrics, set_metrics
+from agents.registry import AgentRegistry
+from agents.semantic_cache import SemanticCache
+from config.settings import get_settings, semantic_cache_active
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BenchmarkProfile:
+    """Simulated upstream behaviour of a benchmark run."""
+    llm_latency: float = 0.5
+    light_llm_latency: float = 0.2
+    llm_token_latency: float = 0.0
+    search_latency: float = 0.3
+    jitter: float = 0.1
+    llm_error_rate: float = 0.0
+    search_error_rate: float = 0.0
+    content_chars: int = 1500
+    answer_words: int = 200
+    seed: int = 0
+
+#: Optional components a benchmark run can enable on top of the settings
+EXTRA_COMPONENTS = ("semantic_cache", "document_store", "checkpointer")
+
+def enabled_components(extras: Sequence[str] = ()) -> List[str]:
+    """
+    List the optional components of a benchmark run.
+
+    Args:
+        extras: Components to enable even if the settings disable them
+
+    Returns:
+        Names of the enabled components, in EXTRA_COMPONENTS order
+    """
+    settings = get_settings()
+    configured = {
+        "semantic_cache": semantic_cache_active(settings),
+        "document_store": settings.document_store_enabled,
+        "checkpointer": settings.checkpointing_enabled
+    }
+    return [name for name in EXTRA_COMPONENTS if configured[name] or name in extras]
+
+def build_system(profile: BenchmarkProfile, extras: Sequence[str] = ()) -> ResearchSystem:
+    """
+    Build a ResearchSystem backed by fakes and fresh in-memory caches.
+
+    Components are enabled as in the settings, so a run measures the
+    configured pipeline. Components in `extras` are enabled on top; the
+    semantic cache and document store use the local hashing embedder so
+    runs stay offline.
+
+    Args:
+        profile: Simulated upstream behaviour
+        extras: Components to enable even if the settings disable them
+
+    Returns:
+        ResearchSystem instance
+    """
+    settings = get_settings()
+    components = enabled_components(extras)
+
+    def fake_llm(seed_offset: int, latency: float, model_name: str = "fake-benchmark-model") -> FakeChatModel:
+        return FakeChatModel(
+            model_name=model_name,
+            latency=latency,
+            token_latency=profile.llm_token_latency,
+            jitter=profile.jitter,
+            error_rate=profile.llm_error_rate,
+            answer_words=profile.answer_words,
+            seed=profile.seed + seed_offset
+        )
+
+    registry = AgentRegistry(
+        research_llm=fake_llm(0, profile.llm_latency),
+        drafting_llm=fake_llm(1, profile.llm_latency),
+        research_light_llm=fake_llm(2, profile.light_llm_latency, "fake-benchmark-light-model"),
+        search_cache=MemoryCache() if settings.search_cache_enabled else None,
+        llm_cache=MemoryCache() if settings.llm_cache_enabled else None,
+        semantic_cache=SemanticCache(HashingEmbedder(), MemoryCache()) if "semantic_cache" in components else None,
+        document_store=DocumentStore(HashingEmbedder()) if "document_store" in components else None,
+        checkpointer=CheckpointStore() if "checkpointer" in components else None,
+        search_tool=FakeSearchTool(
+            latency=profile.search_latency,
+            jitter=profile.jitter,
+            error_rate=profile.search_error_rate,
+            content_chars=profile.content_chars,
+            seed=profile.seed
+        )
+    )
+    return ResearchSystem(registry=registry)
+
+def make_queries(count: int) -> List[str]:
+    """
+    Generate distinct benchmark queries.
+
+    Args:
+        count: Number of queries
+
+    Returns:
+        List of queries
+    """
+    topics = ["quantum computing", "climate policy", "battery chemistry", "protein folding", "chip design"]
+    return [f"What changed in {topics[i % len(topics)]} during period {i}?" for i in range(count)]
+
+def run_once(
+    queries: List[str],
+    concurrency: int,
+    profile: BenchmarkProfile,
+    mode: str = "sync",
+    bypass_cache: bool = False,
+    trace_memory: bool = True,
+    extras: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """
+    Process all queries with the given concurrency and collect measurements.
+
+    Every run uses a fresh system and metrics sink so runs are independent.
+
+    Args:
+        queries: Queries to process
+        concurrency: Number of queries processed at once
+        profile: Simulated upstream behaviour
+        mode: "sync" for threads over process_query, "async" for aprocess_query
+        bypass_cache: Skip cache lookups
+        trace_memory: Measure peak memory with tracemalloc (slows the run)
+        extras: Components to enable even if the settings disable them
+
+    Returns:
+        Dictionary of measurements
+    """
+    system = build_system(profile, extras)
+    metrics = InMemoryMetrics()
+    previous = get_metrics()
+    set_metrics(metrics)
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        if mode == "async":
+            async def run_all() -> List[Dict[str, Any]]:
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def run(query: str) -> Dict[str, Any]:
+                    async with semaphore:
+                        return await system.aprocess_query(query, bypass_cache=bypass_cache)
+
+                return await asyncio.gather(*(run(query) for query in queries))
+
+            results = asyncio.run(run_all())
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(lambda q: system.process_query(q, bypass_cache=bypass_cache), queries))
+        elapsed = time.perf_counter() - start
+        peak_bytes = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        set_metrics(previous)
+
+    summary = metrics.summary()
+    stages = {
+        series[len("stage_duration_seconds{stage="):-1]: values
+        for series, values in summary["distributions"].items()
+        if series.startswith("stage_duration_seconds{")
+    }
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "components": enabled_components(extras),
+        "errors": sum(1 for result in results if result.get("error")),
+        "elapsed_seconds": round(elapsed, 4),
+        "queries_per_second": round(len(queries) / elapsed, 4) if elapsed else 0.0,
+        "peak_memory_mb": round(peak_bytes / 1024 / 1024, 3) if peak_bytes is not None else None,
+        "stages": stages,
+        "counters": summary["counters"]
+    }
+
+def format_report(run: Dict[str, Any]) -> str:
+    """
+    Format the measurements of a run as a text table.
+
+    Args:
+        run: Measurements returned by run_once
+
+    Returns:
+        Report text
+    """
+    memory = f"{run['peak_memory_mb']:.1f} MB" if run["peak_memory_mb"] is not None else "n/a"
+    components = ", ".join(run["components"]) or "none"
+    lines = [
+        f"{run['mode']} x{run['concurrency']}: {run['queries']} queries in {run['elapsed_seconds']:.2f}s "
+        f"({run['queries_per_second']:.2f} q/s), {run['errors']} errors, peak memory {memory}",
+        f"  optional components: {components}",
+        f"  {'stage':<20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    ]
+    for stage, values in run["stages"].items():
+        lines.append(
+            f"  {stage:<20} {values['count']:>6} {values['p50'] * 1000:>9.1f} "
+            f"{values['p95'] * 1000:>9.1f} {values['p99'] * 1000:>9.1f}"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Offline benchmark of the research pipeline")
+    parser.add_argument("--queries", type=int, default=20, help="Number of queries per concurrent run")
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync", help="Execution path to drive")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean LLM latency in seconds")
+    parser.add_argument("--light-llm-latency", type=float, default=0.2, help="Mean latency of the light LLM in seconds")
+    parser.add_argument("--llm-token-latency", type=float, default=0.0, help="LLM latency per generated token in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Mean search latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latency jitter in seconds")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of failing LLM calls")
+    parser.add_argument("--search-error-rate", type=float, default=0.0, help="Fraction of failing searches")
+    parser.add_argument("--content-chars", type=int, default=1500, help="Characters of content per search hit")
+    parser.add_argument("--answer-words", type=int, default=200, help="Words per drafted answer")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the simulated upstreams")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the search and LLM caches")
+    parser.add_argument("--semantic-cache", action="store_true", help="Enable the semantic answer cache")
+    parser.add_argument("--document-store", action="store_true", help="Enable the local document store")
+    parser.add_argument("--checkpointing", action="store_true", help="Enable workflow checkpointing")
+    parser.add_argument("--no-trace-memory", action="store_true", help="Skip peak memory measurement")
+    parser.add_argument("--output", help="Write the measurements to this JSON file")
+    args = parser.parse_args(argv)
+
+    profile = BenchmarkProfile(
+        llm_latency=args.llm_latency,
+        light_llm_latency=args.light_llm_latency,
+        llm_token_latency=args.llm_token_latency,
+        search_latency=args.search_latency,
+        jitter=args.jitter,
+        llm_error_rate=args.llm_error_rate,
+        search_error_rate=args.search_error_rate,
+        content_chars=args.content_chars,
+        answer_words=args.answer_words,
+        seed=args.seed
+    )
+    queries = make_queries(args.queries)
+    extras = [
+        name for name, enabled in zip(EXTRA_COMPONENTS, (args.semantic_cache, args.document_store, args.checkpointing))
+        if enabled
+    ]
+
+    runs = []
+    # A single query shows the unloaded end-to-end latency
+    runs.append(run_once(queries[:1], 1, profile, args.mode, args.no_cache, not args.no_trace_memory, extras))
+    for level in (int(value) for value in args.concurrency.split(",") if value.strip()):
+        runs.append(run_once(queries, level, profile, args.mode, args.no_cache, not args.no_trace_memory, extras))
+
+    for run in runs:
+        print(format_report(run))
+        print()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"profile": asdict(profile), "runs": runs}, f, indent=2)
+        print(f"Measurements written to {args.output}")
+
+    return runs
+
+if __name__ == "__main__":
+    # Per-query progress logs would dominate the report
+    logging.getLogger().setLevel(logging.WARNING)
+    main()
@@ -1,8 +1,13 @@
 """
 Configuration package for the AI Agentic Research System.
 """
-from config.settings import get_settings, setup_logging
-from config.workflow import create_workflow
-from pydantic import BaseModel
+from config.settings import get_settings, setup_logging, validate_settings
 
-__all__ = ["get_settings", "setup_logging", "create_workflow"]
+__all__ = ["get_settings", "setup_logging", "validate_settings", "create_workflow"]
+
+def __getattr__(name: str):
+    # The workflow pulls in LangGraph and every agent, so it is imported on first use
+    if name == "create_workflow":
+        from config.workflow import create_workflow
+        return create_workflow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
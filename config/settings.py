@@ -3,7 +3,7 @@ Settings for the AI Agentic Research System.
 """
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from functools import lru_cache
 from langchain_core.pydantic_v1 import BaseSettings
 
@@ -25,13 +25,136 @@ class Settings(BaseSettings):
     research_agent_temperature: float = 0.1
     drafting_agent_temperature: float = 0.2
     
+    # Model Routing Settings
+    # Each LLM stage uses its own model, or the default model when empty.
+    # With routing enabled, query generation for simple queries runs on the
+    # light model and is retried on the stage model when its JSON output
+    # cannot be parsed
+    query_generation_model: str = os.getenv("QUERY_GENERATION_MODEL", "")
+    drafting_model: str = os.getenv("DRAFTING_MODEL", "")
+    model_routing_enabled: bool = True
+    light_model: str = os.getenv("LIGHT_MODEL", "gpt-4o-mini")
+    routing_max_query_words: int = 20
+    
     # Research Agent Settings
     num_search_queries: int = 3
     max_search_results_per_query: int = 5
+    max_concurrent_searches: int = 4
+    # Search the raw query alongside query generation and dispatch each
+    # generated query as soon as it is parsed from the streamed output
+    speculative_search_enabled: bool = False
+    
+    # Iterative Research Settings
+    # After each round of searches, another round targeted at the query terms
+    # no result mentions runs unless one of these limits is reached. Extra
+    # rounds cost an LLM call and a round of searches, so they are opt-in
+    max_research_rounds: int = 1
+    research_coverage_threshold: float = 0.8
+    research_min_novel_url_ratio: float = 0.3
+    research_time_budget_seconds: float = 60.0
+    research_token_budget: int = 16000
+    
+    # Resilience Settings
+    search_timeout_seconds: float = 20.0
+    llm_timeout_seconds: float = 120.0
+    retry_max_attempts: int = 3
+    retry_base_delay_seconds: float = 0.5
+    retry_max_delay_seconds: float = 8.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30.0
+    search_hedging_enabled: bool = False
+    search_hedge_quantile: float = 95.0
+    search_hedge_min_samples: int = 20
+    
+    # Rate Limit Settings (0 disables a limit)
+    search_requests_per_minute: int = 0
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    rate_limit_burst_seconds: float = 10.0
+    llm_completion_token_estimate: int = 1000
+    
+    # Batch Settings
+    batch_concurrency: int = 8
+    
+    # Server Settings
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    
+    # Metrics Settings
+    metrics_sink: str = "memory"  # "memory", "prometheus" or "none"
+    metrics_file: str = ".cache/metrics.prom"
+    metrics_flush_interval_seconds: float = 5.0
+    metrics_window_size: int = 10000
+    
+    # Search Cache Settings
+    search_cache_enabled: bool = True
+    search_cache_ttl_seconds: int = 24 * 60 * 60
+    search_cache_memory_entries: int = 512
+    search_cache_max_entries: int = 10000
+    search_cache_path: str = ".cache/search_cache.sqlite"
+    
+    # LLM Cache Settings
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 7 * 24 * 60 * 60
+    llm_cache_memory_entries: int = 256
+    llm_cache_max_entries: int = 2000
+    llm_cache_path: str = ".cache/llm_cache.sqlite"
+    
+    # Embedding Settings
+    embedder: str = "hashing"  # "hashing" (local) or "openai"
+    embedding_model: str = "text-embedding-3-small"
+    hashing_embedder_dim: int = 512
+    
+    # Semantic Cache Settings
+    # Unset, the cache is only enabled with a semantic embedder: the hashing
+    # embedder scores queries that differ in a single word as near-identical
+    semantic_cache_enabled: Optional[bool] = None
+    semantic_cache_threshold: float = 0.9
+    semantic_cache_ttl_seconds: int = 24 * 60 * 60
+    semantic_cache_max_entries: int = 1000
+    semantic_cache_index_path: str = ".cache/semantic_cache.npz"
+    semantic_cache_path: str = ".cache/semantic_cache.sqlite"
+    
+    # Document Store Settings
+    document_store_enabled: bool = False
+    document_store_path: str = ".cache/documents"
+    document_chunk_chars: int = 800
+    document_chunk_overlap_chars: int = 100
+    # A sub-query is answered from the document store when it finds at least
+    # `retrieval_min_results` pages this similar and younger than the max age
+    # that mention all of its key terms. Pages that only share the topic of
+    # the sub-query score up to about 0.45 with the hashing embedder
+    retrieval_min_results: int = 3
+    retrieval_min_similarity: float = 0.5
+    retrieval_max_age_seconds: int = 7 * 24 * 60 * 60
+    
+    # Checkpoint Settings
+    # Off by default: checkpoints only help runs that are resumed by run ID,
+    # and writing the state after every stage costs every query. The CLI
+    # turns it on for --run-id and --batch
+    checkpointing_enabled: bool = False
+    checkpoint_path: str = ".cache/checkpoints.sqlite"
+    # Checkpoints of failed runs not resumed within this time are deleted
+    checkpoint_ttl_seconds: int = 7 * 24 * 60 * 60
     
     # Drafting Agent Settings
     max_drafting_sources: int = 15
     max_source_content_length: int = 500
+    source_frequency_weight: float = 0.1
+    drafting_context_token_budget: int = 4000
+    drafting_source_min_tokens: int = 60
+    drafting_source_max_tokens: int = 800
+    drafting_source_budget_decay: float = 0.85
+    context_cache_entries: int = 1024
+    # Shrink long sources to their sentences most relevant to the query
+    # instead of truncating them
+    compression_enabled: bool = True
+    # Map-reduce drafting: groups of sources are summarized by concurrent LLM
+    # calls and the answer is drafted from the summaries
+    map_reduce_drafting_enabled: bool = False
+    map_reduce_max_sources: int = 100
+    map_reduce_group_size: int = 10
+    map_reduce_concurrency: int = 4
     
     class Config:
         env_file = ".env"
@@ -47,6 +170,93 @@ def get_settings() -> Settings:
     """
     return Settings()
 
+def semantic_cache_active(settings: Settings) -> bool:
+    """
+    Check whether answers are looked up in the semantic cache.
+    
+    Args:
+        settings: Application settings
+        
+    Returns:
+        The `semantic_cache_enabled` setting, or whether a semantic embedder
+        is configured if it is unset
+    """
+    if settings.semantic_cache_enabled is not None:
+        return settings.semantic_cache_enabled
+    return settings.embedder.lower() == "openai"
+
+def stage_model(settings: Settings, stage: str) -> str:
+    """
+    Get the model of an LLM stage.
+    
+    Args:
+        settings: Application settings
+        stage: "query_generation" or "drafting"
+        
+    Returns:
+        Name of the stage's model, the default model if none is set
+    """
+    models = {
+        "query_generation": settings.query_generation_model,
+        "drafting": settings.drafting_model
+    }
+    if stage not in models:
+        raise ValueError(f"Unknown LLM stage '{stage}'")
+    return models[stage] or settings.default_model
+
+def routed_light_model(settings: Settings, stage: str) -> Optional[str]:
+    """
+    Get the light model a stage routes simple queries to.
+    
+    Args:
+        settings: Application settings
+        stage: LLM stage, see `stage_model`
+        
+    Returns:
+        Name of the light model, or None if the stage is not routed
+    """
+    if stage != "query_generation" or not settings.model_routing_enabled or not settings.light_model:
+        return None
+    if settings.light_model == stage_model(settings, stage):
+        return None
+    return settings.light_model
+
+def validate_settings(settings: Settings) -> List[str]:
+    """
+    Check settings for problems that would only surface when a query runs.
+    
+    Args:
+        settings: Settings to check
+        
+    Returns:
+        Descriptions of the problems found, empty if the settings are valid
+    """
+    problems = []
+    
+    if not settings.openai_api_key:
+        problems.append("OPENAI_API_KEY is not set")
+    if not settings.tavily_api_key:
+        problems.append("TAVILY_API_KEY is not set")
+    if not isinstance(getattr(logging, settings.log_level.upper(), None), int):
+        problems.append(f"Unknown log level '{settings.log_level}'")
+    if settings.metrics_sink.lower() not in ("memory", "prometheus", "none"):
+        problems.append(f"Unknown metrics sink '{settings.metrics_sink}'")
+    
+    for name in (
+        "num_search_queries",
+        "max_search_results_per_query",
+        "max_concurrent_searches",
+        "max_research_rounds",
+        "batch_concurrency",
+        "routing_max_query_words",
+        "max_drafting_sources",
+        "map_reduce_group_size"
+    ):
+        if getattr(settings, name) < 1:
+            problems.append(f"{name} must be at least 1")
+    
+    return problems
+
 def setup_logging() -> None:
     """
     Set up logging for the application.
@@ -1,10 +1,13 @@
 """
 LangGraph workflow definition for the AI Agentic Research System.
 """
+from typing import Optional
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, END
 from models.state import AgentState
-from agents.research_agent import research_agent_node
-from agents.drafting_agent import drafting_agent_node
+from agents.research_agent import research_agent_node, aresearch_agent_node
+from agents.drafting_agent import drafting_agent_node, adrafting_agent_node
+from agents.registry import AgentRegistry
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,9 +27,9 @@ def router(state: AgentState) -> str:
         logger.warning(f"Workflow encountered an error: {state.error}")
         return END
     
-    # Route based on workflow progress
-    if not state.research_results:
-        logger.info("Routing to research agent")
+    # Route based on workflow progress; research loops until the coverage check is satisfied
+    if not state.research_complete:
+        logger.info(f"Routing to research agent (round {state.research_round + 1})")
         return "research"
     elif not state.final_answer:
         logger.info("Routing to drafting agent")
@@ -35,29 +38,47 @@ def router(state: AgentState) -> str:
         logger.info("Workflow complete")
         return END
 
-def create_workflow():
+def create_workflow(registry: Optional[AgentRegistry] = None):
     """
     Create and return the agent workflow graph.
     
+    Args:
+        registry: Registry providing the shared agent instances. A new
+            registry is created if omitted.
+    
     Returns:
         Compiled LangGraph workflow
     """
     logger.info("Creating agent workflow")
+    registry = registry or AgentRegistry()
+    
+    def research(state: AgentState, config: RunnableConfig) -> AgentState:
+        return research_agent_node(state, agent=registry.research_agent, config=config)
+    
+    async def aresearch(state: AgentState, config: RunnableConfig) -> AgentState:
+        return await aresearch_agent_node(state, agent=registry.research_agent, config=config)
+    
+    def draft(state: AgentState, config: RunnableConfig) -> AgentState:
+        return drafting_agent_node(state, agent=registry.drafting_agent, config=config)
+    
+    async def adraft(state: AgentState, config: RunnableConfig) -> AgentState:
+        return await adrafting_agent_node(state, agent=registry.drafting_agent, config=config)
     
     # Create the graph
     workflow = StateGraph(AgentState)
     
-    # Add nodes
-    workflow.add_node("research", research_agent_node)
-    workflow.add_node("draft", drafting_agent_node)
+    # Add nodes; each has a sync and an async implementation so the
+    # compiled graph supports both invoke and ainvoke
+    workflow.add_node("research", RunnableLambda(research, afunc=aresearch, name="research"))
+    workflow.add_node("draft", RunnableLambda(draft, afunc=adraft, name="draft"))
     
-    # Set entry point
-    workflow.set_entry_point("research")
+    # Set entry point; a resumed run whose research is already done starts at drafting
+    workflow.set_conditional_entry_point(router)
     
     # Add edges with routing logic
     workflow.add_conditional_edges("research", router)
     workflow.add_conditional_edges("draft", router)
     
-    # Compile the graph
+    # Compile the graph, saving the state after every node if checkpointing is enabled
     logger.info("Agent workflow created and compiled")
-    return workflow.compile()
\ No newline at end of file
+    return workflow.compile(checkpointer=registry.checkpointer)
\ No newline at end of file
@@ -2,75 +2,589 @@
 Main entry point for the AI Agentic Research System.
 """
 
+import time
+
+# Start of the module's own imports, reported by --startup-time
+_IMPORT_START = time.perf_counter()
+
+import os
+import json
+import uuid
+import queue
+import asyncio
 import logging
 import argparse
-from typing import Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Setup logging
-from config.settings import setup_logging
+from config.settings import get_settings, semantic_cache_active, setup_logging, validate_settings
 setup_logging()
 
 logger = logging.getLogger(__name__)
 
-# Import the workflow
-from config.workflow import create_workflow
+# LangGraph, LangChain and the agents are imported when a ResearchSystem is
+# created, so light commands (--help, --validate-config, --cache-stats) start fast
+from agents.metrics import get_metrics, timed
 from models.state import AgentState
 
+if TYPE_CHECKING:
+    from agents.registry import AgentRegistry
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
 class ResearchSystem:
     """
     Interface class for the AI Agentic Research System.
     Handles query processing.
     """
 
-    def __init__(self):
-        self.app = create_workflow()
+    def __init__(self, registry: Optional["AgentRegistry"] = None, checkpointing: Optional[bool] = None):
+        """Build the workflow.
+
+        `checkpointing` turns checkpointing of runs on or off, overriding the
+        `checkpointing_enabled` setting; it is ignored when a `registry` is given.
+        """
+        from config.workflow import create_workflow
+        from agents.registry import AgentRegistry
+
+        # Agents and their LLM/search clients are built once and shared across queries
+        self.registry = registry or AgentRegistry(checkpointing=checkpointing)
+        self.app = create_workflow(self.registry)
+
+    def _build_response(self, query: str, result: Any, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Build the response dictionary from the final workflow state."""
+        # The compiled graph returns the final state as a dict of channel values
+        if not isinstance(result, dict):
+            result = result.dict()
+
+        research_results = result.get("research_results") or []
+        return {
+            "query": query,
+            "answer": result.get("final_answer") or "Unable to generate an answer.",
+            "error": result.get("error"),
+            "research_queries": [item.get("query", "") for item in research_results],
+            "sources_count": sum(len(r.get("results", [])) for r in research_results),
+            "stage_timings": result.get("stage_timings") or [],
+            "run_id": run_id,
+        }
+
+    def _run_input(self, initial_state: AgentState, snapshot: Any) -> Any:
+        """Choose the workflow input of a run from its last checkpoint.
+
+        Returns `initial_state` for a new run, None to continue an interrupted
+        run at its pending node, or the checkpointed state with the error
+        cleared to retry a failed run. The entry router then skips the stages
+        that already completed, e.g. a run whose drafting failed is retried
+        without searching again.
+        """
+        values = snapshot.values if snapshot is not None else None
+        if not values or values.get("query") != initial_state.query:
+            return initial_state
+
+        if snapshot.next:
+            logger.info(f"Resuming interrupted run at: {', '.join(snapshot.next)}")
+            return None
+
+        if values.get("error"):
+            logger.info("Retrying failed run from its last completed stage")
+            return {
+                **values,
+                "error": None,
+                "stage_timings": [],
+                "bypass_cache": initial_state.bypass_cache,
+                "priority": initial_state.priority,
+            }
+
+        return initial_state
+
+    def _start_run(self, initial_state: AgentState, run_id: str, **configurable: Any) -> Tuple[Any, Dict[str, Any]]:
+        """Build the input and config of a workflow run, resuming it if it was checkpointed."""
+        config = {"configurable": {"thread_id": run_id, **configurable}}
+        snapshot = self.app.get_state(config) if self.app.checkpointer is not None else None
+        return self._run_input(initial_state, snapshot), config
+
+    async def _astart_run(self, initial_state: AgentState, run_id: str, **configurable: Any) -> Tuple[Any, Dict[str, Any]]:
+        """Async version of `_start_run`."""
+        config = {"configurable": {"thread_id": run_id, **configurable}}
+        snapshot = await self.app.aget_state(config) if self.app.checkpointer is not None else None
+        return self._run_input(initial_state, snapshot), config
+
+    def _finish_run(self, run_id: str, result: Any) -> None:
+        """Drop the checkpoints of a successful run; failed runs keep them so they can be resumed."""
+        if self.app.checkpointer is None:
+            return
+
+        if not isinstance(result, dict):
+            result = result.dict()
+        if not result.get("error"):
+            self.app.checkpointer.delete_run(run_id)
+
+    async def _afinish_run(self, run_id: str, result: Any) -> None:
+        """Async version of `_finish_run`."""
+        if self.app.checkpointer is None:
+            return
+
+        if not isinstance(result, dict):
+            result = result.dict()
+        if not result.get("error"):
+            await self.app.checkpointer.adelete_run(run_id)
+
+    def _cached_answer(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        """Answer a query from the semantic cache if a similar query was answered before.
+
+        The lookup is recorded as the "semantic_cache" stage of `state`.
+        """
+        semantic_cache = self.registry.semantic_cache
+        if semantic_cache is None or state.bypass_cache:
+            return None
+
+        with timed("semantic_cache", state) as details:
+            try:
+                cached = semantic_cache.lookup(state.query)
+                outcome = "hit" if cached is not None else "miss"
+            except Exception as e:
+                # The embedder is usually a network call; a failed lookup is a miss
+                logger.warning(f"Semantic cache lookup failed, running the workflow: {str(e)}")
+                cached, outcome = None, "error"
+            details["hit"] = cached is not None
+            if cached is not None:
+                details["matched_query"] = cached["matched_query"]
+                details["similarity"] = cached["similarity"]
+
+        get_metrics().increment("cache_requests_total", labels={"cache": "semantic", "result": outcome})
+        if cached is None:
+            return None
+
+        state.research_results = cached["research_results"]
+        state.final_answer = cached["final_answer"]
+        return self._build_response(state.query, state)
 
-    def process_query(self, query: str) -> Dict[str, Any]:
-        """Process a query through the agent system and return the results."""
-        initial_state = AgentState(query=query)
+    async def _acached_answer(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        """Async version of `_cached_answer`, run on the default executor.
+
+        The lookup embeds the query, which may be a network call.
+        """
+        if self.registry.semantic_cache is None or state.bypass_cache:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, self._cached_answer, state)
+
+    def _store_answer(self, query: str, result: Any) -> None:
+        """Store a successful answer in the semantic cache."""
+        semantic_cache = self.registry.semantic_cache
+        if semantic_cache is None:
+            return
+
+        if not isinstance(result, dict):
+            result = result.dict()
+        if result.get("error") or not result.get("final_answer") or not result.get("research_results"):
+            return
+
+        try:
+            semantic_cache.store_answer(query, result["research_results"], result["final_answer"])
+        except Exception as e:
+            logger.warning(f"Failed to store answer in the semantic cache: {str(e)}")
+
+    async def _astore_answer(self, query: str, result: Any) -> None:
+        """Async version of `_store_answer`, run on the default executor.
+
+        Storing embeds the query and saves the index to disk.
+        """
+        if self.registry.semantic_cache is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self._store_answer, query, result)
+
+    def _error_response(self, query: str, error: Exception, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Build the response dictionary for a query that raised an exception."""
+        return {
+            "query": query,
+            "answer": "An error occurred while processing your query.",
+            "error": str(error),
+            "research_queries": [],
+            "sources_count": 0,
+            "stage_timings": [],
+            "run_id": run_id,
+        }
+
+    def process_query(
+        self,
+        query: str,
+        bypass_cache: bool = False,
+        priority: str = "interactive",
+        run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Process a query through the agent system and return the results.
+
+        Set `bypass_cache` to ignore cached search results and LLM responses.
+        `priority` ("interactive" or "batch") orders upstream calls waiting
+        for a rate limit. The response carries the `run_id` of the run; pass
+        it again to resume a failed or interrupted run from its last
+        completed stage instead of starting over.
+        """
+        initial_state = AgentState(query=query, bypass_cache=bypass_cache, priority=priority)
+        run_id = run_id or uuid.uuid4().hex
         
         logger.info(f"Processing query: {query}")
 
         try:
-            result = self.app.invoke(initial_state)
-            
-            response = {
-                "query": query,
-                "answer": getattr(result, "final_answer", "Unable to generate an answer."),
-                "error": getattr(result, "error", None),
-                "research_queries": [],
-                "sources_count": 0,
-            }
+            with timed("total"):
+                cached = self._cached_answer(initial_state)
+                if cached is not None:
+                    return cached
+                run_input, config = self._start_run(initial_state, run_id)
+                result = self.app.invoke(run_input, config=config)
+            response = self._build_response(query, result, run_id)
+            self._finish_run(run_id, result)
+            self._store_answer(query, result)
+            logger.info(f"Query processed successfully: {query[:50]}...")
+            return response
+
+        except Exception as e:
+            logger.exception("Error processing query")
+            return self._error_response(query, e, run_id)
 
-            if hasattr(result, "research_results") and result.research_results:
-                response["research_queries"] = [item.get("query", "") for item in result.research_results]
-                response["sources_count"] = sum(len(r.get("results", [])) for r in result.research_results)
+        finally:
+            get_metrics().flush()
 
+    async def aprocess_query(
+        self,
+        query: str,
+        bypass_cache: bool = False,
+        priority: str = "interactive",
+        run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Asynchronously process a query through the agent system.
+
+        Runs the async agent path on the current event loop, so many queries
+        can be served concurrently without a thread per request.
+        """
+        initial_state = AgentState(query=query, bypass_cache=bypass_cache, priority=priority)
+        run_id = run_id or uuid.uuid4().hex
+        
+        logger.info(f"Processing query: {query}")
+
+        try:
+            with timed("total"):
+                cached = await self._acached_answer(initial_state)
+                if cached is not None:
+                    return cached
+                run_input, config = await self._astart_run(initial_state, run_id)
+                result = await self.app.ainvoke(run_input, config=config)
+            response = self._build_response(query, result, run_id)
+            await self._afinish_run(run_id, result)
+            await self._astore_answer(query, result)
             logger.info(f"Query processed successfully: {query[:50]}...")
             return response
 
         except Exception as e:
             logger.exception("Error processing query")
-            return {
-                "query": query,
-                "answer": "An error occurred while processing your query.",
-                "error": str(e),
-                "research_queries": [],
-                "sources_count": 0,
-            }
+            return self._error_response(query, e, run_id)
+
+        finally:
+            get_metrics().flush()
+
+    def stream_query(self, query: str, bypass_cache: bool = False, run_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Process a query and yield progress events as they happen.
 
+        Yields "queries_generated" and one "search_completed" event per search
+        while researching, "stage_completed" after each workflow node, "token"
+        events while the answer is drafted, and finally a "result" event
+        carrying the same dictionary as `process_query`.
+        """
+        events: "queue.Queue[Any]" = queue.Queue()
+        done = object()
+        run_id = run_id or uuid.uuid4().hex
+
+        def run() -> None:
+            initial_state = AgentState(query=query, bypass_cache=bypass_cache)
+            final_state: Dict[str, Any] = {}
+
+            try:
+                cached = self._cached_answer(initial_state)
+                if cached is not None:
+                    events.put({"type": "token", "content": cached["answer"]})
+                    events.put({"type": "result", **cached})
+                    return
+
+                run_input, config = self._start_run(initial_state, run_id, event_callback=events.put)
+                for update in self.app.stream(run_input, config=config, stream_mode="updates"):
+                    for node, node_state in update.items():
+                        final_state = node_state
+                        events.put({"type": "stage_completed", "stage": node})
+                events.put({"type": "result", **self._build_response(query, final_state, run_id)})
+                self._finish_run(run_id, final_state)
+                self._store_answer(query, final_state)
+            except Exception as e:
+                logger.exception("Error streaming query")
+                events.put({"type": "result", **self._error_response(query, e, run_id)})
+            finally:
+                events.put(done)
+
+        logger.info(f"Streaming query: {query}")
+        worker = threading.Thread(target=run, name="stream-query", daemon=True)
+        worker.start()
+
+        while True:
+            event = events.get()
+            if event is done:
+                break
+            yield event
+
+        worker.join()
+
+    async def astream_query(
+        self,
+        query: str,
+        bypass_cache: bool = False,
+        run_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Asynchronously process a query and yield progress events as they happen.
+
+        Yields the same events as `stream_query`, using the async agent path.
+        """
+        events: "asyncio.Queue[Any]" = asyncio.Queue()
+        done = object()
+        run_id = run_id or uuid.uuid4().hex
+
+        async def run() -> None:
+            initial_state = AgentState(query=query, bypass_cache=bypass_cache)
+            final_state: Dict[str, Any] = {}
+
+            try:
+                cached = await self._acached_answer(initial_state)
+                if cached is not None:
+                    events.put_nowait({"type": "token", "content": cached["answer"]})
+                    events.put_nowait({"type": "result", **cached})
+                    return
+
+                run_input, config = await self._astart_run(initial_state, run_id, event_callback=events.put_nowait)
+                async for update in self.app.astream(run_input, config=config, stream_mode="updates"):
+                    for node, node_state in update.items():
+                        final_state = node_state
+                        events.put_nowait({"type": "stage_completed", "stage": node})
+                events.put_nowait({"type": "result", **self._build_response(query, final_state, run_id)})
+                await self._afinish_run(run_id, final_state)
+                await self._astore_answer(query, final_state)
+            except Exception as e:
+                logger.exception("Error streaming query")
+                events.put_nowait({"type": "result", **self._error_response(query, e, run_id)})
+            finally:
+                events.put_nowait(done)
+
+        logger.info(f"Streaming query: {query}")
+        task = asyncio.create_task(run())
+
+        while True:
+            event = await events.get()
+            if event is done:
+                break
+            yield event
+
+        await task
+
+    def process_batch(
+        self,
+        queries: List[Union[str, Dict[str, Any]]],
+        output_path: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        bypass_cache: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Process many queries concurrently and return their results in input order.
+
+        Queries are strings or dicts with a "query" key and an optional "id".
+        Queries with the same normalized text are processed once and their
+        result is shared, also when `bypass_cache` is set. At most
+        `concurrency` queries run at once. All queries share this system's
+        agents, so identical or near-identical search sub-queries across the
+        batch are executed once: concurrent duplicates join the in-flight
+        search and later ones are served from the search cache. If
+        `output_path` is given, each result is appended to it as a JSON line
+        as soon as it completes. Batch queries run at "batch" priority, so
+        interactive queries go first when rate limits are reached.
+        """
+        from agents.cache import normalize_query
+
+        settings = get_settings()
+        concurrency = max(1, concurrency or settings.batch_concurrency)
+        items = [item if isinstance(item, dict) else {"query": item} for item in queries]
+
+        if self.registry.search_cache is None:
+            logger.warning("Search cache is disabled; only concurrent duplicate searches will be shared")
+
+        groups: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            groups.setdefault(normalize_query(item["query"]), []).append(index)
+
+        if len(groups) < len(items):
+            logger.info(f"Merged {len(items) - len(groups)} duplicate queries in batch")
+
+        logger.info(f"Processing batch of {len(items)} queries with concurrency {concurrency}")
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        output = open(output_path, "w", encoding="utf-8") if output_path else None
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as executor:
+                futures = {
+                    executor.submit(self.process_query, items[indices[0]]["query"], bypass_cache, "batch"): indices
+                    for indices in groups.values()
+                }
+
+                for future in as_completed(futures):
+                    response = future.result()
+                    for index in futures[future]:
+                        result = {"id": items[index].get("id", index), **response, "query": items[index]["query"]}
+                        results[index] = result
+
+                        if output:
+                            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                            output.flush()
+        finally:
+            if output:
+                output.close()
+
+        logger.info(f"Batch complete: {sum(1 for r in results if not r['error'])}/{len(items)} succeeded")
+        return results
+
+
+def load_batch_queries(path: str) -> List[Dict[str, Any]]:
+    """Load batch queries from a file.
+
+    Supports the JSON layout of examples/example_queries.json (a "queries"
+    list), a JSON list, JSON lines, or plain text with one query per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = None
+
+    if isinstance(data, dict):
+        data = data.get("queries", [])
+
+    if data is None:
+        data = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data.append(json.loads(line))
+            except json.JSONDecodeError:
+                data.append(line)
+
+    return [item if isinstance(item, dict) else {"query": str(item)} for item in data]
+
+def describe_caches() -> List[Dict[str, Any]]:
+    """Describe the on-disk search, LLM and semantic caches without loading the pipeline."""
+    from agents.cache import SQLiteCache
+
+    settings = get_settings()
+    caches = []
+    for name, enabled, path in (
+        ("search", settings.search_cache_enabled, settings.search_cache_path),
+        ("llm", settings.llm_cache_enabled, settings.llm_cache_path),
+        ("semantic", semantic_cache_active(settings), settings.semantic_cache_path),
+    ):
+        description = {"cache": name, "enabled": enabled, "path": path, "entries": 0, "size_bytes": 0}
+        if path and os.path.exists(path):
+            description["entries"] = len(SQLiteCache(path))
+            description["size_bytes"] = sum(
+                os.path.getsize(file) for file in (path, f"{path}-wal") if os.path.exists(file)
+            )
+        caches.append(description)
+    return caches
+
+def measure_startup() -> Dict[str, float]:
+    """Measure where startup time goes, in seconds per phase.
+
+    Phases are this module's own imports, importing LangGraph/LangChain and
+    the agents, compiling the workflow, and building the agents with their
+    LLM and search clients.
+    """
+    timings = {"main_imports": _IMPORT_SECONDS}
+
+    start = time.perf_counter()
+    import config.workflow  # noqa: F401
+    timings["framework_imports"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    system = ResearchSystem()
+    timings["workflow_compile"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        system.registry.research_agent
+        system.registry.drafting_agent
+    except Exception as e:
+        logger.warning(f"Could not build agents: {str(e)}")
+    timings["agent_construction"] = time.perf_counter() - start
+
+    timings["total"] = sum(timings.values())
+    return timings
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="AI Agentic Research System")
     parser.add_argument("--query", type=str, required=False, help="Query to process")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached search results and LLM responses")
+    parser.add_argument("--stream", action="store_true", help="Print search progress and the answer as it is generated")
+    parser.add_argument("--run-id", type=str, help="Checkpoint the run under this ID, resuming it if it failed or was interrupted")
+    parser.add_argument("--batch", type=str, help="File of queries to process as a batch")
+    parser.add_argument("--output", type=str, default="batch_results.jsonl", help="JSONL file for batch results")
+    parser.add_argument("--concurrency", type=int, help="Maximum number of batch queries processed at once")
+    parser.add_argument("--validate-config", action="store_true", help="Check the settings and exit")
+    parser.add_argument("--cache-stats", action="store_true", help="Show the size of the on-disk caches and exit")
+    parser.add_argument("--startup-time", action="store_true", help="Measure startup time per phase and exit")
     args = parser.parse_args()
 
-    # Instantiate the system
-    system = ResearchSystem()
+    if args.validate_config:
+        problems = validate_settings(get_settings())
+        for problem in problems:
+            print(f"- {problem}")
+        print("Configuration is valid" if not problems else f"{len(problems)} configuration problem(s) found")
+        raise SystemExit(1 if problems else 0)
+
+    if args.cache_stats:
+        for cache in describe_caches():
+            state = "enabled" if cache["enabled"] else "disabled"
+            print(f"- {cache['cache']} cache ({state}): {cache['entries']} entries, "
+                  f"{cache['size_bytes'] / 1024:.1f} KiB at {cache['path']}")
+        raise SystemExit(0)
+
+    if args.startup_time:
+        for phase, seconds in measure_startup().items():
+            print(f"- {phase}: {seconds:.3f}s")
+        raise SystemExit(0)
+
+    # Instantiate the system. Runs are checkpointed when they can be resumed:
+    # a named run, or batch runs whose results list their run IDs
+    system = ResearchSystem(checkpointing=True if args.run_id or args.batch else None)
+
+    if args.batch:
+        batch = load_batch_queries(args.batch)
+        print(f"Processing {len(batch)} queries from {args.batch}")
+        results = system.process_batch(
+            batch,
+            output_path=args.output,
+            concurrency=args.concurrency,
+            bypass_cache=args.no_cache,
+        )
+        failed = sum(1 for r in results if r["error"])
+        print(f"Wrote {len(results)} results to {args.output} ({failed} failed)")
+        get_metrics().flush(force=True)
+
+        summary = getattr(get_metrics(), "summary", None)
+        if summary:
+            print("\n--- Stage Latency (seconds) ---")
+            for series, stats in summary()["distributions"].items():
+                print(f"- {series}: p50={stats['p50']:.3f} p95={stats['p95']:.3f} p99={stats['p99']:.3f} (n={stats['count']})")
+        raise SystemExit(1 if failed else 0)
 
     if args.query:
         query = args.query
@@ -79,7 +593,23 @@ if __name__ == "__main__":
 
     print(f"Processing query: {query}")
     
-    result = system.process_query(query)
+    if args.stream:
+        result = None
+        for event in system.stream_query(query, bypass_cache=args.no_cache, run_id=args.run_id):
+            if event["type"] == "search_completed":
+                print(f"- Searched: {event['query']} ({event['results_count']} results)")
+            elif event["type"] == "token":
+                print(event["content"], end="", flush=True)
+            elif event["type"] == "result":
+                result = event
+        print()
+        if result.get("error"):
+            print(f"Error: {result['error']}")
+            if system.registry.checkpointer is not None:
+                print(f"Resume with: --run-id {result['run_id']}")
+        raise SystemExit(0)
+
+    result = system.process_query(query, bypass_cache=args.no_cache, run_id=args.run_id)
     
     print("\n--- Query Result ---")
     print(f"Query: {result['query']}")
@@ -87,6 +617,8 @@ if __name__ == "__main__":
     
     if result.get("error"):
         print(f"Error: {result['error']}")
+        if system.registry.checkpointer is not None:
+            print(f"Resume with: --run-id {result['run_id']}")
     
     print("\n--- Research Statistics ---")
     print(f"- Search queries used: {result['research_queries']}")
@@ -2,6 +2,7 @@
 Models package for the AI Agentic Research System.
 Contains data models for the system.
 """
+from models.search import SearchGroup, SearchHit
 from models.state import AgentState
 
-__all__ = ["AgentState"]
\ No newline at end of file
+__all__ = ["AgentState", "SearchGroup", "SearchHit"]
\ No newline at end of file
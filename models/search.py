@@ -0,0 +1,163 @@
+"""
+Search result models for the AI Agentic Research System.
+Compact, read-only representations of search hits and search groups that
+keep the dictionary-style access of the raw Tavily results.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+class SearchHit(Mapping):
+    """
+    A single search hit with title, url, content and score.
+    
+    Hits are held in `__slots__` instead of a per-hit dictionary, and URLs
+    are interned, so a page returned by several searches or queries shares
+    one URL string. The content string is referenced, never copied. Hits
+    behave like read-only dictionaries: `hit["url"]`, `hit.get("score")` and
+    `{**hit}` work, and a hit equals the dictionary it was built from. Keys
+    other than the four fields (e.g. "fetched_at" of stored pages) are kept
+    in `extra`.
+    """
+    __slots__ = ("title", "url", "content", "score", "extra")
+    
+    _FIELDS = ("title", "url", "content", "score")
+    
+    def __init__(
+        self,
+        title: Optional[str] = None,
+        url: Optional[str] = None,
+        content: Optional[str] = None,
+        score: Optional[float] = None,
+        **extra: Any
+    ):
+        self.title = title
+        self.url = sys.intern(url) if type(url) is str else url
+        self.content = content
+        self.score = score
+        self.extra = extra or None
+    
+    @classmethod
+    def from_dict(cls, hit: Mapping) -> "SearchHit":
+        """
+        Build a hit from a raw search result, reusing it if it is a hit already.
+        
+        Args:
+            hit: Search result with title, url, content and optionally score
+        
+        Returns:
+            The search hit
+        """
+        if isinstance(hit, cls):
+            return hit
+        return cls(**hit)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        for key in self._FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+        if self.extra:
+            yield from self.extra
+    
+    def __len__(self) -> int:
+        return sum(getattr(self, key) is not None for key in self._FIELDS) + len(self.extra or ())
+    
+    def __repr__(self) -> str:
+        return f"SearchHit({self.to_dict()!r})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the hit to a plain dictionary, e.g. to store it as JSON.
+        
+        Returns:
+            Dictionary with the keys of the hit
+        """
+        return dict(self.items())
+
+class SearchGroup(Mapping):
+    """
+    The hits of one search query, and the error if the search failed.
+    
+    Read-only and dictionary-like like `SearchHit`, with the keys "query",
+    "results" and, for failed searches, "error".
+    """
+    __slots__ = ("query", "results", "error")
+    
+    def __init__(self, query: str, results: Iterable[Mapping] = (), error: Optional[str] = None):
+        self.query = query
+        self.results: List[SearchHit] = [SearchHit.from_dict(hit) for hit in results]
+        self.error = error
+    
+    @classmethod
+    def from_dict(cls, group: Mapping) -> "SearchGroup":
+        """
+        Build a group from a search group dictionary, reusing it if it is a group already.
+        
+        Args:
+            group: Search group with query, results and optionally error
+        
+        Returns:
+            The search group
+        """
+        if isinstance(group, cls):
+            return group
+        return cls(group.get("query", ""), group.get("results") or (), group.get("error"))
+    
+    @classmethod
+    def __get_validators__(cls):
+        # Lets pydantic models declare fields of this type and accept dictionaries
+        yield cls.from_dict
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == "query":
+            return self.query
+        if key == "results":
+            return self.results
+        if key == "error" and self.error is not None:
+            return self.error
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        yield "query"
+        yield "results"
+        if self.error is not None:
+            yield "error"
+    
+    def __len__(self) -> int:
+        return 2 if self.error is None else 3
+    
+    def __repr__(self) -> str:
+        return f"SearchGroup({self.to_dict()!r})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the group and its hits to plain dictionaries, e.g. to store them as JSON.
+        
+        Returns:
+            Dictionary with query, results and, if the search failed, error
+        """
+        group = {"query": self.query, "results": [hit.to_dict() for hit in self.results]}
+        if self.error is not None:
+            group["error"] = self.error
+        return group
+
+def results_to_dicts(research_results: Iterable[Mapping]) -> List[Dict[str, Any]]:
+    """
+    Convert search groups to plain dictionaries.
+    
+    Args:
+        research_results: Search groups, as models or dictionaries
+    
+    Returns:
+        List of JSON-serializable search group dictionaries
+    """
+    return [SearchGroup.from_dict(group).to_dict() for group in research_results]
@@ -4,6 +4,7 @@ Defines the structure of data passed between agents.
 """
 from typing import List, Dict, Any, Optional
 from langchain_core.pydantic_v1 import BaseModel, Field
+from models.search import SearchGroup
 
 class AgentState(BaseModel):
     """
@@ -13,9 +14,17 @@ class AgentState(BaseModel):
     query: str = Field(
         description="The original user query"
     )
-    research_results: List[Dict[str, Any]] = Field(
+    research_results: List[SearchGroup] = Field(
         default_factory=list, 
-        description="Research results collected by the research agent"
+        description="Research results collected by the research agent; dictionaries are converted to search groups"
+    )
+    research_round: int = Field(
+        default=0,
+        description="Number of research rounds completed"
+    )
+    research_complete: bool = Field(
+        default=False,
+        description="Whether the coverage check found the research results sufficient"
     )
     intermediate_steps: List[Dict[str, Any]] = Field(
         default_factory=list, 
@@ -29,6 +38,18 @@ class AgentState(BaseModel):
         default=None, 
         description="Error message if something went wrong during processing"
     )
+    stage_timings: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="Duration and details of each processing stage"
+    )
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip cached search results and LLM responses for this request"
+    )
+    priority: str = Field(
+        default="interactive",
+        description="Scheduling priority of upstream calls: \"interactive\" or \"batch\""
+    )
     
     def add_intermediate_step(self, agent_name: str, action: str, details: Dict[str, Any]) -> None:
         """
@@ -43,4 +64,21 @@ class AgentState(BaseModel):
             "agent": agent_name,
             "action": action,
             **details
-        })
\ No newline at end of file
+        })
+    
+    def record_stage(self, stage: str, duration_seconds: float, **details: Any) -> None:
+        """
+        Record the duration of a processing stage.
+        
+        Safe to call from concurrent search threads, since it only appends.
+        
+        Args:
+            stage: Name of the stage
+            duration_seconds: Wall-clock duration of the stage
+            details: Additional details such as token counts or cache hits
+        """
+        self.stage_timings.append({
+            "stage": stage,
+            "duration_seconds": round(duration_seconds, 6),
+            **details
+        })
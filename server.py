@@ -0,0 +1,288 @@
+"""
+HTTP server for the AI Agentic Research System.
+
+Keeps a single ResearchSystem (compiled workflow, LLM clients and caches)
+warm across requests and coalesces concurrent identical queries into one
+pipeline execution.
+
+Endpoints:
+    GET  /health            Liveness check
+    GET  /metrics           Per-stage latency percentiles and counters
+    POST /research          {"query": "...", "bypass_cache": false} -> result JSON
+    POST /research/stream   Same body; progress events as Server-Sent Events
+"""
+import json
+import time
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from main import ResearchSystem
+from agents.cache import make_cache_key, normalize_query
+from agents.concurrency import SingleFlight
+from agents.metrics import get_metrics
+from config.settings import get_settings
+
+# Get logger
+logger = logging.getLogger(__name__)
+
+class EventBroadcast:
+    """
+    Fans out the events of one streaming run to any number of subscribers.
+
+    Subscribers joining late first receive the events published so far, so
+    every subscriber sees the complete stream.
+    """
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Publish an event to all subscribers.
+
+        Args:
+            event: Event to publish
+        """
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Mark the stream as complete."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def subscribe(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all events of the stream, waiting for new ones until it is closed.
+
+        Yields:
+            Published events in order
+        """
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._events) and not self._closed:
+                    self._condition.wait()
+                events = self._events[index:]
+                if not events and self._closed:
+                    return
+            index += len(events)
+            yield from events
+
+class ResearchService:
+    """
+    Serves research queries from a shared, warm ResearchSystem.
+
+    Concurrent requests for the same (normalized) query run the pipeline
+    once and all receive its result; streaming requests share the events
+    of one streaming run.
+    """
+    def __init__(self, system: Optional[ResearchSystem] = None):
+        self.system = system or ResearchSystem()
+        self.inflight = SingleFlight()
+        self._streams: Dict[str, EventBroadcast] = {}
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """Build the agents, their clients and caches before the first request."""
+        self.system.registry.research_agent
+        self.system.registry.drafting_agent
+
+    def _key(self, query: str, bypass_cache: bool) -> str:
+        return make_cache_key("query", normalize_query(query), bypass_cache)
+
+    def research(self, query: str, bypass_cache: bool = False) -> Dict[str, Any]:
+        """
+        Process a query, joining an identical in-flight query if there is one.
+
+        Args:
+            query: The query to process
+            bypass_cache: Ignore cached search results and LLM responses
+
+        Returns:
+            Result dictionary as returned by ResearchSystem.process_query
+        """
+        leader = False
+
+        def run() -> Dict[str, Any]:
+            nonlocal leader
+            leader = True
+            return self.system.process_query(query, bypass_cache=bypass_cache)
+
+        result = self.inflight.do(self._key(query, bypass_cache), run)
+        if not leader:
+            logger.info(f"Coalesced query: {query[:50]}")
+            get_metrics().increment("coalesced_requests_total", labels={"endpoint": "research"})
+        return {**result, "query": query}
+
+    def stream(self, query: str, bypass_cache: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the progress events of a query, sharing an identical in-flight stream if there is one.
+
+        Args:
+            query: The query to process
+            bypass_cache: Ignore cached search results and LLM responses
+
+        Returns:
+            Iterator over the events of ResearchSystem.stream_query
+        """
+        key = self._key(query, bypass_cache)
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = EventBroadcast()
+
+        if leader:
+            def run() -> None:
+                try:
+                    for event in self.system.stream_query(query, bypass_cache=bypass_cache):
+                        broadcast.publish(event)
+                finally:
+                    with self._lock:
+                        self._streams.pop(key, None)
+                    broadcast.close()
+
+            # The run outlives a disconnecting client so joined subscribers still complete
+            threading.Thread(target=run, name="stream-query-broadcast", daemon=True).start()
+        else:
+            logger.info(f"Coalesced streaming query: {query[:50]}")
+            get_metrics().increment("coalesced_requests_total", labels={"endpoint": "research_stream"})
+
+        for event in broadcast.subscribe():
+            yield {**event, "query": query} if event["type"] == "result" else event
+
+class ResearchRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler dispatching to a ResearchService.
+    """
+    service: ResearchService
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, body: Any) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_query(self) -> Tuple[Optional[str], bool]:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return None, False
+        if length < 0:
+            return None, False
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return None, False
+        if not isinstance(body, dict):
+            return None, False
+
+        query = body.get("query")
+        if not isinstance(query, str) or not query.strip():
+            return None, False
+        return query, bool(body.get("bypass_cache", False))
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            summary = getattr(get_metrics(), "summary", None)
+            self._send_json(200, summary() if summary else {})
+        else:
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path not in ("/research", "/research/stream"):
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+
+        query, bypass_cache = self._read_query()
+        if query is None:
+            self._send_json(400, {"error": "Request body must be a JSON object with a non-empty \"query\""})
+            return
+
+        start = time.perf_counter()
+        try:
+            if self.path == "/research":
+                self._send_json(200, self.service.research(query, bypass_cache=bypass_cache))
+            else:
+                self._stream_events(self.service.stream(query, bypass_cache=bypass_cache))
+        finally:
+            get_metrics().observe(
+                "http_request_duration_seconds", time.perf_counter() - start, {"endpoint": self.path}
+            )
+
+    def _stream_events(self, events: Iterator[Dict[str, Any]]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            for event in events:
+                data = json.dumps(event, ensure_ascii=False)
+                self.wfile.write(f"event: {event['type']}\ndata: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client disconnected from stream")
+
+def create_server(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    service: Optional[ResearchService] = None
+) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server. Call `serve_forever()` on the result to serve.
+
+    Args:
+        host: Interface to bind, defaults to the server_host setting
+        port: Port to bind (0 for any free port), defaults to the server_port setting
+        service: Research service to serve, built and warmed up if not given
+
+    Returns:
+        The bound HTTP server
+    """
+    settings = get_settings()
+    if service is None:
+        service = ResearchService()
+        service.warm_up()
+
+    handler = type("BoundResearchRequestHandler", (ResearchRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer(
+        (host or settings.server_host, settings.server_port if port is None else port),
+        handler
+    )
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Agentic Research System HTTP server")
+    parser.add_argument("--host", type=str, help="Interface to bind")
+    parser.add_argument("--port", type=int, help="Port to listen on")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port)
+    host, port = server.server_address[:2]
+    logger.info(f"Serving on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        get_metrics().flush(force=True)
@@ -0,0 +1,49 @@
+"""
+Shared fixtures for the tests.
+"""
+import json
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from agents.cache import MemoryCache
+from agents.registry import AgentRegistry
+from config.settings import get_settings
+from main import ResearchSystem
+
+QUERY_GENERATION = json.dumps({"search_queries": ["quantum computing"], "reasoning": "Test."})
+HITS = [{"title": "Qubits", "content": "Qubits improved.", "url": "https://example.com/quantum"}]
+
+@pytest.fixture
+def make_system(monkeypatch):
+    """
+    Fixture to build ResearchSystems with fake LLMs and search and in-memory caches.
+
+    The semantic cache, document store and checkpointer are disabled unless
+    a test passes one, so each test only runs through the components it tests.
+    The returned function takes the query generation responses, the drafted
+    answer, the search hits or a function of the search query returning them,
+    and any AgentRegistry arguments.
+    """
+    settings = get_settings()
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    monkeypatch.setattr(settings, "document_store_enabled", False)
+    monkeypatch.setattr(settings, "checkpointing_enabled", False)
+
+    def make(research_responses=(QUERY_GENERATION,), answer="Qubits improved [Source 1].", hits=HITS, search=None, **components):
+        components.setdefault("research_llm", FakeListChatModel(responses=list(research_responses)))
+        components.setdefault("drafting_llm", FakeListChatModel(responses=[answer]))
+        components.setdefault("search_cache", MemoryCache())
+        components.setdefault("llm_cache", MemoryCache())
+        registry = AgentRegistry(**components)
+
+        if "search_tool" not in components:
+            tool_executor = MagicMock()
+            if search is not None:
+                tool_executor.invoke.side_effect = lambda invocation: search(invocation["tool_input"]["query"])
+            else:
+                tool_executor.invoke.return_value = hits
+                tool_executor.ainvoke = AsyncMock(return_value=hits)
+            registry.research_agent.tool_executor = tool_executor
+        return ResearchSystem(registry=registry)
+
+    return make
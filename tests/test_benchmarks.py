@@ -0,0 +1,70 @@
+"""
+Tests for the offline benchmark harness.
+"""
+import asyncio
+import pytest
+from benchmarks.fakes import FakeChatModel, FakeSearchTool
+from benchmarks.run_benchmark import BenchmarkProfile, format_report, make_queries, run_once
+from config.settings import get_settings
+
+@pytest.fixture
+def profile():
+    """Fixture for an upstream profile without simulated latency."""
+    return BenchmarkProfile(llm_latency=0.0, search_latency=0.0, jitter=0.0, content_chars=200, answer_words=20)
+
+def test_fake_search_is_deterministic():
+    """Test that the fake search returns the same hits for the same seed."""
+    first = FakeSearchTool(seed=7).invoke({"query": "solar panels", "max_results": 3})
+    second = FakeSearchTool(seed=7).invoke({"query": "solar panels", "max_results": 3})
+
+    assert first == second
+    assert len(first) == 3
+    assert all(hit["url"].startswith("https://example.com/") for hit in first)
+
+def test_fake_search_error_rate():
+    """Test that the fake search fails at the configured error rate."""
+    tool = FakeSearchTool(error_rate=1.0)
+
+    with pytest.raises(RuntimeError):
+        tool.invoke({"query": "solar panels", "max_results": 3})
+    with pytest.raises(RuntimeError):
+        asyncio.run(tool.ainvoke({"query": "solar panels", "max_results": 3}))
+    assert tool.upstream.errors == 2
+
+def test_fake_llm_generates_search_queries():
+    """Test that query-generation prompts are answered with JSON search queries."""
+    model = FakeChatModel()
+    response = model.invoke("QUERY: solar panels\nWhat are the top 2 specific search queries? Use search_queries.")
+
+    assert '"search_queries"' in response.content
+    assert response.content.count("solar panels") == 2
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_run_once_reports_measurements(profile, mode):
+    """Test that a benchmark run reports throughput, stage percentiles and memory."""
+    run = run_once(make_queries(4), 2, profile, mode=mode)
+
+    assert run["queries"] == 4
+    assert run["errors"] == 0
+    assert run["queries_per_second"] > 0
+    assert run["peak_memory_mb"] > 0
+    assert run["stages"]["total"]["count"] == 4
+    assert run["stages"]["search"]["count"] == 12
+    assert "total" in format_report(run)
+
+def test_optional_components_are_opt_in(profile, monkeypatch):
+    """Test that runs only enable the optional components the settings or the caller enable."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "semantic_cache_enabled", None)
+    monkeypatch.setattr(settings, "embedder", "hashing")
+    monkeypatch.setattr(settings, "document_store_enabled", False)
+    monkeypatch.setattr(settings, "checkpointing_enabled", False)
+
+    baseline = run_once(make_queries(2), 1, profile, trace_memory=False)
+    extended = run_once(make_queries(2), 1, profile, trace_memory=False, extras=["semantic_cache", "document_store"])
+
+    assert baseline["components"] == []
+    assert "semantic_cache" not in baseline["stages"]
+    assert extended["components"] == ["semantic_cache", "document_store"]
+    assert extended["stages"]["semantic_cache"]["count"] == 2
+    assert "optional components: semantic_cache, document_store" in format_report(extended)
@@ -0,0 +1,103 @@
+"""
+Tests for the search and LLM caches.
+"""
+import time
+from unittest.mock import MagicMock
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+from agents.cache import MemoryCache, SQLiteCache, TieredCache, search_cache_key
+from agents.llm_cache import CachedChatModel
+from agents.research_agent import ResearchAgent
+from models.state import AgentState
+
+def test_search_cache_key_normalizes_query():
+    """Test that case and whitespace differences map to the same key."""
+    assert search_cache_key("Quantum  Computing ", 5) == search_cache_key("quantum computing", 5)
+    assert search_cache_key("quantum computing", 5) != search_cache_key("quantum computing", 10)
+
+def test_memory_cache_lru_eviction_and_stats():
+    """Test LRU eviction order and hit/miss counters."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+    assert cache.stats.evictions == 1
+
+def test_memory_cache_ttl_expiry():
+    """Test that expired entries are not returned."""
+    cache = MemoryCache(ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    """Test that the disk tier survives reopening and respects its size bound."""
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path, max_entries=2)
+    cache.set("a", [{"url": "https://example.com"}])
+    cache.set("b", [])
+    cache.get("a")
+    cache.set("c", [])
+    
+    reopened = SQLiteCache(path, max_entries=2)
+    assert reopened.get("a") == [{"url": "https://example.com"}]
+    assert reopened.get("b") is None
+    assert len(reopened) == 2
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    """Test that disk hits are copied into the memory tier."""
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    disk.set("a", {"value": 1})
+    cache = TieredCache(MemoryCache(), disk)
+    
+    assert cache.get("a") == {"value": 1}
+    assert cache.memory.get("a") == {"value": 1}
+    assert cache.stats.hits == 1
+
+def test_research_agent_uses_search_cache():
+    """Test that repeated searches are served from the cache."""
+    agent = ResearchAgent(llm=MagicMock(), search_cache=MemoryCache())
+    agent.query_generation_chain = MagicMock()
+    agent.query_generation_chain.invoke.return_value = {"search_queries": ["quantum computing"], "reasoning": ""}
+    agent.tool_executor = MagicMock()
+    agent.tool_executor.invoke.return_value = [{"title": "T", "content": "C", "url": "https://example.com"}]
+    
+    first = agent.process(AgentState(query="Quantum computing"))
+    second = agent.process(AgentState(query="Quantum computing"))
+    
+    assert agent.tool_executor.invoke.call_count == 1
+    assert first.research_results == second.research_results
+    assert agent.search_cache.stats.hits == 1
+
+def test_cached_chat_model_reuses_responses():
+    """Test that identical prompts are answered from the LLM cache."""
+    llm = FakeListChatModel(responses=["first answer", "second answer"])
+    chain = ChatPromptTemplate.from_template("Answer: {query}") | CachedChatModel(llm, MemoryCache())
+    
+    first = chain.invoke({"query": "quantum computing"})
+    second = chain.invoke({"query": "quantum computing"})
+    other = chain.invoke({"query": "gene editing"})
+    
+    assert first.content == "first answer"
+    assert second.content == "first answer"
+    assert other.content == "second answer"
+
+def test_cached_chat_model_bypass():
+    """Test that bypass_cache skips the lookup but refreshes the entry."""
+    llm = FakeListChatModel(responses=["first answer", "second answer"])
+    chain = ChatPromptTemplate.from_template("Answer: {query}") | CachedChatModel(llm, MemoryCache())
+    
+    chain.invoke({"query": "quantum computing"})
+    bypassed = chain.invoke({"query": "quantum computing"}, config={"configurable": {"bypass_cache": True}})
+    cached = chain.invoke({"query": "quantum computing"})
+    
+    assert bypassed.content == "second answer"
+    assert cached.content == "second answer"
@@ -0,0 +1,138 @@
+"""
+Tests for workflow checkpointing and resuming failed or interrupted runs.
+"""
+import time
+import asyncio
+import threading
+import pytest
+from agents.checkpoint import CheckpointStore
+from agents.registry import AgentRegistry
+from config.settings import Settings, get_settings
+
+QUERY = "What are the latest advancements in quantum computing?"
+
+@pytest.fixture
+def system(make_system, tmp_path):
+    """Fixture for a system with fake LLMs and search and an on-disk checkpoint store."""
+    return make_system(checkpointer=CheckpointStore(str(tmp_path / "checkpoints.sqlite")))
+
+def fail_first_draft(system):
+    """Make the first drafting attempt of a system report an error."""
+    agent = system.registry.drafting_agent
+    process, aprocess = agent.process, agent.aprocess
+
+    def fail(state):
+        agent.process, agent.aprocess = process, aprocess
+        state.error = "Drafting agent error: upstream unavailable"
+        return state
+
+    async def afail(state, config=None):
+        return fail(state)
+
+    agent.process = lambda state, config=None: fail(state)
+    agent.aprocess = afail
+
+def test_failed_run_resumes_at_drafting(system):
+    """Test that retrying a run whose drafting failed does not search again."""
+    fail_first_draft(system)
+    failed = system.process_query(QUERY)
+    assert failed["error"] == "Drafting agent error: upstream unavailable"
+    assert system.registry.checkpointer.count_runs() == 1
+
+    resumed = system.process_query(QUERY, run_id=failed["run_id"])
+
+    assert resumed["error"] is None
+    assert resumed["answer"] == "Qubits improved [Source 1]."
+    assert resumed["sources_count"] == 1
+    assert system.registry.research_agent.tool_executor.invoke.call_count == 1
+    assert "research" not in [timing["stage"] for timing in resumed["stage_timings"]]
+    assert system.registry.checkpointer.count_runs() == 0
+
+def test_new_run_id_starts_over(system):
+    """Test that a failed run is not resumed under another run ID."""
+    fail_first_draft(system)
+    system.process_query(QUERY)
+    result = system.process_query(QUERY)
+
+    assert result["error"] is None
+    assert "research" in [timing["stage"] for timing in result["stage_timings"]]
+    assert system.registry.checkpointer.count_runs() == 1
+
+def test_async_run_resumes(system):
+    """Test resuming on the async path."""
+    fail_first_draft(system)
+
+    async def run():
+        failed = await system.aprocess_query(QUERY)
+        return await system.aprocess_query(QUERY, run_id=failed["run_id"])
+
+    resumed = asyncio.run(run())
+
+    assert resumed["error"] is None
+    assert system.registry.research_agent.tool_executor.ainvoke.call_count == 1
+
+def test_async_run_deletes_checkpoints_off_the_event_loop(system):
+    """Test that the async path deletes the checkpoints of a successful run in a worker thread."""
+    checkpointer = system.registry.checkpointer
+    delete_run = checkpointer.delete_run
+    threads = []
+
+    def record(run_id):
+        threads.append(threading.get_ident())
+        delete_run(run_id)
+
+    checkpointer.delete_run = record
+
+    async def run():
+        await system.aprocess_query(QUERY)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert len(threads) == 1
+    assert loop_thread not in threads
+    assert checkpointer.count_runs() == 0
+
+def test_interrupted_run_continues_at_pending_node(system):
+    """Test that a run interrupted inside a node continues at that node."""
+    agent = system.registry.research_agent
+    process = agent.process
+
+    def crash(state, config=None):
+        agent.process = process
+        raise RuntimeError("worker crashed")
+
+    agent.process = crash
+    interrupted = system.process_query(QUERY)
+    snapshot = system.app.get_state({"configurable": {"thread_id": interrupted["run_id"]}})
+    assert interrupted["error"] == "worker crashed"
+    assert snapshot.next == ("research",)
+
+    resumed = system.process_query(QUERY, run_id=interrupted["run_id"])
+
+    assert resumed["error"] is None
+    assert resumed["sources_count"] == 1
+
+def test_expired_failed_runs_are_deleted(system):
+    """Test that the checkpoints of failed runs nobody resumed expire."""
+    checkpointer = system.registry.checkpointer
+    fail_first_draft(system)
+    system.process_query(QUERY)
+    assert checkpointer.count_runs() == 1
+
+    checkpointer.ttl_seconds = 0.01
+    time.sleep(0.02)
+
+    assert len(checkpointer.delete_expired()) == 1
+    assert checkpointer.count_runs() == 0
+
+def test_checkpointing_is_opt_in(monkeypatch, tmp_path):
+    """Test that runs are only checkpointed when checkpointing is turned on."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "checkpointing_enabled", Settings.__fields__["checkpointing_enabled"].default)
+    monkeypatch.setattr(settings, "checkpoint_path", str(tmp_path / "checkpoints.sqlite"))
+
+    assert AgentRegistry().checkpointer is None
+    assert isinstance(AgentRegistry(checkpointing=True).checkpointer, CheckpointStore)
+    monkeypatch.setattr(settings, "checkpointing_enabled", True)
+    assert AgentRegistry(checkpointing=False).checkpointer is None
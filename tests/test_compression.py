@@ -0,0 +1,55 @@
+"""
+Tests for extractive compression of long sources.
+"""
+from unittest.mock import MagicMock
+from agents.compression import compress_text, score_sentences, split_sentences
+from agents.drafting_agent import DraftingAgent
+from agents.token_budget import count_tokens
+from models.state import AgentState
+
+FILLER = " ".join(f"Filler sentence {i} talks about the weather and gardening." for i in range(60))
+RELEVANT = "Surface codes reduced quantum error rates below threshold."
+TEXT = f"Quantum computing basics. {FILLER} {RELEVANT} {FILLER}"
+
+def test_split_sentences():
+    """Test splitting at terminators and blank lines."""
+    assert split_sentences("One. Two! Three?\n\nFour\nstill four") == ["One.", "Two!", "Three?", "Four\nstill four"]
+
+def test_score_sentences_prefers_rare_query_terms():
+    """Test that sentences with more, and rarer, query terms score higher."""
+    sentences = ["Quantum computing basics.", RELEVANT, "Weather and gardening."]
+
+    scores = score_sentences(sentences, ["quantum error correction", "surface codes"])
+
+    assert scores.argmax() == 1
+    assert scores[2] == 0
+
+def test_compress_keeps_relevant_sentences_in_order():
+    """Test that the relevant sentences deep in a long text survive compression, in order."""
+    compressed = compress_text(TEXT, ["quantum error rates"], budget=120)
+
+    assert compressed == f"Quantum computing basics. {RELEVANT}"
+    assert compress_text("Short text.", ["quantum"], budget=120) == "Short text."
+
+def test_compress_falls_back_to_truncation():
+    """Test that text without query terms is truncated."""
+    compressed = compress_text(FILLER, ["quantum"], budget=100)
+
+    assert compressed.startswith("Filler sentence 0")
+    assert compressed.endswith("...")
+
+def test_drafting_sources_are_compressed():
+    """Test that the drafting agent compresses sources to their token share using the sub-queries."""
+    agent = DraftingAgent(llm=MagicMock())
+    state = AgentState(
+        query="What is new in quantum computing?",
+        research_results=[{
+            "query": "quantum error rates",
+            "results": [{"title": "Quantum", "content": TEXT, "url": "https://example.com/quantum"}]
+        }]
+    )
+
+    sources = agent._prepare_sources(state)
+
+    assert RELEVANT in sources[0]["content"]
+    assert count_tokens(sources[0]["content"]) < count_tokens(TEXT)
@@ -0,0 +1,104 @@
+"""
+Tests for request coalescing and batch processing.
+"""
+import json
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+import pytest
+from agents.concurrency import SingleFlight
+from main import load_batch_queries
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent calls with the same key execute once."""
+    flight = SingleFlight()
+    calls = []
+    
+    def work():
+        calls.append(1)
+        time.sleep(0.05)
+        return "result"
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+def test_single_flight_async_shares_exceptions():
+    """Test that async followers receive the leader's exception."""
+    flight = SingleFlight()
+    
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+    
+    async def run():
+        return await asyncio.gather(*(flight.ado("key", work) for _ in range(3)), return_exceptions=True)
+    
+    outcomes = asyncio.run(run())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+def test_process_batch_deduplicates_searches(make_system, tmp_path):
+    """Test that near-identical sub-queries across a batch are searched once."""
+    query_generation = json.dumps({
+        "search_queries": ["Quantum computing", "quantum computing!", "quantum error correction"],
+        "reasoning": "Batch test."
+    })
+    system = make_system(
+        [query_generation],
+        answer="Answer citing [Source 1].",
+        hits=[{"title": "T", "content": "C", "url": "https://example.com"}]
+    )
+    tool_executor = system.registry.research_agent.tool_executor
+    output_path = tmp_path / "results.jsonl"
+    
+    results = system.process_batch(
+        [{"id": "q1", "query": "First question"}, "Second question", "Third question"],
+        output_path=str(output_path),
+        concurrency=3
+    )
+    
+    assert [result["id"] for result in results] == ["q1", 1, 2]
+    assert all(result["error"] is None for result in results)
+    assert tool_executor.invoke.call_count == 2
+    lines = output_path.read_text().splitlines()
+    assert len(lines) == 3
+    assert {json.loads(line)["id"] for line in lines} == {"q1", 1, 2}
+
+def test_process_batch_merges_duplicate_queries(make_system):
+    """Test that queries with the same normalized text are processed once, also when bypassing caches."""
+    system = make_system()
+    system.process_query = MagicMock(side_effect=lambda query, bypass_cache, priority: {
+        "query": query, "answer": f"Answer to {query}", "error": None
+    })
+    
+    results = system.process_batch(
+        [{"id": "a", "query": "What is X?"}, "Other question", {"id": "b", "query": "what is  x"}],
+        concurrency=2,
+        bypass_cache=True
+    )
+    
+    assert system.process_query.call_count == 2
+    assert [result["id"] for result in results] == ["a", 1, "b"]
+    assert [result["query"] for result in results] == ["What is X?", "Other question", "what is  x"]
+    assert results[0]["answer"] == results[2]["answer"] == "Answer to What is X?"
+
+@pytest.mark.parametrize("content", [
+    json.dumps({"queries": [{"id": "q1", "query": "First"}, {"id": "q2", "query": "Second"}]}),
+    "First\n\nSecond\n",
+])
+def test_load_batch_queries(tmp_path, content):
+    """Test loading batch files in the supported formats."""
+    path = tmp_path / "queries"
+    path.write_text(content)
+    
+    queries = load_batch_queries(str(path))
+    
+    assert [item["query"] for item in queries] == ["First", "Second"]
@@ -0,0 +1,40 @@
+"""
+Tests for drafting context assembly and text truncation.
+"""
+from agents.context_builder import ContextBuilder
+from agents.utils import truncate_text
+
+SOURCES = [
+    {"title": "Qubits", "content": "Qubits improved.", "url": "https://example.com/quantum"},
+    {"title": "Bees", "content": "Bees dance.", "url": "https://example.com/bees"}
+]
+
+def test_truncate_text_cuts_at_last_sentence():
+    """Test that the last sentence boundary that fits wins, whatever its terminator."""
+    text = "First sentence. Second one! Third one? Fourth sentence runs on and on"
+
+    assert truncate_text(text, max_length=40) == "First sentence. Second one! Third one?..."
+    assert truncate_text("Exactly here. Rest", max_length=13) == "Exactly here...."
+    assert truncate_text("no boundary words here", max_length=15) == "no boundary..."
+    assert truncate_text("abcdefghij", max_length=4) == "abcd..."
+    assert truncate_text("short", max_length=10) == "short"
+
+def test_build_numbers_sources():
+    """Test the formatted research results of the drafting prompt."""
+    context = ContextBuilder().build(SOURCES)
+
+    assert context == (
+        "Source 1:\nTitle: Qubits\nContent: Qubits improved.\nURL: https://example.com/quantum\n\n"
+        "Source 2:\nTitle: Bees\nContent: Bees dance.\nURL: https://example.com/bees\n\n"
+    )
+
+def test_segments_are_reused():
+    """Test that unchanged sources are not formatted again, even at another position."""
+    builder = ContextBuilder()
+    builder.build(SOURCES)
+
+    context = builder.build(list(reversed(SOURCES)))
+
+    assert context.startswith("Source 1:\nTitle: Bees\n")
+    assert builder.cache.stats.hits == 2
+    assert builder.cache.stats.misses == 2
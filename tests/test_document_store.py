@@ -0,0 +1,164 @@
+"""
+Tests for the local document store and retrieval-first research.
+"""
+import os
+import time
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+import numpy as np
+from agents.document_store import DocumentStore, chunk_text
+from agents.embeddings import HashingEmbedder
+from agents.research_agent import ResearchAgent
+
+QUANTUM = {
+    "title": "Quantum error correction milestone",
+    "url": "https://example.com/quantum",
+    "content": "Researchers demonstrated quantum error correction below threshold with surface codes."
+}
+BEES = {
+    "title": "How honey bees communicate",
+    "url": "https://example.com/bees",
+    "content": "Honey bees share the location of food with the waggle dance."
+}
+
+def test_chunk_text_overlaps():
+    """Test that long text is split into bounded, overlapping chunks at word boundaries."""
+    text = " ".join(f"word{i}" for i in range(200))
+    chunks = chunk_text(text, chunk_chars=100, overlap_chars=20)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.split()[0].startswith("word") for chunk in chunks)
+    assert chunks[0].split()[-1] in chunks[1]
+    assert chunks[-1].endswith("word199")
+
+def test_search_ranks_pages():
+    """Test that the most similar page is returned first with its best chunk."""
+    store = DocumentStore(HashingEmbedder())
+    store.add([QUANTUM, BEES])
+
+    hits = store.search("quantum error correction", k=5, min_similarity=0.1)
+
+    assert [hit["url"] for hit in hits] == ["https://example.com/quantum"]
+    assert hits[0]["content"] == QUANTUM["content"]
+
+def test_store_persists_memory_mapped(tmp_path):
+    """Test that the index is reloaded from disk with the vectors memory-mapped."""
+    DocumentStore(HashingEmbedder(), path=str(tmp_path)).add([QUANTUM, BEES])
+
+    reloaded = DocumentStore(HashingEmbedder(), path=str(tmp_path))
+
+    assert len(reloaded) == 2
+    assert isinstance(reloaded._vectors, np.memmap)
+    assert reloaded.search("waggle dance", min_similarity=0.1)[0]["url"] == "https://example.com/bees"
+
+def test_readding_page_replaces_it(tmp_path):
+    """Test that a page fetched again replaces its old chunks, also across URL spellings."""
+    store = DocumentStore(HashingEmbedder(), path=str(tmp_path))
+    store.add([QUANTUM])
+    store.add([{**QUANTUM, "url": "https://www.example.com/quantum/", "content": "Updated quantum error correction results."}])
+
+    hits = store.search("quantum error correction", min_similarity=0.1)
+
+    assert len(store) == 1
+    assert len(hits) == 1
+    assert hits[0]["content"] == "Updated quantum error correction results."
+
+def test_store_shared_by_two_processes(tmp_path):
+    """Test that stores opened separately on one path allocate distinct rows and see each other's pages."""
+    first = DocumentStore(HashingEmbedder(), path=str(tmp_path))
+    second = DocumentStore(HashingEmbedder(), path=str(tmp_path))
+
+    first.add([QUANTUM])
+    second.add([BEES])
+    first.add([{**QUANTUM, "content": "Updated quantum error correction results."}])
+
+    assert len(first) == len(second) == 2
+    assert first.search("waggle dance", min_similarity=0.1)[0]["url"] == BEES["url"]
+    assert second.search("quantum error correction", min_similarity=0.1)[0]["content"].startswith("Updated")
+    assert DocumentStore(HashingEmbedder(), path=str(tmp_path)).search("waggle dance", min_similarity=0.1)[0]["url"] == BEES["url"]
+
+def test_replaced_rows_are_compacted(tmp_path):
+    """Test that re-adding pages does not grow the vector file without bound, also for another process."""
+    store = DocumentStore(HashingEmbedder(), path=str(tmp_path), compaction_min_rows=4)
+    other = DocumentStore(HashingEmbedder(), path=str(tmp_path))
+    store.add([BEES])
+    for i in range(20):
+        store.add([{**QUANTUM, "content": f"Quantum error correction result {i}."}])
+
+    vector_files = [name for name in os.listdir(tmp_path) if name.endswith(".f32")]
+    assert len(vector_files) == 1
+    assert os.path.getsize(tmp_path / vector_files[0]) <= 10 * 4 * store.embedder.dim
+    assert store.search("quantum error correction", min_similarity=0.1)[0]["content"] == "Quantum error correction result 19."
+    assert other.search("waggle dance", min_similarity=0.1)[0]["url"] == BEES["url"]
+    assert len(other) == 2
+
+def test_stale_pages_are_skipped():
+    """Test that pages older than the maximum age are not returned."""
+    store = DocumentStore(HashingEmbedder())
+    store.add([QUANTUM])
+    time.sleep(0.02)
+
+    assert store.search("quantum error correction", max_age_seconds=0.01) == []
+    assert len(store.search("quantum error correction", max_age_seconds=60)) == 1
+
+def test_research_agent_retrieves_before_searching():
+    """Test that covered sub-queries are answered locally and only gaps are searched and indexed."""
+    store = DocumentStore(HashingEmbedder())
+    agent = ResearchAgent(llm=MagicMock(), document_store=store)
+    agent.tool_executor = MagicMock()
+    agent.tool_executor.invoke.return_value = [QUANTUM]
+
+    with patch("agents.research_agent.get_settings") as get_settings:
+        get_settings.return_value.max_search_results_per_query = 5
+        get_settings.return_value.retrieval_min_results = 1
+        get_settings.return_value.retrieval_min_similarity = 0.1
+        get_settings.return_value.retrieval_max_age_seconds = 60
+
+        searched = agent._run_search("quantum error correction")
+        retrieved = agent._run_search("quantum error correction threshold")
+
+    assert searched == [QUANTUM]
+    assert retrieved[0]["url"] == QUANTUM["url"]
+    assert agent.tool_executor.invoke.call_count == 1
+    assert len(store) == 1
+
+def test_off_topic_pages_are_not_retrieved(monkeypatch):
+    """Test that pages only sharing the topic of a sub-query do not replace the web search."""
+    from config.settings import get_settings
+    monkeypatch.setattr(get_settings(), "retrieval_min_results", 1)
+    store = DocumentStore(HashingEmbedder())
+    store.add([
+        {"title": f"Quantum computing {topic}", "url": f"https://example.com/{i}", "content": f"Quantum computing {topic} with qubits."}
+        for i, topic in enumerate(["explained", "news", "history", "hardware"])
+    ])
+    agent = ResearchAgent(llm=MagicMock(), document_store=store)
+
+    assert agent._retrieve("quantum computing drug discovery applications", bypass_cache=False) is None
+    assert agent._retrieve("quantum computing hardware", bypass_cache=False)[0]["url"] == "https://example.com/3"
+
+def test_async_search_indexes_off_the_event_loop():
+    """Test that the async path retrieves and indexes pages in a worker thread."""
+    store = DocumentStore(HashingEmbedder())
+    agent = ResearchAgent(llm=MagicMock(), document_store=store)
+    agent.tool_executor = MagicMock()
+    agent.tool_executor.ainvoke = AsyncMock(return_value=[QUANTUM])
+    threads = []
+    for name in ("search", "add"):
+        method = getattr(store, name)
+        def record(*args, method=method, **kwargs):
+            threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+        setattr(store, name, record)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        await agent._arun_search("quantum error correction")
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+
+    assert len(store) == 1
+    assert len(threads) == 2
+    assert loop_thread not in threads
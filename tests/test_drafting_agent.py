@@ -1,11 +1,13 @@
 """
 Tests for the Drafting Agent.
 """
+import asyncio
 import pytest
 from unittest.mock import MagicMock, patch
 from agents.drafting_agent import DraftingAgent
 from models.state import AgentState
 from langchain_core.messages import AIMessage
+from langchain_core.language_models import FakeListChatModel
 
 @pytest.fixture
 def mock_llm():
@@ -179,4 +181,33 @@ def test_drafting_agent_source_attribution(mock_llm, research_state):
     else:
         # If sources are embedded in the answer
         answer_lower = result.final_answer.lower()
-        assert "source" in answer_lower or "reference" in answer_lower or "[" in answer_lower
\ No newline at end of file
+        assert "source" in answer_lower or "reference" in answer_lower or "[" in answer_lower
+
+def test_drafting_agent_aprocess(research_state):
+    """Test the async drafting path."""
+    # Setup
+    agent = DraftingAgent(llm=FakeListChatModel(responses=["Async answer citing [Source 1]."]))
+    
+    # Execute
+    result = asyncio.run(agent.aprocess(research_state))
+    
+    # Assert
+    assert result.error is None
+    assert result.final_answer == "Async answer citing [Source 1]."
+    assert result.intermediate_steps[-1]["sources_used"] == 2
+
+def test_drafting_agent_streams_tokens(research_state):
+    """Test that tokens are sent to the event listener while drafting."""
+    # Setup
+    agent = DraftingAgent(llm=FakeListChatModel(responses=["Streamed answer"]))
+    events = []
+    config = {"configurable": {"event_callback": events.append}}
+    
+    # Execute
+    result = agent.process(research_state, config)
+    
+    # Assert
+    tokens = [event["content"] for event in events if event["type"] == "token"]
+    assert result.final_answer == "Streamed answer"
+    assert "".join(tokens) == "Streamed answer"
+    assert len(tokens) > 1
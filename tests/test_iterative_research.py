@@ -0,0 +1,127 @@
+"""
+Tests for the research coverage check and multi-round research.
+"""
+import json
+import pytest
+from agents import research_agent
+from agents.coverage import assess_coverage, novel_url_ratio
+from models.state import AgentState
+
+QUERY = "How do quantum computers affect battery chemistry?"
+
+def hit(url, content):
+    """Build a search hit."""
+    return {"title": "Result", "content": content, "url": url}
+
+def generation(*queries):
+    """Build a query generation response."""
+    return json.dumps({"search_queries": list(queries), "reasoning": "Test."})
+
+@pytest.fixture
+def build_system(make_system):
+    """Fixture to build a system with fake LLMs and a search function."""
+    return lambda responses, search: make_system(responses, answer="Answer [Source 1].", search=search)
+
+@pytest.fixture
+def research_settings(monkeypatch):
+    """Fixture to override the iterative research settings for a test."""
+    from config.settings import get_settings
+    settings = get_settings()
+
+    def override(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(settings, name, value)
+
+    return override
+
+def test_assess_coverage_reports_missing_terms():
+    """Test that query terms no hit mentions are reported, ignoring stopwords and plurals."""
+    results = [{"query": "q", "results": [hit("https://a.com", "Quantum computer designs.")]}]
+
+    coverage = assess_coverage(QUERY, results)
+
+    assert coverage["missing_terms"] == ["affect", "battery", "chemistry"]
+    assert coverage["coverage"] == 0.4
+    assert assess_coverage("What is it?", [])["coverage"] == 1.0
+
+def test_query_form_words_are_not_coverage_terms():
+    """Test that words phrasing the question do not lower the coverage."""
+    results = [{"query": "q", "results": [hit("https://a.com", "How mRNA vaccines work in the body.")]}]
+
+    assert assess_coverage("Explain how mRNA vaccines work", results) == {"coverage": 1.0, "missing_terms": []}
+    assert assess_coverage("Tell me the latest on mRNA vaccines", results)["coverage"] == 1.0
+
+def test_novel_url_ratio_uses_canonical_urls():
+    """Test that URLs found by earlier rounds are not novel, also across URL spellings."""
+    results = [{"query": "q", "results": [hit("https://www.a.com/x/", ""), hit("https://b.com", "")]}]
+
+    assert novel_url_ratio(results, {"https://a.com/x"}) == 0.5
+    assert novel_url_ratio([], set()) == 0.0
+
+def test_single_round_skips_coverage_check(research_settings, build_system, monkeypatch):
+    """Test that with one round allowed, research completes without assessing coverage."""
+    research_settings(max_research_rounds=1)
+    monkeypatch.setattr(research_agent, "assess_coverage", lambda *args: pytest.fail("coverage assessed"))
+    system = build_system([generation("quantum")], lambda query: [hit("https://a.com", "Unrelated.")])
+
+    state = system.app.invoke(AgentState(query=QUERY), {"configurable": {"thread_id": "single"}})
+
+    assert state["research_round"] == 1
+    assert state["final_answer"] == "Answer [Source 1]."
+    assert "coverage_check" not in [step["action"] for step in state["intermediate_steps"]]
+
+def test_follow_up_round_targets_gaps(research_settings, build_system):
+    """Test that a second round searches for the missing terms and adds to the results."""
+    research_settings(max_research_rounds=3)
+    pages = {
+        "quantum computers": hit("https://a.com", "Quantum computers explained."),
+        "quantum battery chemistry": hit("https://b.com", "Quantum effects affect battery chemistry.")
+    }
+    system = build_system(
+        [generation("quantum computers"), generation("quantum computers", "quantum battery chemistry")],
+        lambda query: [pages[query]]
+    )
+
+    result = system.process_query(QUERY)
+
+    assert result["error"] is None
+    assert result["research_queries"] == ["quantum computers", "quantum battery chemistry"]
+    assert result["sources_count"] == 2
+    rounds = [timing["round"] for timing in result["stage_timings"] if timing["stage"] == "research"]
+    assert rounds == [1, 2]
+
+def test_stops_when_round_finds_no_novel_urls(research_settings, build_system):
+    """Test that research stops early when a round only finds pages already found."""
+    research_settings(max_research_rounds=5)
+    system = build_system([generation(f"search {i}") for i in range(5)], lambda query: [hit("https://a.com", "Unrelated.")])
+    agent = system.registry.research_agent
+
+    state = system.app.invoke(AgentState(query=QUERY), {"configurable": {"thread_id": "novelty"}})
+
+    checks = [step for step in state["intermediate_steps"] if step["action"] == "coverage_check"]
+    assert [check["stop_reason"] for check in checks] == [None, "few_novel_urls"]
+    assert agent.tool_executor.invoke.call_count == 2
+    assert state["final_answer"] == "Answer [Source 1]."
+
+def test_novelty_stop_is_reported_on_last_round(research_settings, build_system):
+    """Test that a last round finding no new pages is reported as such rather than as the round limit."""
+    research_settings(max_research_rounds=2)
+    system = build_system([generation("search 0"), generation("search 1")], lambda query: [hit("https://a.com", "Unrelated.")])
+
+    state = system.app.invoke(AgentState(query=QUERY), {"configurable": {"thread_id": "last-round"}})
+
+    checks = [step for step in state["intermediate_steps"] if step["action"] == "coverage_check"]
+    assert [check["stop_reason"] for check in checks] == [None, "few_novel_urls"]
+
+def test_budget_and_coverage_stop_after_first_round(research_settings, build_system):
+    """Test that a covered query or a spent budget ends research after one round."""
+    research_settings(max_research_rounds=2, research_token_budget=1)
+    system = build_system([generation("quantum")], lambda query: [hit("https://a.com", "Quantum.")])
+    state = system.app.invoke(AgentState(query=QUERY), {"configurable": {"thread_id": "budget"}})
+    assert state["research_round"] == 1
+    assert state["intermediate_steps"][1]["stop_reason"] == "token_budget"
+
+    system = build_system([generation("quantum")], lambda query: [hit("https://a.com", QUERY)])
+    state = system.app.invoke(AgentState(query=QUERY), {"configurable": {"thread_id": "covered"}})
+    assert state["research_round"] == 1
+    assert state["intermediate_steps"][1]["stop_reason"] == "covered"
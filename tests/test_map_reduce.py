@@ -0,0 +1,91 @@
+"""
+Tests for map-reduce drafting over large source sets.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from agents.drafting_agent import DraftingAgent, remap_citations
+from models.state import AgentState
+
+def make_state(count):
+    """Build a state with `count` distinct sources in one search group."""
+    hits = [
+        {"title": f"Page {i}", "content": f"Fact {i} about quantum computing.", "url": f"https://example.com/{i}", "score": 1 - i / 100}
+        for i in range(1, count + 1)
+    ]
+    return AgentState(query="Quantum computing?", research_results=[{"query": "quantum computing", "results": hits}])
+
+def response(content):
+    """Build an LLM response with the given content."""
+    message = MagicMock()
+    message.content = content
+    return message
+
+def summarize(inputs, config=None):
+    """Summarize a group by citing its first and last source."""
+    count = inputs["research_results"].count("Source ")
+    if "Title: Page 11\n" in inputs["research_results"]:
+        raise RuntimeError("Summary failed")
+    return response(f"First fact [Source 1]. Last fact [Sources 1, {count}].")
+
+@pytest.fixture
+def map_reduce(monkeypatch):
+    """Fixture to enable map-reduce drafting in groups of 10 for a test."""
+    from config.settings import get_settings
+    monkeypatch.setattr(get_settings(), "map_reduce_drafting_enabled", True)
+    monkeypatch.setattr(get_settings(), "map_reduce_group_size", 10)
+
+@pytest.fixture
+def agent():
+    """Fixture for a drafting agent with mocked summary and drafting chains."""
+    agent = DraftingAgent(llm=MagicMock())
+    agent.summary_chain = MagicMock()
+    agent.summary_chain.invoke.side_effect = summarize
+    agent.summary_chain.ainvoke = AsyncMock(side_effect=summarize)
+    agent.drafting_chain = MagicMock()
+    agent.drafting_chain.invoke.return_value = response("Answer [Source 21].")
+    agent.drafting_chain.ainvoke = AsyncMock(return_value=response("Answer [Source 21]."))
+    return agent
+
+def test_remap_citations():
+    """Test renumbering single and multiple citations, leaving unknown numbers alone."""
+    text = "A [Source 1]. B [Sources 1, 2]. C [Source 9]."
+
+    assert remap_citations(text, [21, 22]) == "A [Source 21]. B [Sources 21, 22]. C [Source 9]."
+
+def test_map_reduce_drafts_from_group_summaries(agent, map_reduce):
+    """Test that groups are summarized separately and citations are mapped to the full ranking."""
+    result = agent.process(make_state(25))
+
+    assert result.error is None
+    assert result.final_answer == "Answer [Source 21]."
+    assert agent.summary_chain.invoke.call_count == 3
+
+    context = agent.drafting_chain.invoke.call_args[0][0]["research_results"]
+    assert "Summary of sources 1-10:\nFirst fact [Source 1]. Last fact [Sources 1, 10]." in context
+    assert "Summary of sources 21-25:\nFirst fact [Source 21]. Last fact [Sources 21, 25]." in context
+    # The group whose summary failed is neither summarized nor listed
+    assert "sources 11-20" not in context
+    assert "Source 11:" not in context
+    assert "Source 25: Page 25 (https://example.com/25)" in context
+    assert result.intermediate_steps[-1]["sources_used"] == 15
+    assert [timing["failed"] for timing in result.stage_timings if timing["stage"] == "summarization"] == [1]
+
+def test_small_source_sets_are_drafted_directly(agent, map_reduce):
+    """Test that sources fitting in one group skip the map step."""
+    agent.process(make_state(8))
+
+    agent.summary_chain.invoke.assert_not_called()
+    assert "Source 8:\nTitle: Page 8" in agent.drafting_chain.invoke.call_args[0][0]["research_results"]
+
+def test_map_reduce_async(agent, map_reduce):
+    """Test map-reduce drafting on the async path, including all summaries failing."""
+    result = asyncio.run(agent.aprocess(make_state(25)))
+
+    assert result.error is None
+    assert agent.summary_chain.ainvoke.call_count == 3
+
+    agent.summary_chain.ainvoke = AsyncMock(side_effect=RuntimeError("Summary failed"))
+    result = asyncio.run(agent.aprocess(make_state(25)))
+
+    assert "All 3 source summaries failed" in result.error
@@ -0,0 +1,57 @@
+"""
+Tests for metrics collection.
+"""
+from agents.metrics import InMemoryMetrics, PrometheusFileSink, percentile, set_metrics, timed
+from models.state import AgentState
+
+def test_percentile_nearest_rank():
+    """Test percentile computation."""
+    values = list(range(1, 101))
+    
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+def test_in_memory_metrics_percentiles_and_counters():
+    """Test that observations are reported per series."""
+    metrics = InMemoryMetrics()
+    for value in range(1, 101):
+        metrics.observe("stage_duration_seconds", value / 100, {"stage": "search"})
+    metrics.increment("cache_requests_total", labels={"cache": "search", "result": "hit"})
+    metrics.increment("cache_requests_total", labels={"cache": "search", "result": "hit"})
+    
+    stats = metrics.percentiles("stage_duration_seconds", {"stage": "search"})
+    
+    assert stats["count"] == 100
+    assert stats["p95"] == 0.95
+    assert metrics.counter("cache_requests_total", {"cache": "search", "result": "hit"}) == 2
+    assert "stage_duration_seconds{stage=search}" in metrics.summary()["distributions"]
+
+def test_prometheus_file_sink(tmp_path):
+    """Test the Prometheus text exposition output."""
+    path = tmp_path / "metrics.prom"
+    metrics = PrometheusFileSink(str(path))
+    metrics.observe("stage_duration_seconds", 0.5, {"stage": "drafting"})
+    metrics.increment("cache_requests_total", labels={"cache": "llm", "result": "miss"})
+    
+    metrics.flush(force=True)
+    text = path.read_text()
+    
+    assert "# TYPE astramind_stage_duration_seconds summary" in text
+    assert 'astramind_stage_duration_seconds{stage="drafting",quantile="0.95"} 0.5' in text
+    assert 'astramind_stage_duration_seconds_count{stage="drafting"} 1' in text
+    assert 'astramind_cache_requests_total{cache="llm",result="miss"} 1' in text
+
+def test_timed_records_on_state_and_sink():
+    """Test that timed stages are recorded on the state and in the sink."""
+    metrics = InMemoryMetrics()
+    set_metrics(metrics)
+    state = AgentState(query="Timing test")
+    
+    with timed("drafting", state) as details:
+        details["completion_tokens"] = 42
+    
+    assert state.stage_timings[0]["stage"] == "drafting"
+    assert state.stage_timings[0]["completion_tokens"] == 42
+    assert metrics.percentiles("stage_duration_seconds", {"stage": "drafting"})["count"] == 1
@@ -0,0 +1,76 @@
+"""
+Tests for routing LLM stages between the light and strong models.
+"""
+import asyncio
+from unittest.mock import MagicMock
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from agents.model_router import is_complex_query
+from agents.research_agent import ResearchAgent, SearchQueriesOutputParser
+from config.settings import get_settings, routed_light_model, stage_model
+from models.state import AgentState
+
+QUERIES = '{"search_queries": ["quantum error correction"], "reasoning": "r"}'
+
+def make_agent(light_responses, strong_responses=(QUERIES,)):
+    """Build a research agent with fake light and strong models."""
+    light = FakeListChatModel(responses=list(light_responses))
+    strong = FakeListChatModel(responses=list(strong_responses))
+    return ResearchAgent(llm=strong, light_llm=light, search_tool=MagicMock()), light, strong
+
+def test_is_complex_query():
+    """Test the query complexity heuristic."""
+    assert not is_complex_query("What is quantum computing?")
+    assert is_complex_query("Compare TPUs and GPUs for training")
+    assert is_complex_query("What is X? And what is Y?")
+    assert is_complex_query(" ".join(["word"] * 21))
+    assert not is_complex_query(" ".join(["word"] * 21), max_words=30)
+
+def test_parser_requires_search_queries():
+    """Test that valid JSON without a list of search queries is a parse failure."""
+    parser = SearchQueriesOutputParser()
+
+    assert parser.parse(QUERIES)["search_queries"] == ["quantum error correction"]
+    with pytest.raises(OutputParserException):
+        parser.parse('{"queries": ["a"]}')
+
+def test_stage_models(monkeypatch):
+    """Test the per-stage models and which stages are routed to the light model."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "default_model", "gpt-4")
+    monkeypatch.setattr(settings, "drafting_model", "gpt-4o")
+    monkeypatch.setattr(settings, "query_generation_model", "")
+    monkeypatch.setattr(settings, "light_model", "gpt-4o-mini")
+
+    assert stage_model(settings, "drafting") == "gpt-4o"
+    assert stage_model(settings, "query_generation") == "gpt-4"
+    assert routed_light_model(settings, "query_generation") == "gpt-4o-mini"
+    assert routed_light_model(settings, "drafting") is None
+
+    monkeypatch.setattr(settings, "model_routing_enabled", False)
+    assert routed_light_model(settings, "query_generation") is None
+
+def test_simple_queries_use_light_model():
+    """Test that simple queries are planned by the light model and complex ones by the strong model."""
+    agent, _, _ = make_agent(['{"search_queries": ["light query"], "reasoning": "r"}'])
+
+    result = agent.query_generation_chain.invoke({"query": "What is quantum computing?", "num_search_queries": 1})
+    assert result["search_queries"] == ["light query"]
+
+    result = agent.query_generation_chain.invoke({"query": "Compare qubits and bits", "num_search_queries": 1})
+    assert result["search_queries"] == ["quantum error correction"]
+
+def test_parse_failure_falls_back_to_strong_model():
+    """Test that malformed light model output is retried on the strong model, also on the streamed path."""
+    agent, _, _ = make_agent(["Sure! Here are some queries.", '{"reasoning": "no queries"}'])
+    inputs = {"query": "What is quantum computing?", "num_search_queries": 1}
+
+    assert agent.query_generation_chain.invoke(inputs)["search_queries"] == ["quantum error correction"]
+    assert asyncio.run(agent.query_generation_chain.ainvoke(inputs))["search_queries"] == ["quantum error correction"]
+
+    agent, _, _ = make_agent(["Sure! Here are some queries."])
+    generated = {}
+    queries = list(agent._speculative_queries(AgentState(query="What is quantum computing?"), None, generated))
+
+    assert queries == ["What is quantum computing?", "quantum error correction"]
@@ -0,0 +1,114 @@
+"""
+Tests for the client-side rate limiter.
+"""
+import time
+import asyncio
+import threading
+import pytest
+from agents.metrics import InMemoryMetrics, get_metrics, set_metrics
+from agents.rate_limit import RateLimiter, TokenBucket, create_rate_limiter
+from agents.resilience import Upstream
+
+@pytest.fixture
+def metrics():
+    """Fixture to collect metrics in memory for the duration of a test."""
+    previous = get_metrics()
+    sink = InMemoryMetrics()
+    set_metrics(sink)
+    yield sink
+    set_metrics(previous)
+
+def test_token_bucket_refills():
+    """Test that an empty bucket reports the time until enough tokens are back."""
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    bucket.consume(2)
+
+    assert bucket.delay(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.delay(5) == pytest.approx(2.0, abs=0.05)
+
+def test_requests_are_spaced(metrics):
+    """Test that requests beyond the burst wait for the bucket to refill."""
+    limiter = RateLimiter("test", requests_per_minute=600, burst_seconds=0.1)
+
+    start = time.monotonic()
+    limiter.acquire()
+    limiter.acquire()
+    limiter.acquire()
+
+    assert time.monotonic() - start >= 0.18
+    assert metrics.percentiles("rate_limit_wait_seconds", {"upstream": "test", "priority": "interactive"})["count"] == 3
+
+def test_tokens_per_minute_limit():
+    """Test that a request waits until its LLM tokens fit the token budget."""
+    limiter = RateLimiter("test", requests_per_minute=0, tokens_per_minute=6000, burst_seconds=1)
+    limiter.acquire(tokens=100)
+
+    waited = limiter.acquire(tokens=10)
+
+    assert waited >= 0.08
+
+def test_interactive_requests_go_first():
+    """Test that a queued interactive request overtakes a queued batch request."""
+    limiter = RateLimiter("test", requests_per_minute=600, burst_seconds=0.1)
+    assert limiter.try_acquire()
+    order = []
+
+    def acquire(priority):
+        limiter.acquire(priority=priority)
+        order.append(priority)
+
+    batch = threading.Thread(target=acquire, args=("batch",))
+    interactive = threading.Thread(target=acquire, args=("interactive",))
+    batch.start()
+    time.sleep(0.02)
+    interactive.start()
+    batch.join()
+    interactive.join()
+
+    assert order == ["interactive", "batch"]
+
+def test_async_acquire():
+    """Test that async callers are queued without blocking the event loop."""
+    limiter = RateLimiter("test", requests_per_minute=600, burst_seconds=0.1)
+
+    async def run():
+        return await asyncio.gather(*(limiter.aacquire() for _ in range(3)))
+
+    waits = asyncio.run(run())
+
+    assert waits[0] < 0.05
+    assert max(waits) >= 0.18
+
+def test_cancelled_waiter_returns_its_capacity():
+    """Test that a waiter cancelled after being granted capacity gives it back."""
+    limiter = RateLimiter("test", requests_per_minute=600, burst_seconds=0.1)
+    limiter.acquire()
+
+    async def run():
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0)
+        # Block the loop while the timer grants the waiter, then cancel it before it resumes
+        time.sleep(0.15)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+
+    assert limiter.try_acquire()
+
+def test_upstream_calls_pass_the_limiter():
+    """Test that every upstream attempt acquires from the rate limiter."""
+    limiter = RateLimiter("test", requests_per_minute=600, burst_seconds=0.1)
+    upstream = Upstream("test", rate_limiter=limiter)
+
+    start = time.monotonic()
+    for _ in range(3):
+        upstream.call(lambda: "ok")
+
+    assert time.monotonic() - start >= 0.18
+
+def test_unlimited_configuration():
+    """Test that no limiter is created without limits."""
+    assert create_rate_limiter("search", 0) is None
+    assert create_rate_limiter("search", 100) is not None
@@ -0,0 +1,53 @@
+"""
+Tests for the Agent Registry.
+"""
+import threading
+from unittest.mock import MagicMock
+from agents.registry import AgentRegistry
+from agents.research_agent import ResearchAgent
+from agents.drafting_agent import DraftingAgent
+from agents.cache import MemoryCache
+from agents.document_store import DocumentStore
+from agents.embeddings import HashingEmbedder
+
+def test_registry_reuses_agents():
+    """Test that the registry builds each agent once and then reuses it."""
+    search_cache = MemoryCache()
+    registry = AgentRegistry(
+        research_llm=MagicMock(),
+        drafting_llm=MagicMock(),
+        search_cache=search_cache,
+        llm_cache=MemoryCache(),
+        document_store=DocumentStore(HashingEmbedder())
+    )
+    
+    research_agent = registry.research_agent
+    drafting_agent = registry.drafting_agent
+    
+    assert isinstance(research_agent, ResearchAgent)
+    assert isinstance(drafting_agent, DraftingAgent)
+    assert registry.research_agent is research_agent
+    assert registry.drafting_agent is drafting_agent
+    assert research_agent.search_cache is search_cache
+
+def test_registry_thread_safe_creation():
+    """Test that concurrent first access still creates a single agent."""
+    registry = AgentRegistry(
+        research_llm=MagicMock(),
+        search_cache=MemoryCache(),
+        llm_cache=MemoryCache(),
+        document_store=DocumentStore(HashingEmbedder())
+    )
+    agents = []
+    
+    def get_agent():
+        agents.append(registry.research_agent)
+    
+    threads = [threading.Thread(target=get_agent) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(agents) == 8
+    assert all(agent is agents[0] for agent in agents)
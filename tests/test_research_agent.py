@@ -1,8 +1,10 @@
 """
 Tests for the Research Agent.
 """
+import time
+import asyncio
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from agents.research_agent import ResearchAgent
 from models.state import AgentState
 
@@ -95,4 +97,169 @@ def test_research_agent_process_error(mock_llm):
     # Assert
     assert result.error is not None
     assert "Test error" in result.error
-    assert len(result.research_results) == 0
\ No newline at end of file
+    assert len(result.research_results) == 0
+
+def test_research_agent_concurrent_search_order(mock_llm):
+    """Test that concurrent searches keep the order of the generated queries."""
+    # Setup
+    queries = [f"query {i}" for i in range(6)]
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {"search_queries": queries, "reasoning": "Ordering test."}
+    
+    def slow_first(tool_invocation):
+        query = tool_invocation["tool_input"]["query"]
+        if query == "query 0":
+            time.sleep(0.05)
+        return [{"title": query, "content": "Content", "url": f"https://example.com/{query}"}]
+    
+    agent = ResearchAgent(llm=mock_llm)
+    agent.query_generation_chain = mock_chain
+    agent.tool_executor = MagicMock()
+    agent.tool_executor.invoke.side_effect = slow_first
+    
+    # Execute
+    result = agent.process(AgentState(query="Ordering test"))
+    
+    # Assert
+    assert result.error is None
+    assert [group["query"] for group in result.research_results] == queries
+    assert agent.tool_executor.invoke.call_count == len(queries)
+
+def test_research_agent_isolates_search_failures(mock_llm, mock_tool_executor):
+    """Test that one failed search does not discard the other results."""
+    # Setup
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {
+        "search_queries": ["good query", "bad query"],
+        "reasoning": "Failure isolation test."
+    }
+    hits = mock_tool_executor.invoke.return_value
+    
+    def fail_bad_query(tool_invocation):
+        if tool_invocation["tool_input"]["query"] == "bad query":
+            raise Exception("Search timeout")
+        return hits
+    
+    agent = ResearchAgent(llm=mock_llm)
+    agent.query_generation_chain = mock_chain
+    agent.tool_executor = mock_tool_executor
+    mock_tool_executor.invoke.side_effect = fail_bad_query
+    
+    # Execute
+    result = agent.process(AgentState(query="Failure isolation test"))
+    
+    # Assert
+    assert result.error is None
+    assert result.research_results[0]["results"] == hits
+    assert result.research_results[1]["results"] == []
+    assert "Search timeout" in result.research_results[1]["error"]
+
+def test_research_agent_all_searches_failed(mock_llm, mock_tool_executor):
+    """Test that the agent reports an error when every search fails."""
+    # Setup
+    agent = ResearchAgent(llm=mock_llm)
+    agent.query_generation_chain = MagicMock()
+    agent.query_generation_chain.invoke.return_value = {"search_queries": ["q1", "q2"], "reasoning": ""}
+    agent.tool_executor = mock_tool_executor
+    mock_tool_executor.invoke.side_effect = Exception("Service unavailable")
+    
+    # Execute
+    result = agent.process(AgentState(query="Failure test"))
+    
+    # Assert
+    assert result.error is not None
+    assert "Service unavailable" in result.error
+    assert len(result.research_results) == 0
+
+def test_research_agent_aprocess(mock_llm, mock_tool_executor):
+    """Test the async processing path with failure isolation."""
+    # Setup
+    mock_chain = MagicMock()
+    mock_chain.ainvoke = AsyncMock(return_value={
+        "search_queries": ["good query", "bad query"],
+        "reasoning": "Async test."
+    })
+    hits = mock_tool_executor.invoke.return_value
+    
+    async def search(tool_invocation):
+        if tool_invocation["tool_input"]["query"] == "bad query":
+            raise Exception("Search timeout")
+        return hits
+    
+    agent = ResearchAgent(llm=mock_llm)
+    agent.query_generation_chain = mock_chain
+    agent.tool_executor = mock_tool_executor
+    mock_tool_executor.ainvoke = AsyncMock(side_effect=search)
+    
+    # Execute
+    result = asyncio.run(agent.aprocess(AgentState(query="Async test")))
+    
+    # Assert
+    assert result.error is None
+    assert [group["query"] for group in result.research_results] == ["good query", "bad query"]
+    assert result.research_results[0]["results"] == hits
+    assert "Search timeout" in result.research_results[1]["error"]
+    mock_tool_executor.invoke.assert_not_called()
+
+@pytest.fixture
+def speculative_search(monkeypatch):
+    """Fixture to enable speculative search for the duration of a test."""
+    from config.settings import get_settings
+    monkeypatch.setattr(get_settings(), "speculative_search_enabled", True)
+
+def test_speculative_search_overlaps_generation(mock_llm, speculative_search):
+    """Test that the raw query and each parsed query are searched before generation finishes."""
+    searched = []
+    searched_before_end = []
+    
+    def stream(inputs, config=None):
+        yield {"search_queries": ["first query", "sec"]}
+        time.sleep(0.1)
+        searched_before_end.extend(searched)
+        yield {"search_queries": ["first query", "second query"], "reasoning": "Done."}
+    
+    def search(tool_invocation):
+        query = tool_invocation["tool_input"]["query"]
+        searched.append(query)
+        return [{"title": query, "content": "Content", "url": f"https://example.com/{query}"}]
+    
+    agent = ResearchAgent(llm=mock_llm)
+    agent.query_generation_chain = MagicMock()
+    agent.query_generation_chain.stream.side_effect = stream
+    agent.tool_executor = MagicMock()
+    agent.tool_executor.invoke.side_effect = search
+    
+    # Execute
+    result = agent.process(AgentState(query="Speculative test"))
+    
+    # Assert
+    assert result.error is None
+    assert [group["query"] for group in result.research_results] == ["Speculative test", "first query", "second query"]
+    assert sorted(searched_before_end) == ["Speculative test", "first query"]
+    agent.query_generation_chain.invoke.assert_not_called()
+
+def test_speculative_search_async(mock_llm, mock_tool_executor, speculative_search):
+    """Test speculative search on the async path, including a failed generation."""
+    async def astream(inputs, config=None):
+        yield {"search_queries": ["first query"]}
+        yield {"search_queries": ["first query", "second query"], "reasoning": "Done."}
+    
+    agent = ResearchAgent(llm=mock_llm)
+    agent.query_generation_chain = MagicMock()
+    agent.query_generation_chain.astream.side_effect = astream
+    agent.tool_executor = mock_tool_executor
+    mock_tool_executor.ainvoke = AsyncMock(return_value=mock_tool_executor.invoke.return_value)
+    
+    # Execute
+    result = asyncio.run(agent.aprocess(AgentState(query="Speculative test")))
+    
+    # Assert
+    assert result.error is None
+    assert [group["query"] for group in result.research_results] == ["Speculative test", "first query", "second query"]
+    
+    async def no_queries(inputs, config=None):
+        yield {"reasoning": "No search needed."}
+    
+    agent.query_generation_chain.astream.side_effect = no_queries
+    failed = asyncio.run(agent.aprocess(AgentState(query="Speculative test")))
+    assert "no search queries" in failed.error
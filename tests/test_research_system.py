@@ -0,0 +1,44 @@
+"""
+Tests for the ResearchSystem interface.
+"""
+import json
+import asyncio
+import pytest
+
+@pytest.fixture
+def system(make_system):
+    """Fixture to create a ResearchSystem with fake LLMs and search."""
+    query_generation = json.dumps({
+        "search_queries": ["quantum computing breakthroughs", "quantum error correction"],
+        "reasoning": "Cover recent results."
+    })
+    hits = [{"title": "Breakthrough", "content": "Qubits improved.", "url": "https://example.com/quantum"}]
+    return make_system([query_generation], answer="Quantum computers improved [Source 1].", hits=hits)
+
+def test_process_query(system):
+    """Test the blocking query path end to end."""
+    result = system.process_query("What are the latest advancements in quantum computing?")
+    
+    assert result["error"] is None
+    assert result["answer"] == "Quantum computers improved [Source 1]."
+    assert result["research_queries"] == ["quantum computing breakthroughs", "quantum error correction"]
+    assert result["sources_count"] == 2
+
+def test_aprocess_query(system):
+    """Test the async query path end to end."""
+    result = asyncio.run(system.aprocess_query("What are the latest advancements in quantum computing?"))
+    
+    assert result["error"] is None
+    assert result["answer"] == "Quantum computers improved [Source 1]."
+
+def test_stream_query_events(system):
+    """Test that streaming yields search progress, tokens and the final result."""
+    events = list(system.stream_query("What are the latest advancements in quantum computing?"))
+    types = [event["type"] for event in events]
+    
+    assert types[0] == "queries_generated"
+    assert types.count("search_completed") == 2
+    assert types.index("search_completed") < types.index("token")
+    assert types[-1] == "result"
+    tokens = "".join(event["content"] for event in events if event["type"] == "token")
+    assert tokens == events[-1]["answer"]
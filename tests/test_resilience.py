@@ -0,0 +1,184 @@
+"""
+Tests for timeouts, retries, circuit breaking and hedging of upstream calls.
+"""
+import time
+import asyncio
+import threading
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from agents.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientChatModel,
+    Upstream,
+    UpstreamTimeoutError,
+)
+
+class FlakyCall:
+    """Callable failing a given number of times before succeeding."""
+    def __init__(self, failures, error=None):
+        self.failures = failures
+        self.error = error or ConnectionError("upstream unavailable")
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+class ClientError(Exception):
+    """Exception carrying an HTTP status like the OpenAI client errors."""
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def test_retries_until_success():
+    """Test that transient failures are retried."""
+    upstream = Upstream("test", max_attempts=3, base_delay=0)
+    call = FlakyCall(failures=2)
+
+    assert upstream.call(call) == "ok"
+    assert call.calls == 3
+
+def test_gives_up_after_max_attempts():
+    """Test that the last error is raised once all attempts failed."""
+    upstream = Upstream("test", max_attempts=2, base_delay=0)
+    call = FlakyCall(failures=5)
+
+    with pytest.raises(ConnectionError):
+        upstream.call(call)
+    assert call.calls == 2
+
+def test_client_errors_are_not_retried():
+    """Test that client errors fail immediately but rate limits are retried."""
+    upstream = Upstream("test", max_attempts=3, base_delay=0)
+    bad_request = FlakyCall(failures=1, error=ClientError(400))
+    rate_limited = FlakyCall(failures=1, error=ClientError(429))
+
+    with pytest.raises(ClientError):
+        upstream.call(bad_request)
+    assert bad_request.calls == 1
+    assert upstream.call(rate_limited) == "ok"
+
+def test_circuit_opens_and_recovers():
+    """Test that the circuit opens after repeated failures and closes after a successful probe."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    upstream = Upstream("test", max_attempts=1, breaker=breaker)
+    call = FlakyCall(failures=2)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            upstream.call(call)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        upstream.call(call)
+    assert call.calls == 2
+
+    time.sleep(0.06)
+    assert upstream.call(call) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_admits_single_probe():
+    """Test that only one probe call is let through while half-open."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_cancelled_probe_is_released():
+    """Test that a cancelled or abandoned half-open probe lets the next call probe."""
+    upstream = Upstream("test", breaker=CircuitBreaker("test", failure_threshold=1, reset_timeout=0))
+    upstream.breaker.record_failure()
+
+    async def cancel_probe():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(upstream.acall(hang))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+
+    stream = upstream.stream(lambda: iter(["a", "b"]))
+    assert next(stream) == "a"
+    stream.close()
+
+    assert upstream.call(lambda: "ok") == "ok"
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+def test_timeout():
+    """Test that a stuck call times out."""
+    upstream = Upstream("test", timeout=0.05, max_attempts=1)
+
+    start = time.perf_counter()
+    with pytest.raises(UpstreamTimeoutError):
+        upstream.call(lambda: time.sleep(1))
+    assert time.perf_counter() - start < 0.5
+
+def test_async_timeout_and_retry():
+    """Test timeouts and retries on the async path."""
+    upstream = Upstream("test", timeout=0.05, max_attempts=2, base_delay=0)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return "ok"
+
+    assert asyncio.run(upstream.acall(call)) == "ok"
+    assert len(calls) == 2
+
+def test_hedged_request_wins():
+    """Test that a duplicate call is sent after the latency quantile and the fastest answer wins."""
+    upstream = Upstream("test", timeout=2, max_attempts=1, hedge=True, hedge_min_samples=3)
+    for _ in range(3):
+        upstream.call(lambda: time.sleep(0.01))
+
+    calls = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(1 if first else 0)
+        return "slow" if first else "fast"
+
+    start = time.perf_counter()
+    assert upstream.call(call) == "fast"
+    assert time.perf_counter() - start < 0.5
+    assert len(calls) == 2
+
+def test_stream_retries_before_first_chunk():
+    """Test that a stream failing before its first chunk is retried."""
+    upstream = Upstream("test", max_attempts=2, base_delay=0)
+    attempts = []
+
+    def start_stream():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("reset")
+        return iter(["a", "b"])
+
+    assert list(upstream.stream(start_stream)) == ["a", "b"]
+    assert len(attempts) == 2
+
+def test_resilient_chat_model():
+    """Test that the chat model wrapper calls through and exposes the model's attributes."""
+    llm = FakeListChatModel(responses=["answer"])
+    model = ResilientChatModel(llm, Upstream("llm", timeout=1))
+
+    assert model.invoke("question").content == "answer"
+    assert model.responses == ["answer"]
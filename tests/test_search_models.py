@@ -0,0 +1,53 @@
+"""
+Tests for the compact search hit and search group models.
+"""
+import json
+import pytest
+from agents.checkpoint import StateSerializer
+from models.search import SearchGroup, SearchHit, results_to_dicts
+from models.state import AgentState
+
+HIT = {"title": "Qubits", "content": "Qubits improved.", "url": "https://example.com/quantum", "score": 0.9}
+
+def test_hit_behaves_like_dict():
+    """Test dictionary-style access, equality with the raw hit and extra keys."""
+    hit = SearchHit.from_dict({**HIT, "fetched_at": 1.0})
+
+    assert hit["url"] == HIT["url"]
+    assert hit.get("raw_content") is None
+    assert {**hit} == {**HIT, "fetched_at": 1.0}
+    assert SearchHit.from_dict(HIT) == HIT
+    assert "score" not in SearchHit(title="T", url="https://example.com", content="C")
+    with pytest.raises(KeyError):
+        hit["missing"]
+
+def test_hits_share_urls_and_content():
+    """Test that URLs are interned and content is referenced, not copied."""
+    content = "".join(["Qubits ", "improved."])
+    first = SearchHit.from_dict({**HIT, "url": "".join(["https://example.com/", "quantum"]), "content": content})
+    second = SearchHit.from_dict({**HIT, "url": "".join(["https://example.com/", "quantum"])})
+
+    assert first.url is second.url
+    assert first.content is content
+    assert not hasattr(first, "__dict__")
+
+def test_state_converts_groups():
+    """Test that dictionaries assigned at construction become search groups that compare equal to them."""
+    groups = [{"query": "q", "results": [HIT]}, {"query": "failed", "results": [], "error": "Timeout"}]
+
+    state = AgentState(query="q", research_results=groups)
+
+    assert all(isinstance(group, SearchGroup) for group in state.research_results)
+    assert state.research_results == groups
+    assert "error" not in state.research_results[0]
+    assert results_to_dicts(state.research_results) == groups
+    assert SearchGroup.from_dict(state.research_results[0]) is state.research_results[0]
+
+def test_checkpoint_serializer_stores_plain_json():
+    """Test that checkpoints store groups as plain JSON objects."""
+    group = SearchGroup("q", [HIT])
+
+    data = StateSerializer().dumps({"research_results": [group]})
+
+    assert json.loads(data) == {"research_results": [{"query": "q", "results": [HIT]}]}
+    assert StateSerializer().loads(data)["research_results"] == [group]
@@ -0,0 +1,171 @@
+"""
+Tests for the embedders and the semantic answer cache.
+"""
+import time
+import asyncio
+import threading
+import numpy as np
+from agents.cache import MemoryCache
+from agents.embeddings import Embedder, HashingEmbedder
+from agents.metrics import InMemoryMetrics, get_metrics, set_metrics
+from agents.registry import AgentRegistry
+from agents.semantic_cache import SemanticCache
+from config.settings import get_settings, semantic_cache_active
+
+class FailingEmbedder(Embedder):
+    """Embedder whose endpoint is unavailable."""
+    dim = 8
+    name = "failing"
+
+    def embed(self, texts):
+        raise TimeoutError("embeddings endpoint timed out")
+
+RESULTS = [{"query": "quantum computing", "results": [{"title": "T", "content": "C", "url": "https://example.com"}]}]
+
+def test_hashing_embedder_is_normalized():
+    """Test that embeddings are unit length and ignore stopwords and plurals."""
+    embedder = HashingEmbedder(dim=256)
+    vectors = embedder.embed([
+        "What are the latest advancements in quantum computing?",
+        "the latest advancement in quantum computing",
+        "How do honey bees communicate?"
+    ])
+
+    assert vectors.shape == (3, 256)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert vectors[0] @ vectors[1] > 0.99
+    assert vectors[0] @ vectors[2] < 0.2
+
+def test_lookup_matches_paraphrase():
+    """Test that a reworded query is answered from the cache and an unrelated one is not."""
+    cache = SemanticCache(HashingEmbedder(), MemoryCache())
+    cache.store_answer("What are the latest advancements in quantum computing?", RESULTS, "Qubits improved.")
+
+    hit = cache.lookup("Latest advancement in quantum computing")
+
+    assert hit["final_answer"] == "Qubits improved."
+    assert hit["research_results"] == RESULTS
+    assert hit["matched_query"] == "What are the latest advancements in quantum computing?"
+    assert cache.lookup("How do honey bees communicate?") is None
+
+def test_queries_about_other_entities_do_not_share_answers():
+    """Test that near-identical queries naming another entity or number are not answered from the cache."""
+    cache = SemanticCache(HashingEmbedder(), MemoryCache(), threshold=0.7)
+    ibuprofen = "Is it safe to take Ibuprofen every day for chronic back pain in adults with high blood pressure?"
+    cache.store_answer(ibuprofen, RESULTS, "Ibuprofen answer.")
+    cache.store_answer("Population of France in 2010 by region", RESULTS, "2010 answer.")
+
+    assert cache.lookup(ibuprofen.replace("Ibuprofen", "Acetaminophen")) is None
+    assert cache.lookup("Population of France in 2020 by region") is None
+    assert cache.lookup(ibuprofen.replace("Is it safe", "Is it ok"))["final_answer"] == "Ibuprofen answer."
+
+def test_cache_is_off_with_lexical_embedder(monkeypatch):
+    """Test that the cache is only enabled by default with a semantic embedder."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "semantic_cache_enabled", None)
+    monkeypatch.setattr(settings, "embedder", "hashing")
+
+    assert not semantic_cache_active(settings)
+    assert AgentRegistry().semantic_cache is None
+
+    monkeypatch.setattr(settings, "embedder", "openai")
+    assert semantic_cache_active(settings)
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    assert not semantic_cache_active(settings)
+
+def test_index_persists(tmp_path):
+    """Test that the embedding index is reloaded from disk."""
+    index_path = str(tmp_path / "index.npz")
+    store = MemoryCache()
+    SemanticCache(HashingEmbedder(), store, index_path=index_path).store_answer("quantum computing", RESULTS, "Answer.")
+
+    reloaded = SemanticCache(HashingEmbedder(), store, index_path=index_path)
+
+    assert len(reloaded) == 1
+    assert reloaded.lookup("Quantum computing?")["final_answer"] == "Answer."
+
+def test_index_from_other_embedder_is_ignored(tmp_path):
+    """Test that vectors from another embedding space are not reused."""
+    index_path = str(tmp_path / "index.npz")
+    SemanticCache(HashingEmbedder(dim=64), MemoryCache(), index_path=index_path).store_answer("quantum", RESULTS, "Answer.")
+
+    assert len(SemanticCache(HashingEmbedder(dim=128), MemoryCache(), index_path=index_path)) == 0
+
+def test_max_entries_evicts_least_recently_used():
+    """Test that the index is bounded and evicts the least recently used entry."""
+    cache = SemanticCache(HashingEmbedder(), MemoryCache(), max_entries=2)
+    cache.store_answer("quantum computing", RESULTS, "Quantum.")
+    cache.store_answer("honey bee communication", RESULTS, "Bees.")
+    time.sleep(0.01)
+    cache.lookup("quantum computing")
+    cache.store_answer("battery chemistry", RESULTS, "Batteries.")
+
+    assert len(cache) == 2
+    assert cache.lookup("honey bee communication") is None
+    assert cache.lookup("quantum computing") is not None
+
+def test_expired_answer_is_dropped():
+    """Test that an index entry whose answer expired is removed."""
+    cache = SemanticCache(HashingEmbedder(), MemoryCache(ttl_seconds=0.01))
+    cache.store_answer("quantum computing", RESULTS, "Answer.")
+    time.sleep(0.02)
+
+    assert cache.lookup("quantum computing") is None
+    assert len(cache) == 0
+
+def test_research_system_skips_workflow_on_hit(make_system):
+    """Test that a paraphrased query is answered without searching or calling the LLMs again."""
+    system = make_system(semantic_cache=SemanticCache(HashingEmbedder(), MemoryCache()), hits=RESULTS[0]["results"])
+    tool_executor = system.registry.research_agent.tool_executor
+
+    first = system.process_query("What are the latest advancements in quantum computing?")
+    second = system.process_query("Latest advancements in quantum computing")
+    bypassed = system.process_query("Latest advancements in quantum computing", bypass_cache=True)
+
+    assert second["answer"] == first["answer"]
+    assert second["sources_count"] == first["sources_count"]
+    assert second["stage_timings"][0]["stage"] == "semantic_cache"
+    assert second["stage_timings"][0]["hit"] is True
+    assert tool_executor.invoke.call_count == 2
+    assert bypassed["error"] is None
+
+def test_failed_lookup_runs_workflow(make_system):
+    """Test that a query is answered by the workflow when the embedder raises."""
+    system = make_system(semantic_cache=SemanticCache(FailingEmbedder(), MemoryCache()), hits=RESULTS[0]["results"])
+    previous = get_metrics()
+    metrics = InMemoryMetrics()
+    set_metrics(metrics)
+
+    try:
+        result = system.process_query("What are the latest advancements in quantum computing?")
+    finally:
+        set_metrics(previous)
+
+    assert result["error"] is None
+    assert result["answer"] == "Qubits improved [Source 1]."
+    assert metrics.counter("cache_requests_total", {"cache": "semantic", "result": "error"}) == 1
+
+def test_async_query_uses_cache_off_the_event_loop(make_system):
+    """Test that the async path looks up and stores answers in a worker thread."""
+    cache = SemanticCache(HashingEmbedder(), MemoryCache())
+    system = make_system(semantic_cache=cache, hits=RESULTS[0]["results"])
+    threads = []
+    for name in ("lookup", "store_answer"):
+        method = getattr(cache, name)
+        def record(*args, method=method, **kwargs):
+            threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+        setattr(cache, name, record)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        first = await system.aprocess_query("What are the latest advancements in quantum computing?")
+        second = await system.aprocess_query("Latest advancements in quantum computing")
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(run())
+
+    assert second["answer"] == first["answer"]
+    assert second["stage_timings"][0]["hit"] is True
+    assert len(threads) == 3
+    assert loop_thread not in threads
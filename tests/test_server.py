@@ -0,0 +1,118 @@
+"""
+Tests for the HTTP server and request coalescing.
+"""
+import json
+import time
+import http.client
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import pytest
+from benchmarks.fakes import FakeChatModel, FakeSearchTool
+from server import EventBroadcast, ResearchService, create_server
+
+@pytest.fixture
+def slow_system():
+    """Fixture for a mock system whose queries take a while."""
+    system = MagicMock()
+
+    def process_query(query, bypass_cache=False):
+        time.sleep(0.2)
+        return {"query": query, "answer": "Shared answer.", "error": None}
+
+    system.process_query.side_effect = process_query
+    return system
+
+@pytest.fixture
+def server(make_system):
+    """Fixture for a running server backed by fake LLMs and search."""
+    system = make_system(
+        research_llm=FakeChatModel(),
+        drafting_llm=FakeChatModel(answer_words=10),
+        search_tool=FakeSearchTool(content_chars=200)
+    )
+    server = create_server("127.0.0.1", 0, ResearchService(system))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+def post(url, body):
+    """POST a JSON body and return the response body."""
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.read().decode("utf-8")
+
+def test_identical_queries_are_coalesced(slow_system):
+    """Test that concurrent identical queries run the pipeline once."""
+    service = ResearchService(system=slow_system)
+    queries = ["What is fusion power?", "what is fusion power", "What is fusion power?"]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(service.research, queries))
+
+    assert slow_system.process_query.call_count == 1
+    assert [result["query"] for result in results] == queries
+    assert all(result["answer"] == "Shared answer." for result in results)
+
+def test_distinct_queries_are_not_coalesced(slow_system):
+    """Test that different queries each run the pipeline."""
+    service = ResearchService(system=slow_system)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(service.research, ["What is fusion power?", "What is fission power?"]))
+
+    assert slow_system.process_query.call_count == 2
+
+def test_broadcast_replays_events_to_late_subscribers():
+    """Test that a subscriber joining late still receives every event."""
+    broadcast = EventBroadcast()
+    broadcast.publish({"type": "queries_generated"})
+    late = broadcast.subscribe()
+    assert next(late) == {"type": "queries_generated"}
+
+    broadcast.publish({"type": "result"})
+    broadcast.close()
+
+    assert list(late) == [{"type": "result"}]
+    assert [event["type"] for event in broadcast.subscribe()] == ["queries_generated", "result"]
+
+def test_research_endpoint(server):
+    """Test the blocking JSON endpoint end to end."""
+    result = json.loads(post(server + "/research", {"query": "What is fusion power?"}))
+
+    assert result["query"] == "What is fusion power?"
+    assert result["error"] is None
+    assert result["answer"]
+
+def test_stream_endpoint(server):
+    """Test that the streaming endpoint sends progress events and the result."""
+    body = post(server + "/research/stream", {"query": "What is fusion power?"})
+    types = [line[len("event: "):] for line in body.splitlines() if line.startswith("event: ")]
+
+    assert types[0] == "queries_generated"
+    assert "token" in types
+    assert types[-1] == "result"
+
+def test_invalid_request(server):
+    """Test that a request without a query is rejected."""
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        post(server + "/research", {"question": "What is fusion power?"})
+    assert excinfo.value.code == 400
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_invalid_content_length(server, length):
+    """Test that a malformed Content-Length header is rejected."""
+    connection = http.client.HTTPConnection(server[len("http://"):], timeout=10)
+    connection.putrequest("POST", "/research")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    response = connection.getresponse()
+    connection.close()
+
+    assert response.status == 400
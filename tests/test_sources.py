@@ -0,0 +1,73 @@
+"""
+Tests for source consolidation.
+"""
+from agents.sources import consolidate_sources
+from agents.utils import canonicalize_url, extract_urls_from_results
+
+def test_canonicalize_url():
+    """Test that equivalent URLs share a canonical form."""
+    canonical = canonicalize_url("https://example.com/article")
+    
+    assert canonicalize_url("http://www.Example.com/article/") == canonical
+    assert canonicalize_url("https://example.com/article?utm_source=feed#section") == canonical
+    assert canonicalize_url("https://example.com/article?b=2&a=1") == canonicalize_url("https://example.com/article?a=1&b=2")
+    assert canonicalize_url("https://example.com/other") != canonical
+
+def test_canonicalize_url_with_invalid_port():
+    """Test that a URL with an invalid port is kept as is instead of aborting deduplication."""
+    assert canonicalize_url("https://example.com:99999/a") == "https://example.com:99999/a"
+    assert canonicalize_url(" https://example.com:abc/ ") == "https://example.com:abc/"
+    assert canonicalize_url("https://example.com:8080/a/") == "https://example.com:8080/a"
+    
+    sources = consolidate_sources([{"query": "q", "results": [
+        {"title": "Bad port", "content": "Content.", "url": "https://example.com:99999/a"},
+        {"title": "Article", "content": "Content.", "url": "https://example.com/a"}
+    ]}])
+    
+    assert len(sources) == 2
+
+def test_consolidate_sources_merges_duplicates():
+    """Test that duplicate URLs are merged across sub-queries."""
+    research_results = [
+        {"query": "q1", "results": [
+            {"title": "Article", "content": "First part.", "url": "https://example.com/a", "score": 0.5},
+            {"title": "Other", "content": "Other content.", "url": "https://example.com/b", "score": 0.6}
+        ]},
+        {"query": "q2", "results": [
+            {"title": "Article", "content": "Second part.", "url": "https://www.example.com/a/", "score": 0.7}
+        ]}
+    ]
+    
+    sources = consolidate_sources(research_results)
+    
+    assert len(sources) == 2
+    merged = sources[0]
+    assert merged["url"] == "https://example.com/a"
+    assert merged["score"] == 0.7
+    assert merged["queries"] == ["q1", "q2"]
+    assert "First part." in merged["content"] and "Second part." in merged["content"]
+
+def test_consolidate_sources_ranking():
+    """Test ranking by score with a bonus for cross-query frequency."""
+    research_results = [
+        {"query": "q1", "results": [
+            {"title": "Low", "content": "Low", "url": "https://example.com/low", "score": 0.2},
+            {"title": "Frequent", "content": "Frequent", "url": "https://example.com/frequent", "score": 0.55}
+        ]},
+        {"query": "q2", "results": [
+            {"title": "High", "content": "High", "url": "https://example.com/high", "score": 0.6},
+            {"title": "Frequent", "content": "Frequent", "url": "https://example.com/frequent", "score": 0.5}
+        ]}
+    ]
+    
+    sources = consolidate_sources(research_results, frequency_weight=0.1)
+    
+    assert [source["title"] for source in sources] == ["Frequent", "High", "Low"]
+
+def test_extract_urls_dedupes_canonical_urls():
+    """Test that URL extraction keeps one spelling per page."""
+    research_results = [
+        {"query": "q1", "results": [{"url": "https://example.com/a"}, {"url": "http://www.example.com/a/"}]}
+    ]
+    
+    assert extract_urls_from_results(research_results) == ["https://example.com/a"]
@@ -0,0 +1,53 @@
+"""
+Tests for lazy imports and the light CLI commands.
+"""
+import os
+import sys
+import json
+import subprocess
+from config.settings import Settings, validate_settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_python(code):
+    """Run Python code in a fresh interpreter from the project root and return its stdout."""
+    env = {**os.environ, "OPENAI_API_KEY": "test", "TAVILY_API_KEY": "test"}
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return completed.stdout
+
+def test_main_import_skips_heavy_modules():
+    """Test that importing main does not load LangGraph or the LLM clients."""
+    loaded = json.loads(run_python(
+        "import sys, json, main; "
+        "print(json.dumps([m for m in ('langgraph', 'langchain_openai', 'langchain_community', 'agents.research_agent') "
+        "if m in sys.modules]))"
+    ))
+
+    assert loaded == []
+
+def test_agent_modules_import_without_cycle():
+    """Test that agent modules can be imported first, before the config package."""
+    assert run_python("import agents.research_agent, agents.registry; print('ok')").strip() == "ok"
+
+def test_lazy_package_exports():
+    """Test that the package-level exports still resolve."""
+    from agents import AgentRegistry, ResearchAgent
+    from config import create_workflow
+
+    assert AgentRegistry.__name__ == "AgentRegistry"
+    assert ResearchAgent.__name__ == "ResearchAgent"
+    assert callable(create_workflow)
+
+def test_validate_settings():
+    """Test that invalid settings are reported."""
+    valid = Settings(openai_api_key="key", tavily_api_key="key")
+    invalid = Settings(openai_api_key="", tavily_api_key="key", metrics_sink="statsd", num_search_queries=0)
+
+    assert validate_settings(valid) == []
+    assert validate_settings(invalid) == [
+        "OPENAI_API_KEY is not set",
+        "Unknown metrics sink 'statsd'",
+        "num_search_queries must be at least 1"
+    ]
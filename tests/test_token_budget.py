@@ -0,0 +1,83 @@
+"""
+Tests for token counting and context packing.
+"""
+import time
+from agents import token_budget
+from agents.token_budget import count_tokens, get_encoding, pack_sources, truncate_to_tokens
+
+def make_sources(count, words=400):
+    """Create ranked sources with long content."""
+    return [
+        {
+            "title": f"Source title {i}",
+            "content": " ".join(f"Sentence {j} about quantum computing." for j in range(words // 5)),
+            "url": f"https://example.com/{i}"
+        }
+        for i in range(count)
+    ]
+
+def test_count_tokens():
+    """Test that token counts are positive and grow with the text."""
+    assert count_tokens("quantum computing") > 0
+    assert count_tokens("quantum computing " * 10) > count_tokens("quantum computing")
+
+def test_truncate_to_tokens():
+    """Test truncation to a token limit at a sentence boundary."""
+    text = " ".join(f"Sentence {i} about quantum computing." for i in range(100))
+    
+    truncated = truncate_to_tokens(text, 50)
+    
+    assert count_tokens(truncated) <= 50
+    assert truncated.endswith(".") or truncated.endswith("...")
+    assert truncate_to_tokens("short text", 50) == "short text"
+
+def test_pack_sources_respects_budget():
+    """Test that packed sources stay within the budget and favour top ranks."""
+    sources = make_sources(10)
+    
+    packed, used = pack_sources(sources, budget_tokens=1000, min_tokens=40, max_tokens=400)
+    
+    assert used <= 1000
+    assert 0 < len(packed) <= len(sources)
+    assert [source["url"] for source in packed] == [source["url"] for source in sources[:len(packed)]]
+    assert count_tokens(packed[0]["content"]) > count_tokens(packed[-1]["content"])
+
+def test_pack_sources_short_sources_fit_entirely():
+    """Test that unused allocation of short sources is not wasted."""
+    sources = [{"title": "T", "content": "Short content.", "url": f"https://example.com/{i}"} for i in range(5)]
+    
+    packed, _ = pack_sources(sources, budget_tokens=1000)
+    
+    assert len(packed) == 5
+    assert all(source["content"] == "Short content." for source in packed)
+
+def test_failed_tokenizer_load_is_retried(monkeypatch):
+    """Test that a tokenizer that failed to load is loaded again after the retry delay."""
+    class FlakyTiktoken:
+        calls = 0
+
+        def encoding_for_model(self, model):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("vocabulary download failed")
+            return WordEncoding()
+
+    class WordEncoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+    tiktoken = FlakyTiktoken()
+    monkeypatch.setattr(token_budget, "tiktoken", tiktoken)
+    monkeypatch.setattr(token_budget, "_encodings", {})
+    monkeypatch.setattr(token_budget, "_encoding_retry_at", {})
+    monkeypatch.setattr(token_budget, "ENCODING_RETRY_SECONDS", 0.01)
+    text = "one two three four five six seven eight"
+
+    assert count_tokens(text, "flaky-model") == (len(text) + 3) // 4
+    assert get_encoding("flaky-model") is None
+    assert tiktoken.calls == 1
+    time.sleep(0.02)
+
+    assert count_tokens(text, "flaky-model") == 8
+    assert get_encoding("flaky-model") is not None
+    assert tiktoken.calls == 2